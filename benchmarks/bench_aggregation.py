@@ -0,0 +1,60 @@
+"""Benchmark of `aggregate_boxscores`, compared to the former pairwise reduction with `sum_boxscores`.
+
+Run with `python -m benchmarks.bench_aggregation`.
+"""
+
+import argparse
+import functools
+import timeit
+
+import pandas as pd
+
+from benchmarks.data import make_raw_stats_df
+from src.core.analysis.entities import Boxscore, Team
+from src.core.analysis.entities_ops import pack_boxscores
+from src.core.analysis.transforms import aggregate_boxscores, sum_boxscores
+from src.core.parsers.transforms import transform_game_stats_df
+
+
+def legacy_aggregate_boxscores(boxscores: list[Boxscore]) -> pd.DataFrame:
+    """Former implementation: pairwise reduction of the boxscores."""
+    all_dfs = [boxscore.to_frame().set_index("player") for boxscore in boxscores]
+    return functools.reduce(lambda df1, df2: sum_boxscores(df1, df2), all_dfs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Benchmark aggregate_boxscores")
+    parser.add_argument("--games", type=int, nargs="+", default=[10, 30, 100, 300, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    team = Team(name="TEAM")
+    # One season is ~30 games per team, a multi-season team history has hundreds of games.
+    # Boxscores are packed in a store shared by the league, as the parsed ones
+    all_boxscores = pack_boxscores(
+        [
+            Boxscore.from_frame(
+                boxscore=transform_game_stats_df(make_raw_stats_df(n_players=12, seed=seed, roster_size=16)),
+                team=team,
+                score=80,
+            )
+            for seed in range(max(args.games))
+        ]
+    )
+
+    print(f"{'games':>6} {'legacy (ms)':>12} {'grouped (ms)':>13} {'speedup':>8}")
+    for n_games in args.games:
+        boxscores = all_boxscores[:n_games]
+        pd.testing.assert_frame_equal(
+            aggregate_boxscores(boxscores).to_frame(),
+            legacy_aggregate_boxscores(boxscores),
+            check_like=True,
+            check_dtype=False,
+        )
+        legacy = min(timeit.repeat(lambda: legacy_aggregate_boxscores(boxscores), number=1, repeat=args.repeat))
+        grouped = min(timeit.repeat(lambda: aggregate_boxscores(boxscores), number=1, repeat=args.repeat))
+        print(f"{n_games:>6} {1000 * legacy:>12.2f} {1000 * grouped:>13.2f} {legacy / grouped:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark of `parse_html`, compared to building the full tree of the page with `lxml.html.fromstring`: parse time and
+memory held by the tree of each page.
+
+Run with `python -m benchmarks.bench_html --boxscores tests/data/*livescore*htm*`.
+"""
+
+import argparse
+import gc
+import multiprocessing
+import resource
+import timeit
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+import lxml.html as lh
+from lxml.html import Element
+
+from src.core.parsers.parsers import parse_html
+
+
+def legacy_parse_html(document: bytes) -> Element:
+    """Former implementation: the full tree of the page."""
+    return lh.fromstring(document.decode("utf-8"))
+
+
+def resident_memory() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+def held_memory(fn: Callable[[bytes], Element], documents: list[bytes], n_copies: int) -> float:
+    """Resident memory held by the trees of `n_copies` copies of each document, per document. Run it in a new process,
+    so the memory freed by other measurements is not reused.
+    """
+    gc.collect()
+    start = resident_memory()
+    trees = [fn(document) for _ in range(n_copies) for document in documents]
+    held = resident_memory() - start
+    del trees
+    return held / (n_copies * len(documents))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Benchmark parse_html")
+    parser.add_argument("--boxscores", type=str, nargs="+", required=True, help="Boxscore files to parse.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--copies", type=int, default=50, help="Copies of each tree held to measure their memory.")
+    args = parser.parse_args()
+
+    documents = []
+    for boxscore_file in args.boxscores:
+        with open(boxscore_file, mode="rb") as f:
+            documents.append(f.read())
+
+    print(f"{'parser':>8} {'time (ms)':>10} {'elements':>9} {'memory (KiB)':>13}")
+    for name, fn in (("legacy", legacy_parse_html), ("targeted", parse_html)):
+        elapsed = min(
+            timeit.repeat(lambda: [fn(document) for document in documents], number=args.number, repeat=args.repeat)
+        )
+        n_elements = sum(sum(1 for _ in fn(document).iter()) for document in documents) / len(documents)
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            memory = executor.submit(held_memory, fn, documents, args.copies).result()
+        n_parsed: int = args.number * len(documents)
+        print(f"{name:>8} {1000 * elapsed / n_parsed:>10.2f} {n_elements:>9.0f} {memory / 1024:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark of `FEBLivescoreParser.parse_game_metadata`, compared to the former implementation with an XPath query per
+field.
+
+Run with `python -m benchmarks.bench_metadata --boxscores tests/data/*livescore*htm*`.
+"""
+
+import argparse
+import timeit
+from collections.abc import Callable
+
+from lxml.html import Element
+
+from src.core.parsers.parsers import FEBLivescoreParser
+
+
+def legacy_extract_nested_value(doc: Element, xpath: str) -> str | None:
+    """Former implementation: compiles `xpath` on every call and walks the children of the last match."""
+    value = None
+    current_path = doc.xpath(xpath)
+    while not value:
+        try:
+            if current_path[-1].text_content():
+                return FEBLivescoreParser.parse_str(current_path[-1].text_content(), decode_bytes=True)
+            current_path = [x for x in current_path[-1]]
+        except IndexError:
+            return None
+    return value
+
+
+def legacy_parse_game_metadata(doc: Element) -> dict[str, str]:
+    """Former implementation: a full document query per field."""
+    date = None
+    time = None
+    time_and_date_str = legacy_extract_nested_value(doc, '//div[@class="fecha"]')
+    if time_and_date_str is not None:
+        split_time_and_date = time_and_date_str.split()
+        if len(split_time_and_date) > 1:
+            date = split_time_and_date[1]
+            time = split_time_and_date[-1]
+
+    season = legacy_extract_nested_value(doc, '//span[@class="temporada"]')
+    league = legacy_extract_nested_value(doc, '//span[@class="liga"]')
+    home_team = legacy_extract_nested_value(doc, '//span[@id="_ctl0_MainContentPlaceHolderMaster_equipoLocalNombre"]')
+    home_score = legacy_extract_nested_value(doc, '//div[@class="columna equipo local"]//span[@class="resultado"]')
+    away_team = legacy_extract_nested_value(
+        doc, '//span[@id="_ctl0_MainContentPlaceHolderMaster_equipoVisitanteNombre"]'
+    )
+    away_score = legacy_extract_nested_value(doc, '//div[@class="columna equipo visitante"]//span[@class="resultado"]')
+    _ = legacy_extract_nested_value(doc, '//div[@class="arbitros"]')
+    return {
+        "date": date or "",
+        "time": time or "",
+        "league": league or "",
+        "season": season or "",
+        "home_team": home_team or "",
+        "home_score": home_score or "",
+        "away_team": away_team or "",
+        "away_score": away_score or "",
+        "main_referee": "-",
+        "second_referee": "-",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Benchmark parse_game_metadata")
+    parser.add_argument("--boxscores", type=str, nargs="+", required=True, help="Boxscore files to parse.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=100)
+    args = parser.parse_args()
+
+    docs = []
+    for boxscore_file in args.boxscores:
+        with open(boxscore_file, mode="rb") as f:
+            docs.append(FEBLivescoreParser.read_link_bytes(f.read()))
+    for doc in docs:
+        assert FEBLivescoreParser.parse_game_metadata(doc) == legacy_parse_game_metadata(doc)
+
+    def time_per_document(fn: Callable[[Element], dict[str, str]]) -> float:
+        elapsed = min(timeit.repeat(lambda: [fn(doc) for doc in docs], number=args.number, repeat=args.repeat))
+        n_documents: int = args.number * len(docs)
+        return elapsed / n_documents
+
+    legacy = time_per_document(legacy_parse_game_metadata)
+    single_pass = time_per_document(FEBLivescoreParser.parse_game_metadata)
+    print(f"{'documents':>10} {'legacy (us)':>12} {'single pass (us)':>17} {'speedup':>8}")
+    print(f"{len(docs):>10} {1e6 * legacy:>12.1f} {1e6 * single_pass:>17.1f} {legacy / single_pass:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
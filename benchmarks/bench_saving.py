@@ -0,0 +1,180 @@
+"""Benchmark of `league_to_xlsx`, compared to the former `pd.ExcelWriter` export with a per-cell alignment loop.
+
+Run with `python -m benchmarks.bench_saving`.
+"""
+
+import argparse
+import os
+import tempfile
+import timeit
+from io import BytesIO
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.styles import Alignment
+from openpyxl.utils import get_column_letter
+
+from benchmarks.data import make_league
+from src.core.analysis.entities import League
+from src.core.analysis.entities_ops import average_games
+from src.core.analysis.lang import spanish_columns
+from src.core.analysis.saving import (
+    HIGH_VALUES_COLOR,
+    LOW_VALUES_COLOR,
+    VERY_HIGH_VALUES_COLOR,
+    VERY_LOW_VALUES_COLOR,
+    format_minutes_column,
+    league_to_xlsx,
+)
+from src.core.analysis.utils import get_sorted_list_of_columns, timedelta_to_str
+
+
+def legacy_gaussian_color_style(
+    s: pd.Series,
+    very_high_regime: str = f"background-color: {VERY_HIGH_VALUES_COLOR}; border: 1px solid",
+    high_regime: str = f"background-color: {HIGH_VALUES_COLOR}; border: 1px solid",
+    low_regime: str = f"background-color: {LOW_VALUES_COLOR}; border: 1px solid",
+    very_low_regime: str = f"background-color: {VERY_LOW_VALUES_COLOR}; border: 1px solid",
+    regular_regime: str = "border: 1px solid",
+) -> list[str]:
+    """Former styler function of the colored sheets: the cell styles of a column, by its z-scores."""
+    high_indices = np.where(s > s.mean() + s.std(), high_regime, regular_regime)
+    very_high_indices = np.where(s > s.mean() + 2 * s.std(), very_high_regime, regular_regime)
+    low_indices = np.where(s < s.mean() - s.std(), low_regime, regular_regime)
+    very_low_indices = np.where(s < s.mean() - 2 * s.std(), very_low_regime, regular_regime)
+    out_color = []
+    for i in range(len(high_indices)):
+        if very_high_indices[i] != regular_regime:
+            out_color.append(very_high_indices[i])
+            continue
+        if very_low_indices[i] != regular_regime:
+            out_color.append(very_low_indices[i])
+            continue
+        if high_indices[i] != regular_regime:
+            out_color.append(high_indices[i])
+            continue
+        out_color.append(low_indices[i])
+    return out_color
+
+
+def legacy_league_to_xlsx(league: League, filename: str, col_width: int = 60, export_colors: bool = False) -> bytes:
+    """Former implementation: pandas styler export, then a pass over every cell to center it."""
+    assert league.aggregated_games is not None
+    xlsx_writer = pd.ExcelWriter(filename, engine="openpyxl", mode="w", date_format="DD-MM-YYYY")
+    sheet_name = f"{league.name}_{league.season.replace('/', '-')}"
+    columns = get_sorted_list_of_columns()
+    aggregated_games = league.aggregated_games.loc[:, columns].set_index("team")
+    columns.pop(columns.index("team"))
+    averaged_games = average_games(aggregated_games.copy())
+    aggregated_games.loc[:, "minutes"] = aggregated_games["minutes"].apply(
+        lambda x: timedelta_to_str(x) if not pd.isnull(x) else ""
+    )
+    averaged_games.loc[:, "minutes"] = averaged_games["minutes"].apply(
+        lambda x: timedelta_to_str(x) if not pd.isnull(x) else ""
+    )
+    numerical_columns = list(set(aggregated_games.columns) - {"mode", "minutes"})
+    column_names = ["\n".join(spanish_columns[x].split()) for x in columns]
+    sheets: list[tuple[Any, list[str], list[str], str]] = []
+    for df, df_sheet_name in ((aggregated_games, sheet_name), (averaged_games, f"Medias {sheet_name}")):
+        sheets.append(
+            (
+                df.style.apply(legacy_gaussian_color_style, subset=numerical_columns, axis=0) if export_colors else df,
+                columns,
+                column_names,
+                df_sheet_name,
+            )
+        )
+
+    player_columns = get_sorted_list_of_columns(individual_columns=True)
+    player_column_names = ["\n".join(spanish_columns[x].split()) for x in player_columns]
+    for team in league.teams:
+        if team.season_stats is not None:
+            aggregated = team.season_stats.loc[:, player_columns]
+            averaged = average_games(aggregated.copy(), individual_columns=True)
+            format_minutes_column(aggregated)
+            format_minutes_column(averaged)
+            numerical_columns = list(set(aggregated.columns) - {"mode", "minutes", "player", "number"})
+            for df, df_sheet_name in ((aggregated, team.name[:31]), (averaged, f"Medias {team.name}"[:31])):
+                sheets.append(
+                    (
+                        df.style.apply(legacy_gaussian_color_style, subset=numerical_columns, axis=0)
+                        if export_colors
+                        else df,
+                        player_columns,
+                        player_column_names,
+                        df_sheet_name,
+                    )
+                )
+
+    for df, df_columns, header, df_sheet_name in sheets:
+        df.to_excel(xlsx_writer, float_format="%.2f", columns=df_columns, header=header, sheet_name=df_sheet_name)
+
+    center_alignment = Alignment(horizontal="center")
+    for worksheet in xlsx_writer.sheets.values():
+        for row in worksheet.iter_rows():
+            for cell in row:
+                cell.alignment = center_alignment
+        worksheet.column_dimensions[get_column_letter(1)].width = col_width
+        worksheet.row_dimensions[1].height = 40
+    virtual_workbook = BytesIO()
+    xlsx_writer.book.save(virtual_workbook)
+    virtual_workbook.seek(0)
+    return virtual_workbook.read()
+
+
+def workbook_cells(xlsx: bytes) -> dict[str, list[tuple[Any, ...]]]:
+    """Values and fonts of the non-empty cells of a workbook, by sheet. Colors are conditional formats now."""
+    workbook = load_workbook(BytesIO(xlsx))
+    return {
+        worksheet.title[:31]: [
+            (
+                cell.coordinate,
+                cell.value,
+                cell.font.b,
+                cell.alignment.horizontal,
+            )
+            for row in worksheet.iter_rows()
+            for cell in row
+            if cell.value is not None
+        ]
+        for worksheet in workbook.worksheets
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Benchmark league_to_xlsx")
+    parser.add_argument("--teams", type=int, nargs="+", default=[6, 12, 18])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'teams':>6} {'colors':>7} {'legacy (ms)':>12} {'streamed (ms)':>14} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        filename = os.path.join(temp_dir, "league.xlsx")
+        for n_teams in args.teams:
+            league = make_league(n_teams=n_teams)
+            for export_colors in (False, True):
+                assert workbook_cells(league_to_xlsx(league, export_colors=export_colors)) == workbook_cells(
+                    legacy_league_to_xlsx(league, filename, export_colors=export_colors)
+                )
+                legacy = min(
+                    timeit.repeat(
+                        lambda: legacy_league_to_xlsx(league, filename, export_colors=export_colors),
+                        number=1,
+                        repeat=args.repeat,
+                    )
+                )
+                streamed = min(
+                    timeit.repeat(
+                        lambda: league_to_xlsx(league, export_colors=export_colors), number=1, repeat=args.repeat
+                    )
+                )
+                print(
+                    f"{n_teams:>6} {export_colors!s:>7} {1000 * legacy:>12.2f} {1000 * streamed:>14.2f} "
+                    f"{legacy / streamed:>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
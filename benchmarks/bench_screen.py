@@ -0,0 +1,64 @@
+"""Benchmark of the cost of rejecting unfinished games: `screen_boxscore` on the raw page, compared to parsing it as
+before, with the full metadata parsed before the played quarters are checked.
+
+Run with `python -m benchmarks.bench_screen --boxscores tests/data/*livescore*htm*`.
+"""
+
+import argparse
+import timeit
+from collections.abc import Callable
+
+from src.core.parsers.exceptions import UnfinishedGameException
+from src.core.parsers.parsers import BoxscoreStatus, FEBLivescoreParser, screen_boxscore
+
+
+def legacy_reject(boxscore: bytes) -> bool:
+    """Former implementation: the page is parsed, and its metadata read, before checking the played quarters."""
+    doc = FEBLivescoreParser.read_link_bytes(boxscore)
+    FEBLivescoreParser.parse_game_metadata(doc)
+    return not FEBLivescoreParser.is_finished_game(doc)
+
+
+def screen_reject(boxscore: bytes) -> bool:
+    return screen_boxscore(boxscore) is not BoxscoreStatus.FINISHED
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Benchmark the rejection of unfinished games")
+    parser.add_argument("--boxscores", type=str, nargs="+", required=True, help="Finished boxscore files.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    unfinished_boxscores = []
+    for boxscore_file in args.boxscores:
+        with open(boxscore_file, mode="rb") as f:
+            boxscore = f.read()
+        # The same game, in its third quarter
+        unfinished_boxscores.append(boxscore.replace(b"cuarto play", b"cuarto", boxscore.count(b"cuarto play") - 3))
+    for boxscore in unfinished_boxscores:
+        assert legacy_reject(boxscore) and screen_reject(boxscore)
+        try:
+            FEBLivescoreParser.parse_game_stats(FEBLivescoreParser.read_link_bytes(boxscore))
+        except UnfinishedGameException:
+            pass
+        else:
+            raise AssertionError("The game should be unfinished")
+
+    def time_per_document(fn: Callable[[bytes], bool]) -> float:
+        elapsed = min(
+            timeit.repeat(
+                lambda: [fn(boxscore) for boxscore in unfinished_boxscores], number=args.number, repeat=args.repeat
+            )
+        )
+        n_documents: int = args.number * len(unfinished_boxscores)
+        return elapsed / n_documents
+
+    legacy = time_per_document(legacy_reject)
+    screened = time_per_document(screen_reject)
+    print(f"{'documents':>10} {'legacy (us)':>12} {'screened (us)':>14} {'speedup':>8}")
+    print(f"{len(unfinished_boxscores):>10} {1e6 * legacy:>12.1f} {1e6 * screened:>14.1f} {legacy / screened:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Load test of the gRPC server: throughput of concurrent `GetFebStats` requests by number of server workers.
+
+Run with `python -m benchmarks.bench_server --boxscores tests/data/*livescore*htm*`. With `--processes`, the
+leagues are exported in a pool of as many worker processes as server workers. With `--stream`, the requests use the
+streaming `StreamFebStats` RPC.
+"""
+
+import argparse
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+
+from src.service.codegen import feb_stats_pb2_grpc
+from src.service.codegen.feb_stats_pb2 import GetFebStatsRequest, StreamFebStatsRequest
+from src.service.server import Server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Load test the gRPC server")
+    parser.add_argument("--boxscores", type=str, nargs="+", required=True, help="Boxscore files of each request.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--processes", action="store_true", help="Export the leagues in worker processes.")
+    parser.add_argument("--stream", action="store_true", help="Use the streaming RPC.")
+    args = parser.parse_args()
+
+    boxscores = []
+    for boxscore_file in args.boxscores:
+        with open(boxscore_file, mode="rb") as f:
+            boxscores.append(f.read())
+    request = GetFebStatsRequest(boxscores=boxscores)
+
+    def get_sheet(stub: feb_stats_pb2_grpc.FebStatsServiceStub) -> bytes:
+        if args.stream:
+            responses = stub.StreamFebStats(StreamFebStatsRequest(boxscore=boxscore) for boxscore in boxscores)
+            return b"".join(response.sheet_chunk for response in responses)
+        sheet: bytes = stub.GetFebStats(request).sheet
+        return sheet
+
+    print(f"{'workers':>8} {'requests/s':>11} {'speedup':>8}")
+    baseline = None
+    for n_workers in args.workers:
+        if args.processes:
+            server = Server(address="127.0.0.1:0", n_processes=n_workers, max_queue_size=n_workers)
+        else:
+            server = Server(address="127.0.0.1:0", max_workers=n_workers)
+        server.start()
+        try:
+            with grpc.insecure_channel(f"127.0.0.1:{server.port}") as channel:
+                stub = feb_stats_pb2_grpc.FebStatsServiceStub(channel)
+                get_sheet(stub)  # Warm up
+                with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                    start = timeit.default_timer()
+                    sheets = list(executor.map(lambda _: get_sheet(stub), range(args.requests)))
+                    elapsed = timeit.default_timer() - start
+        finally:
+            server.stop(0)
+        assert all(sheets)
+        throughput = args.requests / elapsed
+        baseline = baseline or throughput
+        print(f"{n_workers:>8} {throughput:>11.2f} {throughput / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark of the memory held by the boxscores of a league: a DataFrame per boxscore, as before, against the packed
+`BoxscoreStore` shared by the whole league.
+
+Run with `python -m benchmarks.bench_store`.
+"""
+
+import argparse
+import gc
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from benchmarks.data import make_raw_stats_df
+from src.core.analysis.entities import Boxscore, Team
+from src.core.analysis.entities_ops import pack_boxscores
+from src.core.parsers.transforms import transform_game_stats_df
+
+
+def allocated_memory(fn: Callable[[], Any]) -> int:
+    """Memory allocated by `fn` that is still held by its result."""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Benchmark the memory of the boxscores of a league")
+    parser.add_argument("--games", type=int, nargs="+", default=[100, 300, 1000])
+    args = parser.parse_args()
+
+    team = Team(name="TEAM")
+    # Both teams of a game have a boxscore
+    all_dfs = [
+        transform_game_stats_df(make_raw_stats_df(n_players=12, seed=seed, roster_size=16))
+        for seed in range(2 * max(args.games))
+    ]
+
+    print(f"{'games':>6} {'dataframes (KiB)':>17} {'store (KiB)':>12} {'ratio':>6}")
+    for n_games in args.games:
+        dfs = all_dfs[: 2 * n_games]
+        dataframes = allocated_memory(lambda: [df.copy() for df in dfs])
+        boxscores = [Boxscore.from_frame(df, team=team, score=80) for df in dfs]
+        store = allocated_memory(lambda: pack_boxscores(boxscores))
+        print(f"{n_games:>6} {dataframes / 1024:>17.1f} {store / 1024:>12.1f} {dataframes / store:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark of `FEBLivescoreParser.elements_to_df`, compared to the former implementation with a dict per row.
+
+Run with `python -m benchmarks.bench_tables --boxscores tests/data/*livescore*htm*`.
+"""
+
+import argparse
+import timeit
+from collections.abc import Callable
+
+import pandas as pd
+from lxml.html import Element
+
+from benchmarks.bench_text import legacy_parse_str
+from src.core.parsers.parsers import FEBLivescoreParser
+
+
+def legacy_elements_to_df(tr_elements: list[Element], initial_row: int = 2, discard_last: int = 0) -> pd.DataFrame:
+    """Former implementation: a dict per row, keyed by the class of each cell, and columns inferred by pandas."""
+    table_rows = []
+    for j in range(initial_row, len(tr_elements) - discard_last):
+        row = {}
+        for t in tr_elements[j].iterchildren():
+            row[t.attrib["class"]] = legacy_parse_str(t.text_content(), decode_bytes=True)
+        table_rows.append(row)
+    return pd.DataFrame(table_rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Benchmark elements_to_df")
+    parser.add_argument("--boxscores", type=str, nargs="+", required=True, help="Boxscore files to parse.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    tables: list[list[Element]] = []
+    for boxscore_file in args.boxscores:
+        with open(boxscore_file, mode="rb") as f:
+            doc = FEBLivescoreParser.read_link_bytes(f.read())
+        tables.extend(FEBLivescoreParser.get_tables(doc))
+    for table in tables:
+        pd.testing.assert_frame_equal(FEBLivescoreParser.elements_to_df(table), legacy_elements_to_df(table))
+
+    def time_per_table(fn: Callable[[list[Element]], pd.DataFrame]) -> float:
+        elapsed = min(timeit.repeat(lambda: [fn(table) for table in tables], number=args.number, repeat=args.repeat))
+        n_tables: int = args.number * len(tables)
+        return elapsed / n_tables
+
+    legacy = time_per_table(legacy_elements_to_df)
+    positional = time_per_table(FEBLivescoreParser.elements_to_df)
+    print(f"{'tables':>7} {'legacy (us)':>12} {'positional (us)':>16} {'speedup':>8}")
+    print(f"{len(tables):>7} {1e6 * legacy:>12.1f} {1e6 * positional:>16.1f} {legacy / positional:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
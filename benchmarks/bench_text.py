@@ -0,0 +1,54 @@
+"""Benchmark of the normalization of the cell texts of the boxscore tables: `normalize_texts` on whole tables, compared
+to the former `parse_str` on each cell.
+
+Run with `python -m benchmarks.bench_text --boxscores tests/data/*livescore*htm*`.
+"""
+
+import argparse
+import timeit
+from collections.abc import Callable
+
+from src.core.parsers.parsers import FEBLivescoreParser, normalize_texts
+
+
+def legacy_parse_str(input_str: str | bytes, decode_bytes: bool = False) -> str:
+    """Former implementation: a UTF-8 round trip and a chain of replacements before collapsing the whitespace."""
+    if decode_bytes:
+        input_str = bytes(str(input_str), "utf-8").decode("utf-8")
+    assert isinstance(input_str, str)
+    return " ".join(
+        input_str.replace("\n", " ").replace("\t", " ").replace("\r", " ").replace(",", ".").split()
+    ).strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Benchmark the normalization of the cells of the boxscore tables")
+    parser.add_argument("--boxscores", type=str, nargs="+", required=True, help="Boxscore files to parse.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+
+    tables = []
+    for boxscore_file in args.boxscores:
+        with open(boxscore_file, mode="rb") as f:
+            doc = FEBLivescoreParser.read_link_bytes(f.read())
+        for table in FEBLivescoreParser.get_tables(doc):
+            tables.append([t.text_content() for tr in table[2:] for t in tr.iterchildren()])
+    for texts in tables:
+        assert normalize_texts(texts) == [legacy_parse_str(text, decode_bytes=True) for text in texts]
+
+    n_cells = sum(len(texts) for texts in tables)
+
+    def time_per_cell(fn: Callable[[], object]) -> float:
+        elapsed = min(timeit.repeat(fn, number=args.number, repeat=args.repeat))
+        n_timed_cells: int = args.number * n_cells
+        return elapsed / n_timed_cells
+
+    legacy = time_per_cell(lambda: [[legacy_parse_str(text, decode_bytes=True) for text in texts] for texts in tables])
+    bulk = time_per_cell(lambda: [normalize_texts(texts) for texts in tables])
+    print(f"{'cells':>7} {'legacy (ns)':>12} {'bulk (ns)':>10} {'speedup':>8}")
+    print(f"{n_cells:>7} {1e9 * legacy:>12.1f} {1e9 * bulk:>10.1f} {legacy / bulk:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
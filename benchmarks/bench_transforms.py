@@ -0,0 +1,66 @@
+"""Micro-benchmark of `transform_game_stats_df`, compared to the former concat/drop implementation.
+
+Run with `python -m benchmarks.bench_transforms`.
+"""
+
+import argparse
+import timeit
+
+import pandas as pd
+
+from benchmarks.data import make_raw_stats_df
+from src.core.parsers.transforms import (
+    CAST_KEYS,
+    NO_TRANSFORM_KEYS,
+    transform_cum_stats_minutes,
+    transform_cum_stats_shots,
+    transform_game_stats_df,
+    transform_starter,
+)
+
+
+def legacy_transform_game_stats_df(initial_df: pd.DataFrame) -> pd.DataFrame:
+    """Former implementation: one `pd.concat` + `drop` per transformed column."""
+    df = initial_df.rename(NO_TRANSFORM_KEYS, axis="columns")
+    transform_keys = {
+        "tiros dos": ("2_point", transform_cum_stats_shots),
+        "minutos": ("minutes", transform_cum_stats_minutes),
+        "tiros tres": ("3_point", transform_cum_stats_shots),
+        "tiros campo": ("field_goal", transform_cum_stats_shots),
+        "tiros libres": ("free_throw", transform_cum_stats_shots),
+        "inicial": ("starter", transform_starter),
+    }
+    for transform_key, (new_name, transform_function) in transform_keys.items():
+        new_df = transform_function(df.loc[:, transform_key], prefix=new_name)
+        df = pd.concat([df, new_df], axis=1)
+        df = df.drop(axis="columns", labels=transform_key)
+
+    df.at[df.shape[0] - 1, "point_balance"] = 0.0
+    df = df.astype(CAST_KEYS)
+    df.loc[:, "minutes"] = pd.to_timedelta(df.loc[:, "minutes"])
+    df.loc[:, "games"] = 1
+    df.at[df.shape[0] - 1, "point_balance"] = df.loc[:, "point_balance"].sum()
+    df.at[df.shape[0] - 1, "player"] = "Total"
+    return df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("Benchmark transform_game_stats_df")
+    parser.add_argument("--games", type=int, default=50, help="Number of synthetic games.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Two tables (home and away) per game
+    tables = [make_raw_stats_df(n_players=12, seed=seed) for seed in range(2 * args.games)]
+    for table in tables:
+        pd.testing.assert_frame_equal(transform_game_stats_df(table), legacy_transform_game_stats_df(table))
+
+    timings = {}
+    for name, fn in (("legacy", legacy_transform_game_stats_df), ("vectorized", transform_game_stats_df)):
+        timings[name] = min(timeit.repeat(lambda: [fn(table) for table in tables], number=1, repeat=args.repeat))
+        print(f"{name:>10}: {1000 * timings[name] / args.games:.3f} ms/game")
+    print(f"   speedup: {timings['legacy'] / timings['vectorized']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import datetime
+import random
+
+import pandas as pd
+
+from src.core.analysis.entities import Boxscore, Game, League, Player, Team
+from src.core.analysis.transforms import compute_league_aggregates
+from src.core.parsers.transforms import transform_game_stats_df
+
+STATS_COLUMNS = [
+    "inicial",
+    "dorsal",
+    "nombre jugador",
+    "minutos",
+    "puntos",
+    "tiros dos",
+    "tiros tres",
+    "tiros campo",
+    "tiros libres",
+    "rebotes total",
+    "rebotes defensivos",
+    "rebotes ofensivos",
+    "asistencias",
+    "recuperaciones",
+    "perdidas",
+    "tapones favor",
+    "tapones contra",
+    "mates",
+    "faltas cometidas",
+    "faltas recibidas",
+    "valoracion",
+    "balance",
+]
+
+
+def _shots(rng: random.Random) -> str:
+    attempted = rng.randint(0, 10)
+    made = rng.randint(0, attempted)
+    percentage = int(100 * made / attempted) if attempted else 0
+    return f"{made}/{attempted} {percentage}%"
+
+
+def make_raw_stats_rows(
+    n_players: int = 12,
+    seed: int = 0,
+    team_name: str = "TEAM",
+    roster_size: int | None = None,
+) -> list[dict[str, str]]:
+    """Builds the rows of a synthetic FEB stats table, as read from the HTML. The last row is the team total.
+    If `roster_size` is set, the `n_players` players are sampled from a roster of that size.
+    """
+    rng = random.Random(seed)
+    player_ids = sorted(rng.sample(range(roster_size), n_players)) if roster_size else list(range(n_players))
+    rows = []
+    for j, i in enumerate(player_ids):
+        row = {
+            "inicial": "*" if j < 5 else "",
+            "dorsal": str(i + 4),
+            "nombre jugador": f"{team_name} PLAYER {i}. NAME",
+            "minutos": f"{rng.randint(0, 39)}:{rng.randint(0, 59):02d}",
+            "tiros dos": _shots(rng),
+            "tiros tres": _shots(rng),
+            "tiros campo": _shots(rng),
+            "tiros libres": _shots(rng),
+            "balance": str(rng.randint(-15, 15)),
+        }
+        for column in STATS_COLUMNS:
+            row.setdefault(column, str(rng.randint(0, 9)))
+        rows.append({column: row[column] for column in STATS_COLUMNS})
+
+    total = {column: "12" for column in STATS_COLUMNS}
+    total.update(
+        {
+            "inicial": "",
+            "dorsal": "",
+            "nombre jugador": "Total",
+            "minutos": "200:00",
+            "tiros dos": "20/40 50%",
+            "tiros tres": "8/20 40%",
+            "tiros campo": "28/60 46%",
+            "tiros libres": "16/20 80%",
+            "balance": "",
+        }
+    )
+    rows.append(total)
+    return rows
+
+
+def make_raw_stats_df(
+    n_players: int = 12,
+    seed: int = 0,
+    team_name: str = "TEAM",
+    roster_size: int | None = None,
+) -> pd.DataFrame:
+    """Builds a synthetic FEB stats table, as returned by `FEBLivescoreParser.elements_to_df`."""
+    return pd.DataFrame(make_raw_stats_rows(n_players, seed, team_name, roster_size))
+
+
+def make_league(n_teams: int = 18, n_players: int = 12, roster_size: int = 16) -> League:
+    """Builds a synthetic double round-robin league of `n_teams` teams, with its aggregates computed."""
+    teams = [Team(name=f"TEAM {i}") for i in range(n_teams)]
+    games: list[Game] = []
+    for home_team in teams:
+        for away_team in teams:
+            if home_team == away_team:
+                continue
+            seed = len(games)
+            games.append(
+                Game(
+                    game_at=datetime.datetime(2024, 10, 1) + datetime.timedelta(days=seed),
+                    league="LEAGUE",
+                    season="2024/2025",
+                    main_referee=Player(name="-"),
+                    aux_referee=Player(name="-"),
+                    home_boxscore=Boxscore.from_frame(
+                        boxscore=transform_game_stats_df(
+                            make_raw_stats_df(n_players, 2 * seed, home_team.name, roster_size)
+                        ),
+                        team=home_team,
+                        score=80,
+                    ),
+                    away_boxscore=Boxscore.from_frame(
+                        boxscore=transform_game_stats_df(
+                            make_raw_stats_df(n_players, 2 * seed + 1, away_team.name, roster_size)
+                        ),
+                        team=away_team,
+                        score=75,
+                    ),
+                )
+            )
+    return compute_league_aggregates(League(name="LEAGUE", season="2024/2025", teams=teams, games=games))
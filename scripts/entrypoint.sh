@@ -0,0 +1,17 @@
+#!/usr/bin/env bash
+# Entrypoint of the docker image: migrates the database and runs the web app along with the workers of the analysis
+# jobs. The container stops as soon as any of them exits, so that it can be restarted. The jobs are queued in the local
+# SQLite database, so the container must run as a single instance whose CPU is not throttled between requests.
+set -e
+
+SETTINGS="${DJANGO_SETTINGS_MODULE:-src.feb_stats.settings.production}"
+
+uv run python manage.py migrate --noinput --settings="$SETTINGS"
+
+trap 'kill $(jobs -p) 2>/dev/null' INT TERM EXIT
+uv run python manage.py run_analysis_jobs --workers "${JOBS_WORKERS:-2}" --settings="$SETTINGS" &
+uv run gunicorn feb_stats.wsgi:application \
+  --env DJANGO_SETTINGS_MODULE="$SETTINGS" \
+  --bind 0.0.0.0:8080 \
+  --timeout 300 &
+wait -n
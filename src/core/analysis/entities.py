@@ -1,9 +1,13 @@
 import datetime
-from typing import Any
+from collections import defaultdict
+from collections.abc import Mapping
+from functools import cached_property
+from typing import Any, ClassVar, Self
 
 import pandas as pd
 from pydantic import BaseModel, ConfigDict, field_validator
 
+from src.core.analysis.store import BoxscoreStore, NameTable
 from src.core.analysis.validation_functions import (
     validate_datetime,
     validate_int,
@@ -46,11 +50,18 @@ class Team(BaseModel):
 
 
 class Boxscore(BaseModel):
-    """Boxscore from a game."""
+    """Boxscore from a game.
+
+    The stats are a view of the rows `rows` of a `BoxscoreStore`, usually shared by all the boxscores of a league. A
+    boxscore can also be built from a dataframe with `from_frame`, which copies it into a store of its own.
+    """
 
     team: Team
     score: int
-    boxscore: pd.DataFrame
+    store: BoxscoreStore
+    rows: slice
+    # Column used as the index of `to_frame`
+    index: str | None = None
 
     model_config = ConfigDict(arbitrary_types_allowed=True, frozen=True)
 
@@ -59,6 +70,29 @@ class Boxscore(BaseModel):
     def validate_score(cls, v: Any) -> int:
         return validate_int(v)
 
+    @classmethod
+    def from_frame(cls, boxscore: pd.DataFrame, team: Team, score: int) -> "Boxscore":
+        """Builds a boxscore from a dataframe. A named index is kept as the index of `to_frame`.
+        :param boxscore: Stats of the boxscore.
+        :param team: Team of the boxscore.
+        :param score: Score of the team.
+        :return: The boxscore.
+        """
+        store = BoxscoreStore.from_frame(boxscore)
+        return cls(team=team, score=score, store=store, rows=slice(0, len(store)), index=boxscore.index.name)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Stats of the boxscore, as a new dataframe. It is a copy: changes to it do not change the boxscore."""
+        return self.store.to_frame(self.rows, index=self.index)
+
+    def __getstate__(self) -> dict[Any, Any]:
+        # Do not pickle the rows, nor the names, of the other boxscores of a shared store
+        state: dict[Any, Any] = super().__getstate__()
+        if self.rows != slice(0, len(self.store)):
+            store = BoxscoreStore.concat([(self.store, self.rows)], names=NameTable())
+            state["__dict__"] = {**state["__dict__"], "store": store, "rows": slice(0, len(store))}
+        return state
+
 
 class Game(BaseModel):
     """Game from a league."""
@@ -108,7 +142,14 @@ class Game(BaseModel):
 
 
 class League(BaseModel):
-    """Basketball league."""
+    """Basketball league.
+
+    The lookups by team are indexed by team name. The indexes are built on first access, so `teams` and `games` must
+    not be modified afterward. Copies made with `model_copy` build their own indexes.
+    """
+
+    # Indexes cached by the properties below
+    _indexes: ClassVar[tuple[str, ...]] = ("teams_by_name", "game_positions", "team_boxscores", "rival_boxscores")
 
     name: str
     season: str
@@ -121,3 +162,44 @@ class League(BaseModel):
 
     def __str__(self) -> str:
         return f"{self.name} - {self.season}"
+
+    def model_copy(self, *, update: Mapping[str, Any] | None = None, deep: bool = False) -> Self:
+        # The copy gets the `__dict__` of the league, cached indexes included, but `update` may replace its games
+        league = super().model_copy(update=update, deep=deep)
+        for index in self._indexes:
+            league.__dict__.pop(index, None)
+        return league
+
+    @cached_property
+    def teams_by_name(self) -> dict[str, Team]:
+        return {team.name: team for team in self.teams}
+
+    @cached_property
+    def game_positions(self) -> dict[str, list[int]]:
+        """Positions in `games` of the games played by each team."""
+        positions: dict[str, list[int]] = defaultdict(list)
+        for i, game in enumerate(self.games):
+            positions[game.home_team.name].append(i)
+            if game.away_team.name != game.home_team.name:
+                positions[game.away_team.name].append(i)
+        return dict(positions)
+
+    @cached_property
+    def team_boxscores(self) -> dict[str, list[Boxscore]]:
+        """Boxscores of each team, in the order of `games`."""
+        boxscores: dict[str, list[Boxscore]] = defaultdict(list)
+        for game in self.games:
+            boxscores[game.home_team.name].append(game.home_boxscore)
+            if game.away_team.name != game.home_team.name:
+                boxscores[game.away_team.name].append(game.away_boxscore)
+        return dict(boxscores)
+
+    @cached_property
+    def rival_boxscores(self) -> dict[str, list[Boxscore]]:
+        """Boxscores of the rivals of each team, in the order of `games`."""
+        boxscores: dict[str, list[Boxscore]] = defaultdict(list)
+        for game in self.games:
+            boxscores[game.home_team.name].append(game.away_boxscore)
+            if game.away_team.name != game.home_team.name:
+                boxscores[game.away_team.name].append(game.home_boxscore)
+        return dict(boxscores)
@@ -2,20 +2,20 @@ import numpy as np
 import pandas as pd
 
 from src.core.analysis.entities import Boxscore, Game, League, Team
+from src.core.analysis.store import BoxscoreStore, Layout
 from src.core.analysis.utils import get_averageable_numerical_columns
 
 
-# TODO: These ops should be done in a DB
 def get_team_by_name(league: League, team_name: str) -> Team:
     """Retrieves a team by name from a league.
     :param league: League to retrieve from.
     :param team_name: Name of the team to retrieve.
     :return: The retrieved team.
     """
-    for team in league.teams:
-        if team.name == team_name:
-            return team
-    raise Exception(f"Unable to find the team {team_name} in the league {league}")
+    try:
+        return league.teams_by_name[team_name]
+    except KeyError:
+        raise Exception(f"Unable to find the team {team_name} in the league {league}")
 
 
 def get_games_by_team(league: League, team: Team) -> list[Game]:
@@ -24,11 +24,7 @@ def get_games_by_team(league: League, team: Team) -> list[Game]:
     :param team: Team whose games will be retrieved.
     :return: List of games played by `team`.
     """
-    matching_games = []
-    for game in league.games:
-        if team in {game.home_team, game.away_team}:
-            matching_games.append(game)
-    return matching_games
+    return [league.games[i] for i in league.game_positions.get(team.name, [])]
 
 
 def get_team_boxscores(league: League, team: Team) -> list[Boxscore]:
@@ -37,9 +33,7 @@ def get_team_boxscores(league: League, team: Team) -> list[Boxscore]:
     :param team: Team whose boxscores will be retrieved.
     :return: List of boxscores of `team`.
     """
-    return [
-        game.home_boxscore if game.home_team == team else game.away_boxscore for game in get_games_by_team(league, team)
-    ]
+    return list(league.team_boxscores.get(team.name, []))
 
 
 def get_rival_boxscores(league: League, team: Team) -> list[Boxscore]:
@@ -48,8 +42,39 @@ def get_rival_boxscores(league: League, team: Team) -> list[Boxscore]:
     :param team: Team whose rival boxscores will be retrieved.
     :return: List of boxscores of the rivals of  `team`.
     """
+    return list(league.rival_boxscores.get(team.name, []))
+
+
+def pack_boxscores(boxscores: list[Boxscore]) -> list[Boxscore]:
+    """Moves the rows of a list of boxscores to a shared store, one per layout of columns.
+    :param boxscores: Boxscores to pack.
+    :return: Views of the same boxscores, in the same order, on the shared stores.
+    """
+    positions_by_layout: dict[Layout, list[int]] = {}
+    for i, boxscore in enumerate(boxscores):
+        positions_by_layout.setdefault(boxscore.store.layout, []).append(i)
+
+    packed_boxscores: list[Boxscore | None] = [None] * len(boxscores)
+    for positions in positions_by_layout.values():
+        store = BoxscoreStore.concat([(boxscores[i].store, boxscores[i].rows) for i in positions])
+        start = 0
+        for i in positions:
+            stop = start + (boxscores[i].rows.stop - boxscores[i].rows.start)
+            packed_boxscores[i] = boxscores[i].model_copy(update={"store": store, "rows": slice(start, stop)})
+            start = stop
+    return [boxscore for boxscore in packed_boxscores if boxscore is not None]
+
+
+def pack_games(games: list[Game]) -> list[Game]:
+    """Moves the boxscores of a list of games to a shared store, so a league holds a few arrays per column instead of
+    a dataframe per boxscore.
+    :param games: Games to pack.
+    :return: The same games, in the same order, with their boxscores on the shared store.
+    """
+    boxscores = pack_boxscores([boxscore for game in games for boxscore in (game.home_boxscore, game.away_boxscore)])
     return [
-        game.home_boxscore if game.home_team != team else game.away_boxscore for game in get_games_by_team(league, team)
+        game.model_copy(update={"home_boxscore": boxscores[2 * i], "away_boxscore": boxscores[2 * i + 1]})
+        for i, game in enumerate(games)
     ]
 
 
@@ -1,9 +1,12 @@
+import math
 from io import BytesIO
+from typing import Any
 
 import numpy as np
 import pandas as pd
-from openpyxl.styles import Alignment
-from openpyxl.utils import get_column_letter
+from xlsxwriter import Workbook
+from xlsxwriter.utility import xl_range, xl_rowcol_to_cell
+from xlsxwriter.worksheet import Worksheet
 
 from src.core.analysis.entities import League
 from src.core.analysis.entities_ops import average_games
@@ -15,32 +18,22 @@ HIGH_VALUES_COLOR = "yellow"
 LOW_VALUES_COLOR = "orange"
 VERY_LOW_VALUES_COLOR = "red"
 
-
-def gaussian_color_style(
-    s: pd.Series,
-    very_high_regime: str = f"background-color: {VERY_HIGH_VALUES_COLOR}; border: 1px solid",
-    high_regime: str = f"background-color: {HIGH_VALUES_COLOR}; border: 1px solid",
-    low_regime: str = f"background-color: {LOW_VALUES_COLOR}; border: 1px solid",
-    very_low_regime: str = f"background-color: {VERY_LOW_VALUES_COLOR}; border: 1px solid",
-    regular_regime: str = "border: 1px solid",
-) -> list[str]:
-    high_indices = np.where(s > s.mean() + s.std(), high_regime, regular_regime)
-    very_high_indices = np.where(s > s.mean() + 2 * s.std(), very_high_regime, regular_regime)
-    low_indices = np.where(s < s.mean() - s.std(), low_regime, regular_regime)
-    very_low_indices = np.where(s < s.mean() - 2 * s.std(), very_low_regime, regular_regime)
-    out_color = []
-    for i in range(len(high_indices)):
-        if very_high_indices[i] != regular_regime:
-            out_color.append(very_high_indices[i])
-            continue
-        if very_low_indices[i] != regular_regime:
-            out_color.append(very_low_indices[i])
-            continue
-        if high_indices[i] != regular_regime:
-            out_color.append(high_indices[i])
-            continue
-        out_color.append(low_indices[i])
-    return out_color
+EXCEL_COLORS = {
+    VERY_HIGH_VALUES_COLOR: "#008000",
+    HIGH_VALUES_COLOR: "#FFFF00",
+    LOW_VALUES_COLOR: "#FFA500",
+    VERY_LOW_VALUES_COLOR: "#FF0000",
+}
+# Number of standard deviations from the mean over (or under) which values are colored, by priority
+GAUSSIAN_COLOR_REGIMES = (
+    (2, VERY_HIGH_VALUES_COLOR),
+    (-2, VERY_LOW_VALUES_COLOR),
+    (1, HIGH_VALUES_COLOR),
+    (-1, LOW_VALUES_COLOR),
+)
+HEADER_FORMAT: dict[str, Any] = {"bold": True, "border": 1, "align": "center"}
+BODY_FORMAT: dict[str, Any] = {"align": "center"}
+MAX_SHEET_NAME_LENGTH = 31
 
 
 def format_minutes_column(df: pd.DataFrame) -> None:
@@ -48,22 +41,137 @@ def format_minutes_column(df: pd.DataFrame) -> None:
     if "minutes" not in df.columns:
         return
 
-    formatted_minutes = df["minutes"].map(lambda x: (timedelta_to_str(x, minute_format="02d")))
+    formatted_minutes = df["minutes"].map(lambda x: timedelta_to_str(x, minute_format="02d"))
     df["minutes"] = df["minutes"].astype("object")
     df["minutes"] = formatted_minutes
     return
 
 
+def add_gaussian_color_formats(
+    workbook: Workbook, worksheet: Worksheet, first_row: int, last_row: int, cols: list[int]
+) -> None:
+    """Colors column ranges of a worksheet with conditional formats, following `GAUSSIAN_COLOR_REGIMES`.
+    The z-score of each cell is computed by the spreadsheet from the mean and the standard deviation of its column
+    range, so a single rule per color covers all the columns.
+    :param workbook: Workbook of the worksheet.
+    :param worksheet: Worksheet to color.
+    :param first_row: First row of the ranges.
+    :param last_row: Last row of the ranges.
+    :param cols: Columns to color.
+    """
+    cell = xl_rowcol_to_cell(first_row, cols[0])
+    column_range = (
+        f"{xl_rowcol_to_cell(first_row, cols[0], row_abs=True)}:{xl_rowcol_to_cell(last_row, cols[0], row_abs=True)}"
+    )
+    z_score = f"({cell}-AVERAGE({column_range}))/STDEV({column_range})"
+    multi_range = " ".join(xl_range(first_row, col, last_row, col) for col in cols)
+    for n_stds, color in GAUSSIAN_COLOR_REGIMES:
+        worksheet.conditional_format(
+            first_row,
+            cols[0],
+            last_row,
+            cols[0],
+            {
+                "type": "formula",
+                # Blank and text cells are not compared: Excel would take them as 0 or as greater than any number
+                "criteria": f"=AND(ISNUMBER({cell}),{z_score}{'>' if n_stds > 0 else '<'}{n_stds})",
+                "format": workbook.add_format({"bg_color": EXCEL_COLORS[color], "border": 1}),
+                "stop_if_true": True,
+                "multi_range": multi_range,
+            },
+        )
+    worksheet.conditional_format(
+        first_row,
+        cols[0],
+        last_row,
+        cols[0],
+        {
+            "type": "formula",
+            "criteria": "=TRUE",
+            "format": workbook.add_format({"border": 1}),
+            "multi_range": multi_range,
+        },
+    )
+
+
+def to_excel_value(value: Any, float_format: str = "%.2f") -> Any:
+    """Converts a dataframe value to the value written to the xlsx, following the conventions of `pd.to_excel`.
+    :param value: Value to convert.
+    :param float_format: Format string of floating point numbers. The written numbers are rounded to that format.
+    :return: The converted value.
+    """
+    if isinstance(value, float | np.floating):
+        if math.isnan(value):
+            return None
+        if math.isinf(value):
+            return "inf" if value > 0 else "-inf"
+        return float(float_format % value)
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+def get_sheet_name(name: str, used_names: set[str]) -> str:
+    """Truncates a sheet name to the xlsx limit, making it unique among the already used names.
+    :param name: Desired sheet name.
+    :param used_names: Names of the sheets already in the workbook. The returned name is added to them.
+    :return: The sheet name.
+    """
+    sheet_name = name[:MAX_SHEET_NAME_LENGTH]
+    suffix = 1
+    while sheet_name.lower() in used_names:
+        sheet_name = f"{name[: MAX_SHEET_NAME_LENGTH - len(str(suffix))]}{suffix}"
+        suffix += 1
+    used_names.add(sheet_name.lower())
+    return sheet_name
+
+
+def write_df_to_sheet(
+    workbook: Workbook,
+    sheet_name: str,
+    df: pd.DataFrame,
+    columns: list[str],
+    header: list[str],
+    colored_columns: list[str] | None = None,
+    col_width: int = 60,
+) -> None:
+    """Writes a dataframe to a new worksheet, with the index as first column and a header row.
+    The body alignment is set once per column range and colors are conditional formats of each column range, so only
+    the header and the index cells have their own format.
+    :param workbook: Workbook to write into.
+    :param sheet_name: Name of the new worksheet.
+    :param df: Dataframe to write.
+    :param columns: Columns of the dataframe to write, in order.
+    :param header: Header of each column.
+    :param colored_columns: Columns colored according to `GAUSSIAN_COLOR_REGIMES`.
+    :param col_width: Width of the index column.
+    """
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = workbook.add_format(HEADER_FORMAT)
+    worksheet.set_column(0, 0, col_width)
+    worksheet.set_column(1, len(columns), None, workbook.add_format(BODY_FORMAT))
+    worksheet.set_row(0, 40)
+    worksheet.write_row(0, 0, [df.index.name or "", *header], header_format)
+
+    column_values = [df[column].tolist() for column in columns]
+    for i, index_value in enumerate(df.index.tolist()):
+        row = i + 1
+        worksheet.write(row, 0, to_excel_value(index_value), header_format)
+        worksheet.write_row(row, 1, [to_excel_value(values[i]) for values in column_values])
+
+    colored_cols = [j for j, column in enumerate(columns, start=1) if column in (colored_columns or [])]
+    if colored_cols and len(df):
+        add_gaussian_color_formats(workbook, worksheet, 1, len(df), colored_cols)
+
+
 def league_to_xlsx(
     league: League,
-    filename: str | None = None,
     col_width: int = 60,
     export_language: str = "es",
     export_colors: bool = False,
 ) -> bytes:
-    """Exports a league to xlsx.
+    """Exports a league to xlsx. The workbook is streamed, row by row, into an in-memory buffer.
     :param league: League to be exported.
-    :param filename: Name of the file to be written.
     :param col_width: Column width.
     :param export_language: Export the league in different languages. Currently, only 'es' or 'en' supported.
     :param export_colors: Add a color style to the output xlsx file.
@@ -72,13 +180,15 @@ def league_to_xlsx(
 
     if league.aggregated_games is None:
         raise ValueError(f"The league {league} has no aggregated games.")
-    filename = filename or f'{league.name}_{league.season.replace("/", "-")}.xlsx'
-
-    xlsx_writer = pd.ExcelWriter(filename, engine="openpyxl", mode="w", date_format="DD-MM-YYYY")
 
-    sheet_name = f'{league.name}_{league.season.replace("/", "-")}'
+    virtual_workbook = BytesIO()
+    workbook = Workbook(
+        virtual_workbook,
+        {"in_memory": True, "constant_memory": True, "strings_to_formulas": False, "strings_to_urls": False},
+    )
+    sheet_names: set[str] = set()
+    sheet_name = f"{league.name}_{league.season.replace('/', '-')}"
     columns = get_sorted_list_of_columns()
-
     aggregated_games = league.aggregated_games.loc[:, columns]
     aggregated_games = aggregated_games.set_index("team")
     columns.pop(columns.index("team"))
@@ -90,43 +200,20 @@ def league_to_xlsx(
     averaged_games.loc[:, "minutes"] = averaged_games["minutes"].apply(
         lambda x: timedelta_to_str(x) if not pd.isnull(x) else ""
     )
-    numerical_columns = list(
-        set(aggregated_games.columns)
-        - {
-            "mode",
-            "minutes",
-        }
-    )
-    if export_colors:
-        aggregated_games = aggregated_games.style.apply(
-            gaussian_color_style,
-            subset=numerical_columns,
-            axis=0,
-        )
-
-        averaged_games = averaged_games.style.apply(
-            gaussian_color_style,
-            subset=numerical_columns,
-            axis=0,
-        )
+    numerical_columns = list(set(aggregated_games.columns) - {"mode", "minutes"}) if export_colors else None
     column_names = list(map(lambda x: spanish_columns[x], columns) if export_language == "es" else columns)
     column_names = list(map(lambda x: "\n".join(x.split()), column_names))
 
-    aggregated_games.to_excel(
-        xlsx_writer,
-        float_format="%.2f",
-        columns=columns,
-        header=column_names,
-        sheet_name=sheet_name,
-    )
-
-    averaged_games.to_excel(
-        xlsx_writer,
-        float_format="%.2f",
-        columns=columns,
-        header=column_names,
-        sheet_name=f"Medias {sheet_name}",
-    )
+    for df, df_sheet_name in ((aggregated_games, sheet_name), (averaged_games, f"Medias {sheet_name}")):
+        write_df_to_sheet(
+            workbook,
+            get_sheet_name(df_sheet_name, sheet_names),
+            df,
+            columns=columns,
+            header=column_names,
+            colored_columns=numerical_columns,
+            col_width=col_width,
+        )
 
     player_columns = get_sorted_list_of_columns(individual_columns=True)
     player_column_names = list(
@@ -139,44 +226,24 @@ def league_to_xlsx(
             averaged_team_season_games = average_games(aggregated_team_season_games.copy(), individual_columns=True)
             format_minutes_column(aggregated_team_season_games)
             format_minutes_column(averaged_team_season_games)
-            numerical_columns = list(
-                set(aggregated_team_season_games.columns) - {"mode", "minutes", "player", "number"}
+            numerical_columns = (
+                list(set(aggregated_team_season_games.columns) - {"mode", "minutes", "player", "number"})
+                if export_colors
+                else None
             )
-            if export_colors:
-                aggregated_team_season_games = aggregated_team_season_games.style.apply(
-                    gaussian_color_style,
-                    subset=numerical_columns,
-                    axis=0,
-                )
-
-                averaged_team_season_games = averaged_team_season_games.style.apply(
-                    gaussian_color_style,
-                    subset=numerical_columns,
-                    axis=0,
+            for df, df_sheet_name in (
+                (aggregated_team_season_games, team.name),
+                (averaged_team_season_games, f"Medias {team.name}"),
+            ):
+                write_df_to_sheet(
+                    workbook,
+                    get_sheet_name(df_sheet_name, sheet_names),
+                    df,
+                    columns=player_columns,
+                    header=player_column_names,
+                    colored_columns=numerical_columns,
+                    col_width=col_width,
                 )
-            aggregated_team_season_games.to_excel(
-                xlsx_writer,
-                float_format="%.2f",
-                columns=player_columns,
-                header=player_column_names,
-                sheet_name=team.name[:31],
-            )
-            averaged_team_season_games.to_excel(
-                xlsx_writer,
-                float_format="%.2f",
-                columns=player_columns,
-                header=player_column_names,
-                sheet_name=f"Medias {team.name}"[:31],
-            )
 
-    center_alignment = Alignment(horizontal="center")
-    for n_sheet, (worksheet_name, worksheet) in enumerate(xlsx_writer.sheets.items()):
-        for row in worksheet.iter_rows():
-            for cell in row:
-                cell.alignment = center_alignment
-        worksheet.column_dimensions[get_column_letter(1)].width = col_width
-        worksheet.row_dimensions[1].height = 40
-    virtual_workbook = BytesIO()
-    xlsx_writer.book.save(virtual_workbook)
-    virtual_workbook.seek(0)
-    return virtual_workbook.read()
+    workbook.close()
+    return virtual_workbook.getvalue()
@@ -0,0 +1,257 @@
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Column names and dtypes of a store, plus its object timedelta and interned columns. Stores with equal layouts can be
+# concatenated without conversions.
+Layout = tuple[tuple[tuple[str, np.dtype], ...], frozenset[str], frozenset[str]]
+
+# Columns of names that are stored as integer ids of a `NameTable`
+INTERNED_COLUMNS = frozenset({"player"})
+
+
+class NameTable:
+    """Interning table of names: each distinct name gets an integer id, in order of appearance."""
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self.names: list[str] = []
+        self.ids: dict[str, int] = {}
+        # Arrays derived from `names`, built on demand and reset when a name is added
+        self._array: np.ndarray | None = None
+        self._sorted_ids: np.ndarray | None = None
+        self._ranks: np.ndarray | None = None
+        self.intern(names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def intern(self, names: Iterable[str]) -> np.ndarray:
+        """Gets the ids of a sequence of names, adding the new names to the table.
+        :param names: Names to intern.
+        :return: The id of each name.
+        """
+        ids = []
+        for name in names:
+            name_id = self.ids.get(name)
+            if name_id is None:
+                name_id = self.ids[name] = len(self.names)
+                self.names.append(name)
+                self._array = self._sorted_ids = self._ranks = None
+            ids.append(name_id)
+        return np.array(ids, dtype=np.int32)
+
+    def lookup(self, ids: np.ndarray) -> np.ndarray:
+        """Gets the names of a sequence of ids.
+        :param ids: Ids to look up.
+        :return: Object array with the name of each id.
+        """
+        if self._array is None:
+            self._array = np.empty(len(self.names), dtype=object)
+            self._array[:] = self.names
+        looked_up: np.ndarray = self._array[ids]
+        return looked_up
+
+    @property
+    def sorted_ids(self) -> np.ndarray:
+        """Ids of the names, sorted by name."""
+        if self._sorted_ids is None:
+            self._sorted_ids = np.array(sorted(range(len(self.names)), key=self.names.__getitem__), dtype=np.int32)
+        return self._sorted_ids
+
+    @property
+    def ranks(self) -> np.ndarray:
+        """Position of each id in `sorted_ids`."""
+        if self._ranks is None:
+            self._ranks = np.empty(len(self.names), dtype=np.int32)
+            self._ranks[self.sorted_ids] = np.arange(len(self.names), dtype=np.int32)
+        return self._ranks
+
+
+class BoxscoreStore:
+    """Columnar store of the rows of one or more boxscores.
+
+    Each column is kept in a single contiguous NumPy array, so the boxscores of a whole league share a few arrays
+    instead of holding a DataFrame each. A `Boxscore` is a view of a range of rows of a store.
+    Columns of `Timedelta` objects are kept as `timedelta64` arrays, and the names of `INTERNED_COLUMNS` as int32 ids
+    of the `names` table of the store. Both are turned back into objects only in the frames.
+    """
+
+    def __init__(
+        self,
+        columns: dict[str, np.ndarray],
+        object_timedeltas: frozenset[str] = frozenset(),
+        interned: frozenset[str] = frozenset(),
+        names: NameTable | None = None,
+    ) -> None:
+        self.columns = columns
+        self.object_timedeltas = object_timedeltas
+        self.interned = interned
+        self.names = names if names is not None else NameTable()
+        self.n_rows = len(next(iter(columns.values()))) if columns else 0
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, names: NameTable | None = None) -> "BoxscoreStore":
+        """Builds a store from the columns of a dataframe. A named index is stored as a column.
+        :param df: Dataframe to store.
+        :param names: Table to intern the names in. By default, the store gets a table of its own.
+        :return: The store.
+        """
+        if df.index.name is not None:
+            df = df.reset_index()
+        names = names if names is not None else NameTable()
+        columns = {}
+        object_timedeltas = set()
+        interned = set()
+        for name, s in df.items():
+            name = str(name)
+            if s.dtype == object and len(s) and pd.api.types.infer_dtype(s, skipna=False) == "timedelta":
+                columns[name] = pd.to_timedelta(s).to_numpy()
+                object_timedeltas.add(name)
+            elif name in INTERNED_COLUMNS and s.dtype == object and pd.api.types.infer_dtype(s) in ("string", "empty"):
+                columns[name] = names.intern(s)
+                interned.add(name)
+            else:
+                columns[name] = s.to_numpy()
+        return cls(columns, frozenset(object_timedeltas), frozenset(interned), names)
+
+    @classmethod
+    def concat(cls, parts: list[tuple["BoxscoreStore", slice]], names: NameTable | None = None) -> "BoxscoreStore":
+        """Concatenates row ranges of stores. All of them must have the same columns, in any order. Columns with
+        different dtypes are promoted to a common one.
+        :param parts: Stores and rows of each of them to concatenate.
+        :param names: Table of the new store. By default, the table of the stores if they all share one, or a new one.
+        :return: A new store with the rows of `parts`, in the same order.
+        """
+        first_store = parts[0][0]
+        for store, _ in parts[1:]:
+            if store.columns.keys() != first_store.columns.keys():
+                raise ValueError("Boxscores with different columns cannot be concatenated.")
+        if names is None:
+            shared_names = all(store.names is first_store.names for store, _ in parts)
+            names = first_store.names if shared_names else NameTable()
+        if names is first_store.names and all(store is first_store for store, _ in parts):
+            # Rows of a single store, e.g. of the boxscores of a team in a league: a single take per column
+            index = np.concatenate([np.arange(*rows.indices(len(first_store))) for _, rows in parts])
+            columns = {name: values[index] for name, values in first_store.columns.items()}
+            return cls(columns, first_store.object_timedeltas, first_store.interned, names)
+
+        interned = frozenset.intersection(*(store.interned for store, _ in parts))
+        # Ids in the new table of the names used by each part, so the new table only gets the names of its rows
+        id_maps: list[np.ndarray | None] = []
+        for store, rows in parts:
+            if store.names is names:
+                id_maps.append(None)
+                continue
+            ids = [store.columns[name][rows] for name in interned]
+            used_ids = np.unique(np.concatenate(ids)) if ids else np.empty(0, dtype=np.int32)
+            id_map = np.zeros(len(store.names), dtype=np.int32)
+            id_map[used_ids] = names.intern(store.names.names[i] for i in used_ids)
+            id_maps.append(id_map)
+        columns = {}
+        for name in first_store.columns:
+            if name in interned:
+                values = [
+                    store.columns[name][rows] if id_map is None else id_map[store.columns[name][rows]]
+                    for (store, rows), id_map in zip(parts, id_maps)
+                ]
+            else:
+                values = [store.get_values(name, rows) for store, rows in parts]
+            columns[name] = np.concatenate(values)
+        object_timedeltas = frozenset.intersection(*(store.object_timedeltas for store, _ in parts))
+        return cls(columns, object_timedeltas, interned, names)
+
+    def get_values(self, name: str, rows: slice) -> np.ndarray:
+        """Values of a range of rows of a column, with the interned names looked up.
+        :param name: Name of the column.
+        :param rows: Rows to get.
+        :return: The values.
+        """
+        if name in self.interned:
+            return self.names.lookup(self.columns[name][rows])
+        return self.columns[name][rows]
+
+    @property
+    def layout(self) -> Layout:
+        columns = tuple((name, values.dtype) for name, values in self.columns.items())
+        return columns, self.object_timedeltas, self.interned
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the arrays of the store. The strings of the object columns and of the names are not included."""
+        return sum(values.nbytes for values in self.columns.values())
+
+    def to_frame(self, rows: slice, index: str | None = None) -> pd.DataFrame:
+        """Builds a dataframe with a range of rows of the store. The dataframe does not share memory with the store.
+        :param rows: Rows to include.
+        :param index: Column to use as the index of the dataframe, if any.
+        :return: The dataframe.
+        """
+        data: dict[str, Any] = {}
+        for name, values in self.columns.items():
+            if name in self.object_timedeltas:
+                data[name] = pd.Series(pd.TimedeltaIndex(values[rows]), dtype=object)
+            else:
+                data[name] = self.get_values(name, rows)
+        df = pd.DataFrame(data, copy=True)
+        if index is not None:
+            df = df.set_index(index)
+        return df
+
+    def group_sum(self, by: str) -> "BoxscoreStore":
+        """Adds the rows of each value of a column, sorted by that value. Integer columns are added as int64 to avoid
+        overflows, and missing numbers and durations count as zero. The last non-null `'number'` of each group is kept
+        and `'minutes'` are added as durations. Both are moved to the end of the columns.
+        Interned names are grouped by their ids, sorted by name, and are not looked up.
+        :param by: Column to group by.
+        :return: A new store with a row per value of `by`.
+        """
+        if by in self.interned:
+            ranks, inverse = np.unique(self.names.ranks[self.columns[by]], return_inverse=True)
+            keys = self.names.sorted_ids[ranks]
+        else:
+            keys, inverse = np.unique(self.columns[by], return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(np.bincount(inverse, minlength=len(keys)))[:-1]])
+        grouped = inverse[order]
+
+        columns: dict[str, np.ndarray] = {by: keys}
+        for name in self.columns:
+            if name not in (by, "number", "minutes"):
+                columns[name] = self._sum_groups(self.get_values(name, slice(None))[order], grouped, starts)
+        if "number" in self.columns:
+            columns["number"] = self._last_valid(self.get_values("number", slice(None))[order], starts)
+        if "minutes" in self.columns:
+            columns["minutes"] = self._sum_groups(
+                self.columns["minutes"][order].astype("timedelta64[ns]"), grouped, starts
+            )
+        return BoxscoreStore(columns, interned=self.interned & {by}, names=self.names)
+
+    @staticmethod
+    def _sum_groups(values: np.ndarray, groups: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        if values.dtype.kind in "biu":
+            return np.add.reduceat(values.astype(np.int64), starts)
+        if values.dtype.kind == "f":
+            return np.add.reduceat(np.where(np.isnan(values), 0, values), starts)
+        if values.dtype.kind == "m":
+            int_values = values.view(np.int64)
+            int_values = np.where(np.isnat(values), 0, int_values)
+            return np.add.reduceat(int_values, starts).view(values.dtype)
+        # Any other column (e.g. of strings) is added as pandas would do
+        summed: np.ndarray = pd.Series(values).groupby(groups, sort=True).sum().to_numpy()
+        return summed
+
+    @staticmethod
+    def _last_valid(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        positions = np.where(pd.isnull(values), -1, np.arange(len(values)))
+        last_positions = np.maximum.reduceat(positions, starts)
+        last_values = np.empty(len(starts), dtype=values.dtype)
+        valid = last_positions >= starts
+        last_values[valid] = values[last_positions[valid]]
+        if not valid.all():
+            last_values[~valid] = None if values.dtype == object else np.nan
+        return last_values
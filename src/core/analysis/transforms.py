@@ -1,9 +1,10 @@
-import functools
+from collections.abc import Iterable
 
 import pandas as pd
 
-from src.core.analysis.entities import Boxscore, League, Team
-from src.core.analysis.entities_ops import get_rival_boxscores, get_team_boxscores
+from src.core.analysis.entities import Boxscore, Game, League, Team
+from src.core.analysis.entities_ops import get_rival_boxscores, get_team_boxscores, pack_games
+from src.core.analysis.store import BoxscoreStore
 from src.core.analysis.utils import timedelta_to_minutes
 
 
@@ -122,16 +123,61 @@ def sum_boxscores(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
 
 def aggregate_boxscores(boxscores: list[Boxscore]) -> Boxscore:
     """Reduces a list of Boxscores by summation. Set `'player'` as the index of the output Boxscore.
+    The rows of each player are added with array operations on the stores of the boxscores: the last non-null
+    `'number'` of each player is kept and `'minutes'` are added as timedeltas.
     :param boxscores: List of Boxscores to sum.
     :return: A Boxscore as the sum of `boxscores`.
     """
     if not boxscores:
         raise ValueError("Boxscores cannot be empty.")
-    all_dfs = [boxscore.boxscore.set_index("player") for boxscore in boxscores]
-    agg_df = functools.reduce(lambda df1, df2: sum_boxscores(df1, df2), all_dfs)
+    if len(boxscores) == 1:
+        return boxscores[0].model_copy(update={"index": "player"})
+    store = BoxscoreStore.concat([(boxscore.store, boxscore.rows) for boxscore in boxscores]).group_sum("player")
     team = boxscores[0].team
     scores = sum(bs.score for bs in boxscores)
-    return Boxscore(boxscore=agg_df, team=team, score=scores)
+    return Boxscore(store=store, rows=slice(0, len(store)), index="player", team=team, score=scores)
+
+
+def compute_team_aggregates(team: Team, own_boxscore: Boxscore, rivals_boxscore: Boxscore) -> tuple[Team, pd.DataFrame]:
+    """Computes the season stats of a team and its players from its aggregated boxscores.
+    :param team: Team to compute the stats for.
+    :param own_boxscore: Sum of the boxscores of `team`, indexed by player.
+    :param rivals_boxscore: Sum of the boxscores of the rivals of `team`, indexed by player.
+    :return: The team with its players season stats, and a single-row dataframe with the team season stats.
+    """
+    team_df = compute_oer(own_boxscore.to_frame())
+    team_df = compute_shots_percentage(team_df)
+    team_df = compute_volumes(team_df)
+    total_team_df = team_df.index.isin(["Total"])
+    players_df = team_df.loc[~total_team_df, :]
+
+    aggregated_team = Team(name=team.name, season_stats=players_df)
+
+    team_df = team_df.loc["Total", :].copy()
+
+    rivals_df = compute_der(rivals_boxscore.to_frame())
+
+    team_df.loc["der"] = rivals_df.loc["Total", "der"]
+    team_df.loc["team"] = team.name
+    team_df.loc["points_received"] = rivals_df.loc["Total", "points_made"]
+    team_df.pop("number")
+    team_df = team_df.reset_index().transpose()
+    team_df.columns = team_df.loc["index"]
+    team_df = team_df.drop(["index"])
+    return aggregated_team, team_df
+
+
+def concat_team_aggregates(teams_dfs: list[pd.DataFrame]) -> pd.DataFrame:
+    """Builds the aggregated games of a league from the single-row dataframes of its teams.
+    :param teams_dfs: Team season stats, as returned by `compute_team_aggregates`.
+    :return: Dataframe with a row per team.
+    """
+    aggregated_games_df = pd.DataFrame()
+    for team_df in teams_dfs:
+        aggregated_games_df = pd.concat([aggregated_games_df, team_df])
+    aggregated_games_df = aggregated_games_df.reset_index()
+    aggregated_games_df = aggregated_games_df.rename(columns={"index": "mode"})
+    return aggregated_games_df
 
 
 def compute_league_aggregates(league: League) -> League:
@@ -139,40 +185,124 @@ def compute_league_aggregates(league: League) -> League:
     :param league: League to aggregate the results.
     :return: League with the aggregated games.
     """
-    aggregated_games_df = pd.DataFrame()
+    teams_dfs = []
     aggregated_league_teams: list[Team] = []
     for team in league.teams:
-        team_boxscores = get_team_boxscores(league, team)
-        own_df = aggregate_boxscores(team_boxscores)
-        team_df = compute_oer(own_df.boxscore)
-        team_df = compute_shots_percentage(team_df)
-        team_df = compute_volumes(team_df)
-        total_team_df = team_df.index.isin(["Total"])
-        players_df = team_df.loc[~total_team_df, :]
-
-        aggregated_league_teams.append(Team(name=team.name, season_stats=players_df))
-
-        team_df = team_df.loc["Total", :].copy()
-
-        rivals_boxscores = aggregate_boxscores(get_rival_boxscores(league, team))
-        rivals_df = compute_der(rivals_boxscores.boxscore)
-
-        team_df.loc["der"] = rivals_df.loc["Total", "der"]
-        team_df.loc["team"] = team.name
-        team_df.loc["points_received"] = rivals_df.loc["Total", "points_made"]
-        team_df.pop("number")
-        team_df = team_df.reset_index().transpose()
-        team_df.columns = team_df.loc["index"]
-        team_df = team_df.drop(["index"])
-        aggregated_games_df = pd.concat([aggregated_games_df, team_df])
-
-    aggregated_games_df = aggregated_games_df.reset_index()
-    aggregated_games_df = aggregated_games_df.rename(columns={"index": "mode"})
+        own_boxscore = aggregate_boxscores(get_team_boxscores(league, team))
+        rivals_boxscore = aggregate_boxscores(get_rival_boxscores(league, team))
+        aggregated_team, team_df = compute_team_aggregates(team, own_boxscore, rivals_boxscore)
+        aggregated_league_teams.append(aggregated_team)
+        teams_dfs.append(team_df)
 
     return League(
         name=league.name,
         season=league.season,
         teams=aggregated_league_teams,
         games=league.games,
-        aggregated_games=aggregated_games_df,
+        aggregated_games=concat_team_aggregates(teams_dfs),
     )
+
+
+class LeagueAggregator:
+    """Incrementally aggregates the games of a league.
+
+    Keeps the running sum of the boxscores of every team and of its rivals, so adding a game only updates the two
+    teams that played it. `to_league` produces the same result as `compute_league_aggregates` on the same games.
+    """
+
+    def __init__(self, name: str, season: str) -> None:
+        self.name = name
+        self.season = season
+        self.games: list[Game] = []
+        self.teams: dict[str, Team] = {}
+        self._own_boxscores: dict[str, Boxscore] = {}
+        self._rivals_boxscores: dict[str, Boxscore] = {}
+        self._team_aggregates: dict[str, tuple[Team, pd.DataFrame]] = {}
+
+    @classmethod
+    def from_league(cls, league: League) -> "LeagueAggregator":
+        """Builds an aggregator from the games of a league, keeping the order of its teams.
+        :param league: League to aggregate.
+        :return: The aggregator.
+        """
+        aggregator = cls(name=league.name, season=league.season)
+        for team in league.teams:
+            aggregator.teams[team.name] = Team(name=team.name)
+        aggregator.add_games(league.games)
+        return aggregator
+
+    @staticmethod
+    def _accumulate(accumulated: Boxscore | None, boxscore: Boxscore) -> Boxscore:
+        return aggregate_boxscores([boxscore] if accumulated is None else [accumulated, boxscore])
+
+    def add_game(self, game: Game) -> None:
+        """Adds a game to the aggregates. Only the stats of the teams playing `game` are invalidated.
+        :param game: Game to add.
+        """
+        self.games.append(game)
+        for own, rival in ((game.home_boxscore, game.away_boxscore), (game.away_boxscore, game.home_boxscore)):
+            team_name = own.team.name
+            self.teams.setdefault(team_name, Team(name=team_name))
+            self._own_boxscores[team_name] = self._accumulate(self._own_boxscores.get(team_name), own)
+            self._rivals_boxscores[team_name] = self._accumulate(self._rivals_boxscores.get(team_name), rival)
+            self._team_aggregates.pop(team_name, None)
+
+    def add_games(self, games: list[Game]) -> None:
+        """Adds a list of games to the aggregates.
+        :param games: Games to add.
+        """
+        for game in games:
+            self.add_game(game)
+
+    def get_team_aggregates(self, team_name: str) -> tuple[Team, pd.DataFrame]:
+        """Retrieves the season stats of a team, computing them only if a game of the team was added.
+        :param team_name: Name of the team.
+        :return: The team with its players season stats, and a single-row dataframe with the team season stats.
+        """
+        if team_name not in self._team_aggregates:
+            if team_name not in self._own_boxscores:
+                raise ValueError(f"The team {team_name} has no games in the league {self.name} - {self.season}.")
+            self._team_aggregates[team_name] = compute_team_aggregates(
+                self.teams[team_name],
+                self._own_boxscores[team_name],
+                self._rivals_boxscores[team_name],
+            )
+        return self._team_aggregates[team_name]
+
+    def to_league(self) -> League:
+        """Builds the aggregated league. Teams without games are left out.
+        :return: League with the aggregated games.
+        """
+        if not self.games:
+            raise ValueError(f"The league {self.name} - {self.season} has no games.")
+        aggregated_league_teams = []
+        teams_dfs = []
+        for team_name in self.teams:
+            if team_name not in self._own_boxscores:
+                continue
+            aggregated_team, team_df = self.get_team_aggregates(team_name)
+            aggregated_league_teams.append(aggregated_team)
+            teams_dfs.append(team_df)
+        return League(
+            name=self.name,
+            season=self.season,
+            teams=aggregated_league_teams,
+            games=pack_games(self.games),
+            aggregated_games=concat_team_aggregates(teams_dfs),
+        )
+
+
+def aggregate_games(games: Iterable[Game]) -> League:
+    """Aggregates the games of a league as they are consumed from `games`: each game is added to the aggregates as soon
+    as it is available, so a stream of games (e.g. being downloaded and parsed) is aggregated while it is received.
+    :param games: Games of the league.
+    :return: League with the aggregated games, named after the first game.
+    """
+    aggregator: LeagueAggregator | None = None
+    for game in games:
+        if aggregator is None:
+            aggregator = LeagueAggregator(name=game.league, season=game.season)
+        aggregator.add_game(game)
+    if aggregator is None:
+        raise ValueError("No games found in the boxscores.")
+    return aggregator.to_league()
@@ -1,5 +1,6 @@
 import json
 from base64 import b64decode
+from collections.abc import Iterable
 from io import BytesIO
 from typing import Any
 
@@ -8,8 +9,9 @@ from openpyxl import load_workbook
 
 from src.core.analysis.saving import league_to_xlsx
 from src.core.analysis.transforms import compute_league_aggregates
+from src.core.parsers.cache import GameCache
 from src.core.parsers.parsers import FEBLivescoreParser
-from src.core.scrapers.actions import read_boxscores_from_calendar_url
+from src.core.scrapers.actions import iter_boxscores_from_calendar_url
 
 
 class Command(BaseCommand):
@@ -23,40 +25,66 @@ class Command(BaseCommand):
         group.add_argument("--season", action="store", type=str, dest="season")
         group.add_argument("--group-id", action="store", type=str, dest="group_id")
         group.add_argument("--output", action="store", type=str, dest="output")
+        parser.add_argument("--n-workers", action="store", type=int, dest="n_workers", default=1)
+        parser.add_argument("--cache-dir", action="store", type=str, dest="cache_dir", default=None)
         return
 
-    def export_boxscores_from_files(self, boxscores: list[str]) -> bytes:
+    def export_boxscores_from_files(
+        self, boxscores: list[str], n_workers: int = 1, cache: GameCache | None = None
+    ) -> bytes:
         """Export a league to xlsx format from a list of boxscores.
         :param boxscores: The list of boxscore files to read.
+        :param n_workers: Number of processes used to parse the boxscores.
+        :param cache: Cache of parsed games. If set, the files are read as bytes so they can be looked up.
         :return: xlsx file as bytes.
         """
-        league = FEBLivescoreParser.parse_boxscores(boxscores, reader_fn=FEBLivescoreParser.read_link_file)
+        if cache is not None:
+            boxscores_bytes = []
+            for boxscore in boxscores:
+                with open(boxscore, mode="rb") as f:
+                    boxscores_bytes.append(f.read())
+            return self.export_boxscores_from_bytes(boxscores_bytes, n_workers, cache)
+        league = FEBLivescoreParser.parse_boxscores(
+            boxscores, reader_fn=FEBLivescoreParser.read_link_file, n_workers=n_workers
+        )
         new_league = compute_league_aggregates(league)
         return league_to_xlsx(new_league)
 
-    def export_boxscores_from_bytes(self, boxscores: list[bytes]) -> bytes:
+    def export_boxscores_from_bytes(
+        self, boxscores: Iterable[bytes], n_workers: int = 1, cache: GameCache | None = None
+    ) -> bytes:
         """Export a league to xlsx format from a list of boxscores.
-        :param boxscores: The list of boxscores to read.
+        :param boxscores: The list (or stream) of boxscores to read.
+        :param n_workers: Number of processes used to parse the boxscores.
+        :param cache: Cache of parsed games.
         :return: xlsx file as bytes.
         """
-        league = FEBLivescoreParser.parse_boxscores(boxscores, FEBLivescoreParser.read_link_bytes)
+        league = FEBLivescoreParser.parse_boxscores(
+            boxscores, FEBLivescoreParser.read_link_bytes, n_workers=n_workers, cache=cache
+        )
         new_league = compute_league_aggregates(league)
         return league_to_xlsx(new_league)
 
     def handle(self, *args: Any, **options: Any) -> None:
+        cache = GameCache(options["cache_dir"]) if options["cache_dir"] is not None else None
         if options["data_files"]:
-            excel_data = self.export_boxscores_from_files(options["data_files"])
+            excel_data = self.export_boxscores_from_files(options["data_files"], options["n_workers"], cache)
         elif options["calendar_url"] is not None:
-            boxscores_bytes = read_boxscores_from_calendar_url(
+            # Boxscores are parsed while the rest of them are being downloaded.
+            boxscores_bytes = iter_boxscores_from_calendar_url(
                 options["calendar_url"], options["season"], options["group_id"]
             )
-            excel_data = self.export_boxscores_from_bytes(boxscores_bytes)
+            excel_data = self.export_boxscores_from_bytes(boxscores_bytes, options["n_workers"], cache)
         elif options["data"] is not None:
             with open(options["data"], mode="rb") as f:
                 data = json.load(f)
-            excel_data = self.export_boxscores_from_bytes([b64decode(d) for d in data["boxscores"]])
+            excel_data = self.export_boxscores_from_bytes(
+                [b64decode(d) for d in data["boxscores"]], options["n_workers"], cache
+            )
         else:
             raise ValueError("Either --data, --data-files or --calendar-url must be specified.")
+        if cache is not None:
+            self.stdout.write(f"Parsed games cache: {cache.hits} hits, {cache.misses} misses.")
         wb = load_workbook(filename=BytesIO(excel_data))
         wb.save(options["output"])
         exit(0)
@@ -0,0 +1,161 @@
+import functools
+import hashlib
+import importlib.util
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+
+from src.core.analysis.entities import Game
+
+# Modules that define how the games are parsed and pickled: the entities, and the parsers that fill them
+PARSER_MODULES = (
+    "src.core.analysis.entities",
+    "src.core.analysis.store",
+    "src.core.analysis.validation_functions",
+    "src.core.parsers.helpers",
+    "src.core.parsers.parsers",
+    "src.core.parsers.transforms",
+)
+
+
+@functools.cache
+def get_parser_version(modules: tuple[str, ...] = PARSER_MODULES) -> str:
+    """Computes the version of the parsed games, as the hash of the source code of the modules that produce them. Any
+    change to those modules invalidates the games parsed before it.
+    :param modules: Names of the modules.
+    :return: The version, as a short hex digest.
+    """
+    digest = hashlib.sha256()
+    for module in modules:
+        spec = importlib.util.find_spec(module)
+        if spec is None or spec.origin is None:
+            raise ModuleNotFoundError(f"The source of {module} could not be found.")
+        digest.update(Path(spec.origin).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class GameCache:
+    """Persistent on-disk cache of parsed games, keyed by the hash of the raw boxscore bytes and the version of the
+    parser (see `get_parser_version`).
+
+    The least recently used entries are evicted when the cache grows over `max_size` bytes. The folder may be shared
+    by several processes: each one reads the size of the folder again once it has written `max_size / 16` bytes, so
+    the cache may exceed `max_size` by that much per process.
+    """
+
+    extension = ".pkl"
+
+    def __init__(self, cache_dir: str | Path, max_size: int = 512 * 1024 * 1024) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size = sum(path.stat().st_size for path in self._entries())
+        # Bytes written since the size was read from the folder, which other processes may write to as well
+        self._written = 0
+
+    @staticmethod
+    def key(boxscore: bytes) -> str:
+        """Computes the cache key of a raw boxscore. Entries of older versions of the parser are never read, and end
+        up being evicted.
+        :param boxscore: Raw boxscore HTML.
+        :return: The version of the parser and the hex digest of the boxscore.
+        """
+        return f"{get_parser_version()}-{hashlib.sha256(boxscore).hexdigest()}"
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _entries(self) -> list[Path]:
+        return list(self.cache_dir.glob(f"*{self.extension}"))
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.extension}"
+
+    def get(self, key: str) -> Game | None:
+        """Retrieves a parsed game from the cache.
+        :param key: Key of the boxscore.
+        :return: The cached game, or None if it is not in the cache.
+        """
+        path = self._path(key)
+        game = None
+        try:
+            with open(path, mode="rb") as f:
+                game = pickle.load(f)
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # Corrupt entries, or entries that cannot be loaded by this version of the code, are discarded
+            game = None
+            self._remove(path)
+        if not isinstance(game, Game):
+            if game is not None:
+                self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return game
+
+    def put(self, key: str, game: Game) -> None:
+        """Stores a parsed game in the cache, evicting the least recently used games if needed.
+        :param key: Key of the boxscore.
+        :param game: Parsed game to store.
+        """
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode="wb") as f:
+                pickle.dump(game, f, protocol=pickle.HIGHEST_PROTOCOL)
+            old_size = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Temporary files are not entries, so they would never be evicted
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            new_size = path.stat().st_size
+            self._size += new_size - old_size
+            self._written += new_size
+            if self._size > self.max_size or self._written > self.max_size // 16:
+                self._evict()
+
+    def _remove(self, path: Path) -> None:
+        with self._lock:
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except OSError:
+                return
+            self._size -= size
+
+    def _evict(self) -> None:
+        self._written = 0
+        entries = []
+        for path in self._entries():
+            try:
+                entries.append((path.stat().st_mtime, path.stat().st_size, path))
+            except OSError:
+                continue
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda x: x[0]):
+            if self._size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+
+    def clear(self) -> None:
+        """Removes all the games from the cache and resets the counters."""
+        with self._lock:
+            for path in self._entries():
+                path.unlink(missing_ok=True)
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
@@ -1,19 +1,175 @@
 import os
-from collections.abc import Callable
+import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from enum import Enum
+from functools import lru_cache, partial
 from typing import TypeVar
 from urllib.parse import urlparse
 
 import lxml.html as lh
+import numpy as np
 import pandas as pd
 import requests
+from lxml import etree
 from lxml.html import Element
 
 from src.core.analysis.entities import Boxscore, Game, League, Player, Team
+from src.core.analysis.entities_ops import pack_games
+from src.core.parsers.cache import GameCache
 from src.core.parsers.exceptions import UnfinishedGameException
 from src.core.parsers.transforms import transform_game_stats_df
 
 T = TypeVar("T", str, bytes)
 
+HOME_TEAM_ID = "_ctl0_MainContentPlaceHolderMaster_equipoLocalNombre"
+AWAY_TEAM_ID = "_ctl0_MainContentPlaceHolderMaster_equipoVisitanteNombre"
+
+# Field of the metadata in each element of the header of a boxscore, by tag and class or id. Scores are told apart by
+# the class of the team column they are in.
+METADATA_FIELDS = {
+    ("div", "fecha"): "date_time",
+    ("span", "temporada"): "season",
+    ("span", "liga"): "league",
+    ("span", HOME_TEAM_ID): "home_team",
+    ("span", AWAY_TEAM_ID): "away_team",
+    ("span", "resultado"): "score",
+}
+METADATA_TAGS = ("div", "span")
+SCORE_FIELDS = {"columna equipo local": "home_score", "columna equipo visitante": "away_score"}
+PLAYED_QUARTERS_XPATH = etree.XPath('count(//span[@class="cuarto play"])')
+N_QUARTERS = 4
+
+# Markup that must be in the raw bytes of a finished game: the class of each played quarter, and a table
+PLAYED_QUARTER_MARKER = b"cuarto play"
+TABLE_TAG_REGEX = re.compile(rb"<table\b", re.IGNORECASE)
+
+
+# Elements of a boxscore page that are never read and can be large (e.g. scripts, or the ASP.NET view state input)
+DROPPED_TAGS = ("script", "style", "noscript", "iframe", "object", "svg", "select", "input", "textarea")
+PARSER_OPTIONS = {"encoding": "utf-8", "remove_comments": True, "remove_pis": True}
+PARSER_FEED_SIZE = 64 * 1024
+HTML_ELEMENT_LOOKUP = lh.HtmlElementClassLookup()
+
+# Columns of a table row, in order, and the position of the cell that holds each of them
+TableLayout = tuple[tuple[str, ...], tuple[int, ...]]
+
+
+class BoxscoreStatus(Enum):
+    """Status of a raw boxscore page, as told by `screen_boxscore`."""
+
+    FINISHED = "finished"
+    UNFINISHED = "unfinished"
+    INVALID = "invalid"
+
+
+@lru_cache(maxsize=64)
+def compile_xpath(xpath: str) -> etree.XPath:
+    """Compiles an XPath expression once, to evaluate it on many documents."""
+    return etree.XPath(xpath)
+
+
+@lru_cache(maxsize=64)
+def get_table_layout(fingerprint: tuple[str, ...]) -> TableLayout:
+    """Layout of the rows with the given cell classes. Each class is a column; if it is repeated, its last cell is used.
+    :param fingerprint: Class of each cell of a row.
+    :return: The layout of the row.
+    """
+    positions = {column: position for position, column in enumerate(fingerprint)}
+    columns = tuple(dict.fromkeys(fingerprint))
+    return columns, tuple(positions[column] for column in columns)
+
+
+def get_cell_text(cell: Element) -> str:
+    """Text of a table cell and its descendants."""
+    # Most cells only have text, which is much faster to read than through `text_content`
+    if len(cell):
+        text: str = cell.text_content()
+        return text
+    return cell.text or ""
+
+
+def drop_element(element: Element) -> None:
+    """Removes an element and its descendants from its tree, keeping the text that follows it."""
+    parent = element.getparent()
+    if parent is None:
+        return
+    if element.tail:
+        previous = element.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or "") + element.tail
+        else:
+            parent.text = (parent.text or "") + element.tail
+    parent.remove(element)
+
+
+def screen_boxscore(document: bytes) -> BoxscoreStatus:
+    """Classifies a raw boxscore page without parsing it. The scan stops at the first table and after `N_QUARTERS`
+    played quarters, which are in the header of the page.
+    Pages without `N_QUARTERS` played quarter markers, or without a table, are surely unfinished games or not boxscores
+    at all. Any other page is FINISHED, but it still may be rejected once it is parsed.
+    :param document: UTF-8 encoded page.
+    :return: The status of the page.
+    """
+    start = 0
+    for _ in range(N_QUARTERS):
+        start = document.find(PLAYED_QUARTER_MARKER, start)
+        if start < 0:
+            return BoxscoreStatus.UNFINISHED
+        start += len(PLAYED_QUARTER_MARKER)
+    if TABLE_TAG_REGEX.search(document) is None:
+        return BoxscoreStatus.INVALID
+    return BoxscoreStatus.FINISHED
+
+
+def normalize_text(text: str) -> str:
+    """Collapses the whitespace of a text into single spaces, without leading or trailing ones, and writes decimal
+    commas as dots.
+    :param text: Text to normalize.
+    :return: The normalized text.
+    """
+    return " ".join(text.split()).replace(",", ".")
+
+
+def normalize_texts(texts: Iterable[str]) -> list[str]:
+    """Normalizes a batch of texts, as `normalize_text` does with each of them. The commas of all of them are replaced
+    at once, so it is faster on the cells of a whole table.
+    :param texts: Texts to normalize.
+    :return: The normalized texts, in the same order.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    # NUL is not whitespace, and cannot appear in the text of a parsed page
+    joined = "\0".join(texts).replace(",", ".")
+    return [" ".join(text.split()) for text in joined.split("\0")]
+
+
+def parse_html(document: bytes) -> Element:
+    """Parses an HTML page without its comments and `DROPPED_TAGS` elements.
+    The page is fed to a pull parser in chunks, and each dropped element is removed as soon as it is parsed, so they are
+    never held in memory at once. The rest of the tree is the same as with `lxml.html.fromstring`.
+    :param document: UTF-8 encoded page.
+    :return: The root element of the page.
+    """
+    # Pull parsers lose their element class lookup once closed, so one is built (in a few microseconds) per document.
+    parser = etree.HTMLPullParser(events=("end",), tag=DROPPED_TAGS, **PARSER_OPTIONS)
+    parser.set_element_class_lookup(HTML_ELEMENT_LOOKUP)
+    for start in range(0, len(document), PARSER_FEED_SIZE):
+        parser.feed(document[start : start + PARSER_FEED_SIZE])
+        for _, element in parser.read_events():
+            drop_element(element)
+    try:
+        doc = parser.close()
+    except etree.XMLSyntaxError:
+        doc = None
+    for _, element in parser.read_events():
+        drop_element(element)
+    if doc is None:
+        raise etree.ParserError("Document is empty")
+    return doc
+
 
 class FEBLivescoreParser:
     id: int
@@ -23,16 +179,14 @@ class FEBLivescoreParser:
     @staticmethod
     def parse_str(input_str: str | bytes, decode_bytes: bool = False) -> str:
         if decode_bytes:
-            input_str = bytes(str(input_str), "utf-8").decode("utf-8")
+            input_str = str(input_str)
         assert isinstance(input_str, str)
-        return " ".join(
-            input_str.replace("\n", " ").replace("\t", " ").replace("\r", " ").replace(",", ".").split()
-        ).strip()
+        return normalize_text(input_str)
 
     @staticmethod
     def get_elements(doc: Element, id: str) -> list[Element]:
         # Parse data by id
-        table_elements: list[Element] = doc.xpath(id)
+        table_elements: list[Element] = compile_xpath(id)(doc)
         return table_elements
 
     @staticmethod
@@ -41,7 +195,7 @@ class FEBLivescoreParser:
             name=all_games[0].league,
             season=all_games[0].season,
             teams=list(all_teams),
-            games=all_games,
+            games=pack_games(all_games),
         )
 
     @staticmethod
@@ -52,32 +206,115 @@ class FEBLivescoreParser:
             season=metadata["season"],
             main_referee=Player(name=metadata["main_referee"]),
             aux_referee=Player(name=metadata["second_referee"]),
-            home_boxscore=Boxscore(
+            home_boxscore=Boxscore.from_frame(
                 boxscore=game_stats["home_boxscore"],
                 team=Team(name=metadata["home_team"]),
                 score=int(metadata["home_score"]),
             ),
-            away_boxscore=Boxscore(
+            away_boxscore=Boxscore.from_frame(
                 boxscore=game_stats["away_boxscore"],
                 team=Team(name=metadata["away_team"]),
                 score=int(metadata["away_score"]),
             ),
         )
 
+    @classmethod
+    def parse_boxscore(cls, link: T, reader_fn: Callable[[T], Element]) -> Game | None:
+        """Parses a single boxscore.
+        :param link: Boxscore to parse, in any format accepted by `reader_fn`.
+        :param reader_fn: Function that reads `link` into an HTML document.
+        :return: The parsed game, or None if the game is unfinished or cannot be parsed.
+        """
+        doc = reader_fn(link)
+        try:
+            return cls.parse_game_stats(doc)
+        except (UnfinishedGameException, ValueError):
+            return None
+
+    @classmethod
+    def iter_games(
+        cls,
+        boxscores: Iterable[T],
+        reader_fn: Callable[[T], Element],
+        n_workers: int = 1,
+        cache: GameCache | None = None,
+    ) -> Iterator[Game]:
+        """Parses boxscores as they are consumed from `boxscores`. Unfinished games are skipped.
+        At most `2 * n_workers` boxscores are held in memory at once, so `boxscores` can be a stream of documents
+        (e.g. being downloaded). Raw (`bytes`) boxscores are screened first with `screen_boxscore`, so unfinished games
+        and other pages are skipped without being parsed, hashed or sent to a worker.
+        :param boxscores: Boxscores to parse, in any format accepted by `reader_fn`.
+        :param reader_fn: Function that reads a boxscore into an HTML document. Must be picklable if `n_workers > 1`.
+        :param n_workers: Number of worker processes. With 1, the boxscores are parsed in the current process.
+        :param cache: Cache of already parsed games. Only raw (`bytes`) boxscores are looked up and stored.
+        :return: An iterator over the parsed games, in the same order as `boxscores`.
+        """
+        parse_fn = partial(cls.parse_boxscore, reader_fn=reader_fn)
+        executor = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+        max_pending = 2 * n_workers if executor is not None else 0
+        # Cache key (None if the game must not be stored) and parsed game of the boxscores being processed.
+        pending: deque[tuple[str | None, Future[Game | None]]] = deque()
+        try:
+            for link in boxscores:
+                if isinstance(link, bytes) and screen_boxscore(link) is not BoxscoreStatus.FINISHED:
+                    continue
+                key = cache.key(link) if cache is not None and isinstance(link, bytes) else None
+                cached_game = cache.get(key) if cache is not None and key is not None else None
+                future: Future[Game | None]
+                if cached_game is not None:
+                    future, key = Future(), None
+                    future.set_result(cached_game)
+                elif executor is not None:
+                    future = executor.submit(parse_fn, link)
+                else:
+                    future = Future()
+                    future.set_result(parse_fn(link))
+                pending.append((key, future))
+
+                while len(pending) > max_pending:
+                    yield from cls._resolve_pending_game(*pending.popleft(), cache=cache)
+            while pending:
+                yield from cls._resolve_pending_game(*pending.popleft(), cache=cache)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    @staticmethod
+    def _resolve_pending_game(key: str | None, future: Future[Game | None], cache: GameCache | None) -> Iterator[Game]:
+        game = future.result()
+        if game is None:
+            return
+        # Unfinished games are not cached: their boxscore will change.
+        if cache is not None and key is not None:
+            cache.put(key, game)
+        yield game
+
     @classmethod
     def parse_boxscores(
         cls,
-        boxscores: list[T],
+        boxscores: Iterable[T],
         reader_fn: Callable[[T], Element],
+        n_workers: int = 1,
+        cache: GameCache | None = None,
     ) -> League:
+        """Parses a list (or a stream) of boxscores into a League. Unfinished games are skipped.
+        :param boxscores: Boxscores to parse, in any format accepted by `reader_fn`.
+        :param reader_fn: Function that reads a boxscore into an HTML document. Must be picklable if `n_workers > 1`.
+        :param n_workers: Number of worker processes. With 1, the boxscores are parsed in the current process.
+        :param cache: Cache of already parsed games. Only raw (`bytes`) boxscores are looked up and stored.
+        :return: A League containing the parsed games, in the same order as `boxscores`.
+        """
+        n_boxscores = 0
+
+        def count_boxscores() -> Iterator[T]:
+            nonlocal n_boxscores
+            for boxscore in boxscores:
+                n_boxscores += 1
+                yield boxscore
+
         all_games = []
         all_teams = set()
-        for i, link in enumerate(boxscores):
-            doc = reader_fn(link)  # type: ignore[arg-type]
-            try:
-                game = cls.parse_game_stats(doc)
-            except (UnfinishedGameException, ValueError):
-                continue
+        for game in cls.iter_games(count_boxscores(), reader_fn, n_workers=n_workers, cache=cache):
             all_games.append(game)
             for team in game.teams:
                 all_teams.add(team)
@@ -85,13 +322,11 @@ class FEBLivescoreParser:
         if all_games:
             return cls.create_league(all_games, all_teams)
         else:
-            raise ValueError(f"No games found in {len(boxscores)} boxscores.")
+            raise ValueError(f"No games found in {n_boxscores} boxscores.")
 
     @classmethod
     def read_link_bytes(cls, link: bytes) -> Element:
-        document_string = link.decode("utf-8")
-        doc = lh.fromstring(document_string)
-        return doc
+        return parse_html(link)
 
     @staticmethod
     def read_link_file(link: str) -> Element:
@@ -100,66 +335,67 @@ class FEBLivescoreParser:
             if all([result.scheme, result.netloc, result.path]):
                 page = requests.get(link)
                 # Store the contents of the website under doc
-                return lh.fromstring(page.content)
+                return parse_html(page.content)
             elif os.path.isfile(link):
-                with open(link, encoding="utf-8") as f:
-                    document_string = f.read()
-                    return lh.fromstring(document_string)
+                with open(link, mode="rb") as f:
+                    return parse_html(f.read())
             else:
-                return lh.fromstring(link)
+                return parse_html(link.encode("utf-8"))
         raise ValueError("Input must be a string (URL, file path, or HTML)")
 
     @classmethod
-    def extract_nested_value(cls, doc: Element, xpath: str) -> str | None:
-        value = None
-        current_path = doc.xpath(xpath)
-        while not value:
-            try:
-                if current_path[-1].text_content():
-                    value = cls.parse_str(current_path[-1].text_content(), decode_bytes=True)
-                    return value
-                current_path = [x for x in current_path[-1]]
-            except IndexError:
-                return None
-        return value
+    def extract_text(cls, element: Element) -> str | None:
+        """Normalized text of an element and its descendants, or None if it has no text."""
+        text = element.text_content()
+        return normalize_text(text) if text else None
 
     @classmethod
     def parse_game_metadata(cls, doc: Element) -> dict[str, str]:
-        # Parse data by id
+        """Parses the header of a boxscore. All the fields are found in a single pass over the document; if a field
+        appears more than once, its last element is used.
+        :param doc: Boxscore document.
+        :return: Metadata of the game.
+        """
+        elements: dict[str, Element] = {}
+        # Filtering the elements by tag in lxml and their attributes in Python is much faster than an XPath predicate
+        for element in doc.iter(*METADATA_TAGS):
+            tag = element.tag
+            field = METADATA_FIELDS.get((tag, element.get("class"))) or METADATA_FIELDS.get((tag, element.get("id")))
+            if field == "score":
+                field = next(
+                    (
+                        SCORE_FIELDS[column.get("class")]
+                        for column in element.iterancestors("div")
+                        if column.get("class") in SCORE_FIELDS
+                    ),
+                    None,
+                )
+            if field is not None:
+                elements[field] = element
+        values = {field: cls.extract_text(element) for field, element in elements.items()}
+
         date = None
         time = None
-        time_and_date_str = cls.extract_nested_value(doc, '//div[@class="fecha"]')
+        time_and_date_str = values.get("date_time")
         if time_and_date_str is not None:
             split_time_and_date = time_and_date_str.split()  # Format: "Fecha XX/XX/XXXX - HH:MM
             if len(split_time_and_date) > 1:
                 date = split_time_and_date[1]
                 time = split_time_and_date[-1]
 
-        season = cls.extract_nested_value(doc, '//span[@class="temporada"]')
-        league = cls.extract_nested_value(doc, '//span[@class="liga"]')
-        home_team = cls.extract_nested_value(doc, '//span[@id="_ctl0_MainContentPlaceHolderMaster_equipoLocalNombre"]')
-        home_score = cls.extract_nested_value(doc, '//div[@class="columna equipo local"]//span[@class="resultado"]')
-        away_team = cls.extract_nested_value(
-            doc,
-            '//span[@id="_ctl0_MainContentPlaceHolderMaster_equipoVisitanteNombre"]',
-        )
-        away_score = cls.extract_nested_value(doc, '//div[@class="columna equipo visitante"]//span[@class="resultado"]')
-
-        _ = cls.extract_nested_value(doc, '//div[@class="arbitros"]')  # Format: Arbitros X W. Z | A B. C |
-
         # main_referee = ref[0]
         # second_referee = ref[1]
         # home_team = codecs.latin_1_encode(self.parse_str(home_score[0].text_content()))
         metadata_dict = {
             "date": date or "",
             "time": time or "",
-            "league": league or "",
-            "season": season or "",
-            "home_team": home_team or "",
-            "home_score": home_score or "",
-            "away_team": away_team or "",
-            "away_score": away_score or "",
-            # TODO(alvaro): Parse referees
+            "league": values.get("league") or "",
+            "season": values.get("season") or "",
+            "home_team": values.get("home_team") or "",
+            "home_score": values.get("home_score") or "",
+            "away_team": values.get("away_team") or "",
+            "away_score": values.get("away_score") or "",
+            # TODO(alvaro): Parse referees from '//div[@class="arbitros"]' (Format: Arbitros X W. Z | A B. C |)
             "main_referee": "-",  # self.parse_str(main_referee),
             "second_referee": "-",  # self.parse_str(second_referee),
         }
@@ -168,8 +404,8 @@ class FEBLivescoreParser:
 
     @classmethod
     def is_finished_game(cls, doc: Element) -> bool:
-        played_quarters = doc.xpath('.//span[@class="cuarto play"]')
-        return len(played_quarters) >= 4
+        played_quarters: float = PLAYED_QUARTERS_XPATH(doc)
+        return played_quarters >= N_QUARTERS
 
     @classmethod
     def get_tables(cls, doc: Element, base_xpath: str = "//table") -> tuple[list[Element], list[Element]]:
@@ -186,9 +422,9 @@ class FEBLivescoreParser:
     @classmethod
     def parse_game_stats(cls, doc: Element) -> Game:
         game_stats = {}
-        metadata = cls.parse_game_metadata(doc)
         if not cls.is_finished_game(doc):
             raise UnfinishedGameException
+        metadata = cls.parse_game_metadata(doc)
         try:
             table_local, table_away = cls.get_tables(doc)
         except ValueError:
@@ -210,18 +446,38 @@ class FEBLivescoreParser:
         initial_row: int = 2,
         discard_last: int = 0,
     ) -> pd.DataFrame:
-        table_rows = []
-        # Since out first row is the header, data is stored on the second row onwards
-        for j in range(initial_row, len(tr_elements) - discard_last):
-            # T is our j'th row
-            T = tr_elements[j]
-            row = {}
-            for t in T.iterchildren():
-                column_title = t.attrib["class"]
-                data = cls.parse_str(t.text_content(), decode_bytes=True)
-                # Append the data to the empty list of the i'th column
-                row[column_title] = data
-            table_rows.append(row)
-
-        df = pd.DataFrame(table_rows)
-        return df
+        """Decodes the rows of a stats table into a dataframe of texts, with a column per cell class.
+        Rows are not turned into dicts: the column layout of their cell classes is cached, and the texts of the rows
+        that share it are decoded by position into a buffer per column. Columns missing in some rows are NaN there.
+        :param tr_elements: Rows of the table.
+        :param initial_row: First row to decode. The previous ones are headers.
+        :param discard_last: Number of rows at the end of the table not to decode.
+        :return: The dataframe.
+        """
+        rows = [tr_elements[j] for j in range(initial_row, len(tr_elements) - discard_last)]
+        # Rows sharing a layout, from their first row: (first row, number of cells, layout)
+        runs: list[tuple[int, int, TableLayout]] = []
+        texts: list[str] = []
+        fingerprint: tuple[str, ...] | None = None
+        for j, row in enumerate(rows):
+            cells = list(row.iterchildren())
+            # Most tables have a single layout, so consecutive rows with the same classes are decoded together
+            if tuple([t.get("class") for t in cells]) != fingerprint:
+                fingerprint = tuple(t.attrib["class"] for t in cells)
+                runs.append((j, len(cells), get_table_layout(fingerprint)))
+            texts.extend(get_cell_text(t) for t in cells)
+        # The texts of the whole table are normalized at once
+        values = np.array(normalize_texts(texts), dtype=object)
+
+        columns: dict[str, np.ndarray] = {}
+        offset = 0
+        stops = [start for start, _, _ in runs[1:]] + [len(rows)]
+        for (start, n_cells, (column_titles, positions)), stop in zip(runs, stops):
+            size = (stop - start) * n_cells
+            run_values = values[offset : offset + size].reshape(stop - start, n_cells)
+            offset += size
+            for column_title, position in zip(column_titles, positions):
+                if column_title not in columns:
+                    columns[column_title] = np.full(len(rows), np.nan, dtype=object)
+                columns[column_title][start:stop] = run_values[:, position]
+        return pd.DataFrame(columns, index=pd.RangeIndex(len(rows)), copy=False)
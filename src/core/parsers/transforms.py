@@ -67,66 +67,90 @@ def transform_cum_stats_rebounds(rebs_series: pd.Series, prefix: str = "rebounds
     )
 
 
+NO_TRANSFORM_KEYS = {
+    "dorsal": "number",
+    "nombre jugador": "player",
+    "puntos": "points_made",
+    "asistencias": "assists",
+    "perdidas": "turnovers",
+    "recuperaciones": "steals",
+    "mates": "dunks",
+    "valoracion": "ranking",
+    "rebotes total": "total_rebounds",
+    "rebotes defensivos": "defensive_rebounds",
+    "rebotes ofensivos": "offensive_rebounds",
+    "faltas cometidas": "fouls_made",
+    "faltas recibidas": "fouls_received",
+    "tapones favor": "blocks_made",
+    "tapones contra": "blocks_received",
+    "balance": "point_balance",
+}
+
+SHOT_KEYS = {
+    "tiros dos": "2_point",
+    "tiros tres": "3_point",
+    "tiros campo": "field_goal",
+    "tiros libres": "free_throw",
+}
+
+# Order in which the transformed columns are appended to the output dataframe.
+TRANSFORM_KEYS = ["tiros dos", "minutos", "tiros tres", "tiros campo", "tiros libres", "inicial"]
+
+CAST_KEYS = {
+    "starter": np.int8,
+    "points_made": np.float32,
+    "assists": np.float32,
+    "turnovers": np.float32,
+    "steals": np.float32,
+    "dunks": np.float32,
+    "ranking": np.float32,
+    "total_rebounds": np.float32,
+    "defensive_rebounds": np.float32,
+    "offensive_rebounds": np.float32,
+    "fouls_made": np.float32,
+    "fouls_received": np.float32,
+    "blocks_made": np.float32,
+    "blocks_received": np.float32,
+    "point_balance": np.float32,
+}
+
+
 def transform_game_stats_df(initial_df: pd.DataFrame, home_team: bool = False) -> pd.DataFrame:
-    no_transform_keys = {
-        "dorsal": "number",
-        "nombre jugador": "player",
-        "puntos": "points_made",
-        "asistencias": "assists",
-        "perdidas": "turnovers",
-        "recuperaciones": "steals",
-        "mates": "dunks",
-        "valoracion": "ranking",
-        "rebotes total": "total_rebounds",
-        "rebotes defensivos": "defensive_rebounds",
-        "rebotes ofensivos": "offensive_rebounds",
-        "faltas cometidas": "fouls_made",
-        "faltas recibidas": "fouls_received",
-        "tapones favor": "blocks_made",
-        "tapones contra": "blocks_received",
-        "balance": "point_balance",
-    }
-
-    df = initial_df.rename(no_transform_keys, axis="columns")
-    transform_keys = {
-        # key, Dict[new_key_prefix, function]
-        "tiros dos": ("2_point", transform_cum_stats_shots),
-        "minutos": ("minutes", transform_cum_stats_minutes),
-        "tiros tres": ("3_point", transform_cum_stats_shots),
-        "tiros campo": ("field_goal", transform_cum_stats_shots),
-        "tiros libres": ("free_throw", transform_cum_stats_shots),
-        "inicial": ("starter", transform_starter),
-    }
-
-    for transform_key, transform_tuple in transform_keys.items():
-        new_name, transform_function = transform_tuple
-        new_df = transform_function(df.loc[:, transform_key], prefix=new_name)
-        df = pd.concat([df, new_df], axis=1)
-        df = df.drop(axis="columns", labels=transform_key)
-
-    df.at[df.shape[0] - 1, "point_balance"] = 0.0
-
-    cast_keys = {
-        # "number": np.int,
-        "starter": np.int8,
-        "points_made": np.float32,
-        "assists": np.float32,
-        "turnovers": np.float32,
-        "steals": np.float32,
-        "dunks": np.float32,
-        "ranking": np.float32,
-        "total_rebounds": np.float32,
-        "defensive_rebounds": np.float32,
-        "offensive_rebounds": np.float32,
-        "fouls_made": np.float32,
-        "fouls_received": np.float32,
-        "blocks_made": np.float32,
-        "blocks_received": np.float32,
-        "point_balance": np.float32,
-    }
-    df = df.astype(cast_keys)
-    df.loc[:, "minutes"] = pd.to_timedelta(df.loc[:, "minutes"])
-    df.loc[:, "games"] = 1
-    df.at[df.shape[0] - 1, "point_balance"] = df.loc[:, "point_balance"].sum()
-    df.at[df.shape[0] - 1, "player"] = "Total"
+    """Transforms the raw stats table of a team into a typed boxscore dataframe.
+    The output frame is built at once from per-column arrays, the last row is the team total.
+    :param initial_df: Dataframe with the raw (string) table, with the original column names.
+    :param home_team: Whether the table belongs to the home team.
+    :return: Boxscore dataframe.
+    """
+    n_rows = initial_df.shape[0]
+    columns: dict[str, np.ndarray | pd.Series] = {}
+    transformed_columns: dict[str, dict[str, np.ndarray | pd.Series]] = {}
+    for key, series in initial_df.items():
+        values = series.tolist()
+        if key in SHOT_KEYS:
+            prefix = SHOT_KEYS[key]
+            made_attempted = np.array([remove_percentage(x).split("/") for x in values], dtype=np.float32)
+            transformed_columns[key] = {
+                f"{prefix}_made": made_attempted[:, 0],
+                f"{prefix}_attempted": made_attempted[:, 1],
+            }
+        elif key == "minutos":
+            minutes = pd.to_timedelta([add_hours(x) for x in values])
+            # Keep the timedeltas as objects, as pandas would otherwise infer a timedelta64 column.
+            transformed_columns[key] = {"minutes": pd.Series(minutes, index=initial_df.index, dtype=object)}
+        elif key == "inicial":
+            transformed_columns[key] = {"starter": np.array([x.strip() == "*" for x in values], dtype=np.int8)}
+        else:
+            new_key = NO_TRANSFORM_KEYS.get(key, key)
+            if new_key == "point_balance":
+                values[-1] = 0.0
+            columns[new_key] = np.array(values, dtype=CAST_KEYS.get(new_key, object))
+
+    for transform_key in TRANSFORM_KEYS:
+        columns.update(transformed_columns[transform_key])
+    columns["games"] = np.ones(n_rows, dtype=np.int64)
+
+    df = pd.DataFrame(columns, index=initial_df.index, copy=False)
+    df.at[n_rows - 1, "point_balance"] = df.loc[:, "point_balance"].sum()
+    df.at[n_rows - 1, "player"] = "Total"
     return df
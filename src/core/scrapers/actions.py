@@ -1,14 +1,32 @@
-from src.core.scrapers.boxscore_scraper import BoxscoreScraper
+from collections.abc import Iterator
+
+from src.core.scrapers.boxscore_scraper import MAX_CONNECTIONS_PER_HOST, BoxscoreScraper
+
+
+def iter_boxscores_from_calendar_url(
+    calendar_url: str,
+    season: str | None = None,
+    group_id: str | None = None,
+    max_workers: int = MAX_CONNECTIONS_PER_HOST,
+) -> Iterator[bytes]:
+    """Scrapes boxscores as HTML files going through a calendar URL, yielding them as they are downloaded.
+    :param calendar_url: The calendar URL.
+    :param max_workers: Number of boxscores downloaded concurrently.
+    :return: an iterator over the HTML files containing boxscores, in calendar order.
+    """
+    with BoxscoreScraper(max_workers=max_workers) as scraper:
+        yield from scraper.iter_boxscores(calendar_url, season, group_id)
 
 
 def read_boxscores_from_calendar_url(
     calendar_url: str,
     season: str | None = None,
     group_id: str | None = None,
+    max_workers: int = MAX_CONNECTIONS_PER_HOST,
 ) -> list[bytes]:
     """Scrapes boxscores as HTML files going through a calendar URL.
     :param calendar_url: The calendar URL.
+    :param max_workers: Number of boxscores downloaded concurrently.
     :return: a list of HTML files containing boxscores.
     """
-    scraper = BoxscoreScraper()
-    return scraper.fetch_boxscores(calendar_url, season, group_id)
+    return list(iter_boxscores_from_calendar_url(calendar_url, season, group_id, max_workers))
@@ -1,12 +1,51 @@
+import threading
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from types import TracebackType
+from urllib.parse import urlparse
 
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Maximum number of in-flight requests to the same host. The boxscores of a calendar are all on the same host, so more
+# concurrent downloads than this would only wait for a connection.
+MAX_CONNECTIONS_PER_HOST = 4
 
 
 class BoxscoreScraper:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        max_workers: int = 1,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+    ) -> None:
+        """
+        :param max_workers: Number of boxscores downloaded concurrently. With 1, they are downloaded one at a time.
+        :param max_connections_per_host: Maximum number of in-flight requests to the same host.
+        :param timeout: Timeout of each request, in seconds.
+        :param max_retries: Number of retries of failed requests (connection errors and 429/5xx responses).
+        :param backoff_factor: Backoff factor between retries, in seconds.
+        """
+        self.max_workers = max_workers
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
         self.session: requests.Session = requests.Session()
+        retries = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+        )
+        adapter = HTTPAdapter(pool_maxsize=max(max_workers, max_connections_per_host), max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._host_semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._host_semaphores_lock = threading.Lock()
 
     def __enter__(self) -> "BoxscoreScraper":
         return self
@@ -24,9 +63,16 @@ class BoxscoreScraper:
         if self.session:
             self.session.close()
 
+    def _get_host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._host_semaphores_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.max_connections_per_host)
+            return self._host_semaphores[host]
+
     def get_boxscore_urls(self, calendar_url: str, season: str | None = None, group_id: str | None = None) -> list[str]:
         """Extract all boxscore URLs from a calendar page"""
-        response = self.session.get(calendar_url)
+        response = self.session.get(calendar_url, timeout=self.timeout)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, "html.parser")
         if soup is None:
@@ -52,7 +98,7 @@ class BoxscoreScraper:
                 "_ctl0:MainContentPlaceHolderMaster:gruposDropDownList": group_id,
                 "_ctl0:token": token,
             }
-            response = self.session.post(calendar_url, data=form_data)
+            response = self.session.post(calendar_url, data=form_data, timeout=self.timeout)
             response.raise_for_status()
         soup = BeautifulSoup(response.text, "html.parser")
 
@@ -62,14 +108,40 @@ class BoxscoreScraper:
         return links
 
     def get_boxscore(self, game_url: str) -> bytes:
-        response = self.session.get(game_url)
+        with self._get_host_semaphore(game_url):
+            response = self.session.get(game_url, timeout=self.timeout)
         response.raise_for_status()
         return response.content
 
-    def fetch_boxscores(self, calendar_url: str, season: str | None = None, group_id: str | None = None) -> list[bytes]:
+    def iter_boxscores(
+        self, calendar_url: str, season: str | None = None, group_id: str | None = None
+    ) -> Iterator[bytes]:
+        """Download the boxscores of all the games of a calendar, yielding them in calendar order as they arrive.
+        At most `2 * max_workers` downloaded boxscores are buffered, waiting to be consumed. If the iterator is closed
+        early, the pending downloads are cancelled and only the running ones are waited for.
+        """
         game_urls = self.get_boxscore_urls(
             calendar_url,
             season,
             group_id,
         )
-        return [self.get_boxscore(url) for url in game_urls]
+        if self.max_workers <= 1:
+            for url in game_urls:
+                yield self.get_boxscore(url)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            pending: deque[Future[bytes]] = deque()
+            for url in game_urls:
+                pending.append(executor.submit(self.get_boxscore, url))
+                if len(pending) >= 2 * self.max_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def fetch_boxscores(self, calendar_url: str, season: str | None = None, group_id: str | None = None) -> list[bytes]:
+        """Download the boxscores of all the games of a calendar, in calendar order"""
+        return list(self.iter_boxscores(calendar_url, season, group_id))
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 import yaml
@@ -81,10 +82,12 @@ WSGI_APPLICATION = "feb_stats.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# It also holds the queue of analysis jobs, so the web app and the job workers must run on the same host (the deployment
+# is pinned to a single instance).
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": "src/feb_stats",
+        "NAME": BASE_DIR / "db.sqlite3",
     }
 }
 
@@ -136,13 +139,34 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Sessions only keep the id of the upload session of each user: they are stored in signed cookies instead of the
+# database, which is left to the analysis jobs.
+SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+
 # File Upload Settings
 UPLOAD_FOLDER = "uploads"
 ALLOWED_FILE_EXTENSIONS = ["html", "htm"]
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024
 
+# Parsed games cache, disabled by default. It is enabled by setting the GAMES_CACHE_FOLDER environment variable to the
+# folder to store it (e.g. "cache/games"), on a persistent disk.
+GAMES_CACHE_FOLDER: str | None = os.environ.get("GAMES_CACHE_FOLDER") or None
+GAMES_CACHE_MAX_SIZE = int(os.environ.get("GAMES_CACHE_MAX_SIZE", 512 * 1024 * 1024))
+
 # gRPC Settings
 PORTS = {
     "grpc_address": "localhost",
     "grpc_port": "50001",
 }
+
+# Engine that exports the leagues: "local" exports them in the web process, and "grpc" sends them to the stats service
+# at PORTS. Either way, the engine is built once and shared by all the requests.
+STATS_ENGINE = "local"
+# Deadline of each export, in seconds
+STATS_TIMEOUT = 300.0
+
+# Background analysis jobs, run by `manage.py run_analysis_jobs`. Finished analyses are reused by equal requests for
+# JOBS_RESULT_MAX_AGE seconds, and running analyses are retried after JOBS_TIMEOUT seconds. Times are in seconds.
+JOBS_RESULT_MAX_AGE = 10 * 60
+JOBS_TIMEOUT = 30 * 60
+JOBS_POLL_INTERVAL = 1.0
@@ -2,3 +2,4 @@ from .base import *  # noqa
 
 IS_TESTING_MODE = True
 ENABLE_PRIVATE_ENDPOINTS = True
+GAMES_CACHE_FOLDER = None
@@ -1,29 +1,256 @@
+import asyncio
+import functools
+import itertools
+import queue
+import threading
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import Executor
+from typing import Any, NoReturn, TypeVar
+
+import grpc
+
 from src.service.codegen import feb_stats_pb2_grpc
 from src.service.codegen.feb_stats_pb2 import (
     GetFebStatsRequest,
     GetFebStatsResponse,
+    GetFebStatsTablesRequest,
+    GetFebStatsTablesResponse,
+    StreamFebStatsRequest,
+    StreamFebStatsResponse,
 )
-from src.service.handler import SimpleLeagueHandler
+from src.service.exceptions import HandlerBusyException, RequestAbortedException
+from src.service.handler import MAX_MESSAGE_LENGTH, LeagueHandler
+
+T = TypeVar("T")
+
+# Default limit of the boxscores of a StreamFebStats upload, in bytes: as much as a single GetFebStats message
+MAX_UPLOAD_SIZE = MAX_MESSAGE_LENGTH
 
 
 class ContextStub:
+    def __init__(self, time_remaining: float | None = None) -> None:
+        self._time_remaining = time_remaining
+
     def invocation_metadata(self) -> list[tuple[str, str]]:
         return [("tenant", "test")]
 
+    def time_remaining(self) -> float | None:
+        return self._time_remaining
+
+    def abort(self, code: grpc.StatusCode, details: str) -> NoReturn:
+        raise RequestAbortedException(f"{code.name}: {details}")
+
+
+def get_timeout(context: Any) -> float | None:
+    """Time left to answer a request, so the league handler does not keep computing once the client has stopped
+    waiting for the response.
+    :param context: Context of the request.
+    :return: The time left, in seconds, or None if the request has no deadline.
+    """
+    timeout: float | None = context.time_remaining() if context is not None else None
+    if timeout is not None and timeout >= threading.TIMEOUT_MAX:
+        # Requests without a deadline
+        return None
+    return timeout
+
+
+def iter_queue(boxscores_queue: "queue.Queue[bytes | Exception | None]") -> Iterator[bytes]:
+    """Reads the boxscores put in a queue by another thread, until None. Exceptions put in the queue are raised.
+    :param boxscores_queue: Queue of the boxscores.
+    :return: An iterator over the boxscores.
+    """
+    while (item := boxscores_queue.get()) is not None:
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
 
 class FebStatsServiceServicer(feb_stats_pb2_grpc.FebStatsServiceServicer):
-    def __init__(self, league_handler: SimpleLeagueHandler):
+    def __init__(self, league_handler: LeagueHandler):
         self.league_handler = league_handler
 
+    # Size of the xlsx chunks sent by StreamFebStats
+    sheet_chunk_size = 64 * 1024
+
     def GetFebStats(self, request: GetFebStatsRequest, context: ContextStub | None) -> GetFebStatsResponse:
         boxscores: list[bytes] = request.boxscores  # type:ignore
         color_sheet: bool = request.color_sheet
         # TODO: Add tenants when distributing the computations
-        result = self.league_handler.export_boxscores(boxscores, color_sheet)
+        result = self._call_handler(context, self.league_handler.export_boxscores, boxscores, color_sheet)
         response = GetFebStatsResponse()
 
         response.sheet = result
         # TODO(alvaro)
-        # response.teams.extend([str(t) for t in self.league_handler.league.teams])
-        self.league_handler.clean_league()
+        # response.teams.extend([str(t) for t in league.teams])
         return response
+
+    def StreamFebStats(
+        self, request_iterator: Iterator[StreamFebStatsRequest], context: ContextStub | None
+    ) -> Iterator[StreamFebStatsResponse]:
+        first_request = next(request_iterator, None)
+        color_sheet = first_request.color_sheet if first_request is not None else False
+        # The boxscores are parsed as they arrive, instead of waiting for the whole upload
+        requests = itertools.chain([first_request], request_iterator) if first_request is not None else iter([])
+        result = self._call_handler(
+            context, self.league_handler.export_boxscores, (request.boxscore for request in requests), color_sheet
+        )
+        for start in range(0, len(result), self.sheet_chunk_size):
+            yield StreamFebStatsResponse(sheet_chunk=result[start : start + self.sheet_chunk_size])
+
+    def GetFebStatsTables(
+        self, request: GetFebStatsTablesRequest, context: ContextStub | None
+    ) -> GetFebStatsTablesResponse:
+        boxscores: list[bytes] = request.boxscores  # type:ignore
+        return self._call_handler(context, self.league_handler.export_tables, boxscores)
+
+    def _call_handler(self, context: ContextStub | None, method: Callable[..., T], *args: Any) -> T:
+        """Calls a method of the league handler within the deadline of the request, and turns its errors into gRPC
+        status codes.
+        :param context: Context of the request.
+        :param method: Method of the league handler.
+        :param args: Arguments of the method, besides the timeout.
+        :return: The result of the method.
+        """
+        timeout = get_timeout(context)
+        try:
+            return method(*args, timeout=timeout)
+        except HandlerBusyException as e:
+            if context is None:
+                raise
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        except TimeoutError:
+            if context is None:
+                raise
+            context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, "The league could not be exported before the deadline.")
+
+
+class AsyncFebStatsServiceServicer(feb_stats_pb2_grpc.FebStatsServiceServicer):
+    """Servicer of `grpc.aio` servers. Requests are received on the event loop, and the league handler runs in an
+    executor. The boxscores of a StreamFebStats upload are passed to the handler as they arrive, so the upload is never
+    held whole in memory, but the handler takes its thread from the first boxscore to the last one.
+    """
+
+    def __init__(
+        self, league_handler: LeagueHandler, executor: Executor | None = None, max_upload_size: int = MAX_UPLOAD_SIZE
+    ):
+        """
+        :param league_handler: Handler that exports the leagues.
+        :param executor: Executor of the league handler calls. If not set, the default executor of the loop is used.
+        :param max_upload_size: Limit of the boxscores of a StreamFebStats upload, in bytes. Larger uploads are
+        rejected with RESOURCE_EXHAUSTED.
+        """
+        self.league_handler = league_handler
+        self.executor = executor
+        self.max_upload_size = max_upload_size
+
+    # Size of the xlsx chunks sent by StreamFebStats
+    sheet_chunk_size = 64 * 1024
+    # Number of boxscores of a StreamFebStats upload that wait for the handler, and interval to check again if there is
+    # room for more of them, in seconds
+    stream_buffer_size = 4
+    stream_poll_interval = 0.01
+
+    async def GetFebStats(self, request: GetFebStatsRequest, context: grpc.aio.ServicerContext) -> GetFebStatsResponse:
+        boxscores: list[bytes] = request.boxscores  # type:ignore
+        result = await self._call_handler(context, self.league_handler.export_boxscores, boxscores, request.color_sheet)
+        return GetFebStatsResponse(sheet=result)
+
+    async def StreamFebStats(
+        self, request_iterator: AsyncIterator[StreamFebStatsRequest], context: grpc.aio.ServicerContext
+    ) -> AsyncIterator[StreamFebStatsResponse]:
+        # The boxscores are received on the event loop and passed to the handler thread through a bounded queue, so the
+        # boxscores are parsed as they arrive and at most `stream_buffer_size` of them wait in memory
+        boxscores_queue: queue.Queue[bytes | Exception | None] = queue.Queue(maxsize=self.stream_buffer_size)
+        request_iterator = aiter(request_iterator)
+        first_request = await anext(request_iterator, None)
+        color_sheet = first_request.color_sheet if first_request is not None else False
+        export = asyncio.ensure_future(
+            self._call_handler(context, self.league_handler.export_boxscores, iter_queue(boxscores_queue), color_sheet)
+        )
+        try:
+            await self._receive_boxscores(first_request, request_iterator, context, boxscores_queue, export)
+        except BaseException:
+            # The handler stops at the error, and its own error is superseded by this one
+            await self._put(boxscores_queue, RequestAbortedException("The upload was interrupted."), export)
+            await asyncio.wait([export])
+            if not export.cancelled():
+                export.exception()
+            raise
+        result = await export
+        for start in range(0, len(result), self.sheet_chunk_size):
+            yield StreamFebStatsResponse(sheet_chunk=result[start : start + self.sheet_chunk_size])
+
+    async def _receive_boxscores(
+        self,
+        first_request: StreamFebStatsRequest | None,
+        request_iterator: AsyncIterator[StreamFebStatsRequest],
+        context: grpc.aio.ServicerContext,
+        boxscores_queue: "queue.Queue[bytes | Exception | None]",
+        export: "asyncio.Future[Any]",
+    ) -> None:
+        """Puts the boxscores of a StreamFebStats upload in the queue of the handler as they arrive, ended by None. It
+        stops if the handler finishes early (i.e. it failed).
+        :param first_request: First request of the upload, already received.
+        :param request_iterator: Rest of the requests of the upload.
+        :param context: Context of the request.
+        :param boxscores_queue: Queue of the handler.
+        :param export: Result of the handler.
+        """
+        upload_size = 0
+        request = first_request
+        while request is not None:
+            upload_size += len(request.boxscore)
+            if upload_size > self.max_upload_size:
+                await context.abort(
+                    grpc.StatusCode.RESOURCE_EXHAUSTED, f"The upload exceeds the limit of {self.max_upload_size} bytes."
+                )
+            if not await self._put(boxscores_queue, request.boxscore, export):
+                return
+            request = await anext(request_iterator, None)
+        await self._put(boxscores_queue, None, export)
+
+    async def _put(
+        self,
+        boxscores_queue: "queue.Queue[bytes | Exception | None]",
+        item: bytes | Exception | None,
+        export: "asyncio.Future[Any]",
+    ) -> bool:
+        """Puts an item in the queue of the handler without blocking the event loop, waiting while the queue is full.
+        :param boxscores_queue: Queue of the handler.
+        :param item: Item to put.
+        :param export: Result of the handler.
+        :return: Whether the item was put, i.e. the handler had not finished.
+        """
+        while not export.done():
+            try:
+                boxscores_queue.put_nowait(item)
+                return True
+            except queue.Full:
+                await asyncio.sleep(self.stream_poll_interval)
+        return False
+
+    async def GetFebStatsTables(
+        self, request: GetFebStatsTablesRequest, context: grpc.aio.ServicerContext
+    ) -> GetFebStatsTablesResponse:
+        boxscores: list[bytes] = request.boxscores  # type:ignore
+        return await self._call_handler(context, self.league_handler.export_tables, boxscores)
+
+    async def _call_handler(self, context: grpc.aio.ServicerContext, method: Callable[..., T], *args: Any) -> T:
+        """Calls a method of the league handler in the executor, within the deadline of the request, and turns its
+        errors into gRPC status codes.
+        :param context: Context of the request.
+        :param method: Method of the league handler.
+        :param args: Arguments of the method, besides the timeout.
+        :return: The result of the method.
+        """
+        call = functools.partial(method, *args, timeout=get_timeout(context))
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+        except HandlerBusyException as e:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+            raise
+        except TimeoutError:
+            await context.abort(
+                grpc.StatusCode.DEADLINE_EXCEEDED, "The league could not be exported before the deadline."
+            )
+            raise
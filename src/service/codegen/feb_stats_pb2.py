@@ -17,7 +17,7 @@ _sym_db = _symbol_database.Default()
 
 
 DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
-    b'\n\x0f\x66\x65\x62_stats.proto\x12\tfeb_stats"<\n\x12GetFebStatsRequest\x12\x11\n\tboxscores\x18\x01 \x03(\x0c\x12\x13\n\x0b\x63olor_sheet\x18\x02 \x01(\x08"3\n\x13GetFebStatsResponse\x12\r\n\x05sheet\x18\x01 \x01(\x0c\x12\r\n\x05teams\x18\x02 \x03(\t2_\n\x0f\x46\x65\x62StatsService\x12L\n\x0bGetFebStats\x12\x1d.feb_stats.GetFebStatsRequest\x1a\x1e.feb_stats.GetFebStatsResponseb\x06proto3'
+    b'\n\x0f\x66\x65\x62_stats.proto\x12\tfeb_stats"<\n\x12GetFebStatsRequest\x12\x11\n\tboxscores\x18\x01 \x03(\x0c\x12\x13\n\x0b\x63olor_sheet\x18\x02 \x01(\x08"3\n\x13GetFebStatsResponse\x12\r\n\x05sheet\x18\x01 \x01(\x0c\x12\r\n\x05teams\x18\x02 \x03(\t">\n\x15StreamFebStatsRequest\x12\x10\n\x08\x62oxscore\x18\x01 \x01(\x0c\x12\x13\n\x0b\x63olor_sheet\x18\x02 \x01(\x08"-\n\x16StreamFebStatsResponse\x12\x13\n\x0bsheet_chunk\x18\x01 \x01(\x0c"-\n\x18GetFebStatsTablesRequest\x12\x11\n\tboxscores\x18\x01 \x03(\x0c"6\n\x06\x43olumn\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0f\n\x07numbers\x18\x02 \x03(\x01\x12\r\n\x05texts\x18\x03 \x03(\t"9\n\x05Table\x12\x0c\n\x04name\x18\x01 \x01(\t\x12"\n\x07\x63olumns\x18\x02 \x03(\x0b\x32\x11.feb_stats.Column"^\n\x19GetFebStatsTablesResponse\x12 \n\x06league\x18\x01 \x01(\x0b\x32\x10.feb_stats.Table\x12\x1f\n\x05teams\x18\x02 \x03(\x0b\x32\x10.feb_stats.Table2\x9a\x02\n\x0f\x46\x65\x62StatsService\x12L\n\x0bGetFebStats\x12\x1d.feb_stats.GetFebStatsRequest\x1a\x1e.feb_stats.GetFebStatsResponse\x12Y\n\x0eStreamFebStats\x12 .feb_stats.StreamFebStatsRequest\x1a!.feb_stats.StreamFebStatsResponse(\x01\x30\x01\x12^\n\x11GetFebStatsTables\x12#.feb_stats.GetFebStatsTablesRequest\x1a$.feb_stats.GetFebStatsTablesResponseb\x06proto3'
 )
 
 _globals = globals()
@@ -29,6 +29,18 @@ if not _descriptor._USE_C_DESCRIPTORS:
     _globals["_GETFEBSTATSREQUEST"]._serialized_end = 90
     _globals["_GETFEBSTATSRESPONSE"]._serialized_start = 92
     _globals["_GETFEBSTATSRESPONSE"]._serialized_end = 143
-    _globals["_FEBSTATSSERVICE"]._serialized_start = 145
-    _globals["_FEBSTATSSERVICE"]._serialized_end = 240
+    _globals["_STREAMFEBSTATSREQUEST"]._serialized_start = 145
+    _globals["_STREAMFEBSTATSREQUEST"]._serialized_end = 207
+    _globals["_STREAMFEBSTATSRESPONSE"]._serialized_start = 209
+    _globals["_STREAMFEBSTATSRESPONSE"]._serialized_end = 254
+    _globals["_GETFEBSTATSTABLESREQUEST"]._serialized_start = 256
+    _globals["_GETFEBSTATSTABLESREQUEST"]._serialized_end = 301
+    _globals["_COLUMN"]._serialized_start = 303
+    _globals["_COLUMN"]._serialized_end = 357
+    _globals["_TABLE"]._serialized_start = 359
+    _globals["_TABLE"]._serialized_end = 416
+    _globals["_GETFEBSTATSTABLESRESPONSE"]._serialized_start = 418
+    _globals["_GETFEBSTATSTABLESRESPONSE"]._serialized_end = 512
+    _globals["_FEBSTATSSERVICE"]._serialized_start = 515
+    _globals["_FEBSTATSSERVICE"]._serialized_end = 797
 # @@protoc_insertion_point(module_scope)
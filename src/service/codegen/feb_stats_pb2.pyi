@@ -50,3 +50,119 @@ class GetFebStatsResponse(google.protobuf.message.Message):
     def ClearField(self, field_name: typing.Literal["sheet", b"sheet", "teams", b"teams"]) -> None: ...
 
 global___GetFebStatsResponse = GetFebStatsResponse
+
+@typing.final
+class StreamFebStatsRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    BOXSCORE_FIELD_NUMBER: builtins.int
+    COLOR_SHEET_FIELD_NUMBER: builtins.int
+    boxscore: builtins.bytes
+    color_sheet: builtins.bool
+    def __init__(
+        self,
+        *,
+        boxscore: builtins.bytes = ...,
+        color_sheet: builtins.bool = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["boxscore", b"boxscore", "color_sheet", b"color_sheet"]) -> None: ...
+
+global___StreamFebStatsRequest = StreamFebStatsRequest
+
+@typing.final
+class StreamFebStatsResponse(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    SHEET_CHUNK_FIELD_NUMBER: builtins.int
+    sheet_chunk: builtins.bytes
+    def __init__(
+        self,
+        *,
+        sheet_chunk: builtins.bytes = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["sheet_chunk", b"sheet_chunk"]) -> None: ...
+
+global___StreamFebStatsResponse = StreamFebStatsResponse
+
+@typing.final
+class GetFebStatsTablesRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    BOXSCORES_FIELD_NUMBER: builtins.int
+    @property
+    def boxscores(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.bytes]: ...
+    def __init__(
+        self,
+        *,
+        boxscores: collections.abc.Iterable[builtins.bytes] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["boxscores", b"boxscores"]) -> None: ...
+
+global___GetFebStatsTablesRequest = GetFebStatsTablesRequest
+
+@typing.final
+class Column(google.protobuf.message.Message):
+    """Column of a table. Numeric columns fill `numbers`, with NaN for missing values; durations are in seconds.
+    Any other column fills `texts`.
+    """
+
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    NAME_FIELD_NUMBER: builtins.int
+    NUMBERS_FIELD_NUMBER: builtins.int
+    TEXTS_FIELD_NUMBER: builtins.int
+    name: builtins.str
+    @property
+    def numbers(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.float]: ...
+    @property
+    def texts(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.str]: ...
+    def __init__(
+        self,
+        *,
+        name: builtins.str = ...,
+        numbers: collections.abc.Iterable[builtins.float] | None = ...,
+        texts: collections.abc.Iterable[builtins.str] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["name", b"name", "numbers", b"numbers", "texts", b"texts"]) -> None: ...
+
+global___Column = Column
+
+@typing.final
+class Table(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    NAME_FIELD_NUMBER: builtins.int
+    COLUMNS_FIELD_NUMBER: builtins.int
+    name: builtins.str
+    @property
+    def columns(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___Column]: ...
+    def __init__(
+        self,
+        *,
+        name: builtins.str = ...,
+        columns: collections.abc.Iterable[global___Column] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["columns", b"columns", "name", b"name"]) -> None: ...
+
+global___Table = Table
+
+@typing.final
+class GetFebStatsTablesResponse(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    LEAGUE_FIELD_NUMBER: builtins.int
+    TEAMS_FIELD_NUMBER: builtins.int
+    @property
+    def league(self) -> global___Table: ...
+    @property
+    def teams(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___Table]: ...
+    def __init__(
+        self,
+        *,
+        league: global___Table | None = ...,
+        teams: collections.abc.Iterable[global___Table] | None = ...,
+    ) -> None: ...
+    def HasField(self, field_name: typing.Literal["league", b"league"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing.Literal["league", b"league", "teams", b"teams"]) -> None: ...
+
+global___GetFebStatsTablesResponse = GetFebStatsTablesResponse
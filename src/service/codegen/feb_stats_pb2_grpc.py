@@ -41,6 +41,18 @@ class FebStatsServiceStub:
             response_deserializer=feb__stats__pb2.GetFebStatsResponse.FromString,
             _registered_method=True,
         )
+        self.StreamFebStats = channel.stream_stream(
+            "/feb_stats.FebStatsService/StreamFebStats",
+            request_serializer=feb__stats__pb2.StreamFebStatsRequest.SerializeToString,
+            response_deserializer=feb__stats__pb2.StreamFebStatsResponse.FromString,
+            _registered_method=True,
+        )
+        self.GetFebStatsTables = channel.unary_unary(
+            "/feb_stats.FebStatsService/GetFebStatsTables",
+            request_serializer=feb__stats__pb2.GetFebStatsTablesRequest.SerializeToString,
+            response_deserializer=feb__stats__pb2.GetFebStatsTablesResponse.FromString,
+            _registered_method=True,
+        )
 
 
 class FebStatsServiceServicer:
@@ -52,6 +64,20 @@ class FebStatsServiceServicer:
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def StreamFebStats(self, request_iterator, context):
+        """Streaming variant of GetFebStats: the boxscores are uploaded one per message, and the xlsx sheet is sent back in
+        chunks. The color_sheet option is read from the first message.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def GetFebStatsTables(self, request, context):
+        """Aggregated stats of the league and of each team, as tables instead of an xlsx sheet."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
 
 def add_FebStatsServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -60,6 +86,16 @@ def add_FebStatsServiceServicer_to_server(servicer, server):
             request_deserializer=feb__stats__pb2.GetFebStatsRequest.FromString,
             response_serializer=feb__stats__pb2.GetFebStatsResponse.SerializeToString,
         ),
+        "StreamFebStats": grpc.stream_stream_rpc_method_handler(
+            servicer.StreamFebStats,
+            request_deserializer=feb__stats__pb2.StreamFebStatsRequest.FromString,
+            response_serializer=feb__stats__pb2.StreamFebStatsResponse.SerializeToString,
+        ),
+        "GetFebStatsTables": grpc.unary_unary_rpc_method_handler(
+            servicer.GetFebStatsTables,
+            request_deserializer=feb__stats__pb2.GetFebStatsTablesRequest.FromString,
+            response_serializer=feb__stats__pb2.GetFebStatsTablesResponse.SerializeToString,
+        ),
     }
     generic_handler = grpc.method_handlers_generic_handler("feb_stats.FebStatsService", rpc_method_handlers)
     server.add_generic_rpc_handlers((generic_handler,))
@@ -99,3 +135,63 @@ class FebStatsService:
             metadata,
             _registered_method=True,
         )
+
+    @staticmethod
+    def StreamFebStats(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            "/feb_stats.FebStatsService/StreamFebStats",
+            feb__stats__pb2.StreamFebStatsRequest.SerializeToString,
+            feb__stats__pb2.StreamFebStatsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def GetFebStatsTables(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/feb_stats.FebStatsService/GetFebStatsTables",
+            feb__stats__pb2.GetFebStatsTablesRequest.SerializeToString,
+            feb__stats__pb2.GetFebStatsTablesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
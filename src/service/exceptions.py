@@ -0,0 +1,6 @@
+class HandlerBusyException(Exception):
+    pass
+
+
+class RequestAbortedException(Exception):
+    pass
@@ -1,37 +1,337 @@
+import concurrent.futures
+import multiprocessing
+import os
+import queue
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, TypeVar
 
+import grpc
 from grpc import insecure_channel
 
-if TYPE_CHECKING:
-    from src.core.analysis.entities import League
+from src.core.analysis.entities import Game, League
 from src.core.analysis.saving import league_to_xlsx
-from src.core.analysis.transforms import compute_league_aggregates
+from src.core.analysis.transforms import aggregate_games
+from src.core.parsers.cache import GameCache
 from src.core.parsers.parsers import FEBLivescoreParser
+from src.service.codegen import feb_stats_pb2_grpc
+from src.service.codegen.feb_stats_pb2 import (
+    GetFebStatsTablesRequest,
+    GetFebStatsTablesResponse,
+    StreamFebStatsRequest,
+)
+from src.service.exceptions import HandlerBusyException, RequestAbortedException
+from src.service.tables import league_to_tables
+
+T = TypeVar("T")
+
+MAX_MESSAGE_LENGTH = 100 * 1024 * 1024
+# Options of the gRPC servers and channels of the service
+GRPC_OPTIONS = [
+    ("grpc.max_receive_message_length", MAX_MESSAGE_LENGTH),
+    ("grpc.max_send_message_length", MAX_MESSAGE_LENGTH),
+]
 
 
 class LeagueHandler(ABC):
     @abstractmethod
-    def export_boxscores(self, input_boxscores: list[bytes], color_sheet: bool) -> bytes:
+    def export_boxscores(
+        self, input_boxscores: Iterable[bytes], color_sheet: bool, timeout: float | None = None
+    ) -> bytes:
+        """Exports the league of a set of boxscores to xlsx.
+        :param input_boxscores: Boxscores of the league.
+        :param color_sheet: Add a color style to the output xlsx file.
+        :param timeout: Maximum time to wait for the export, in seconds. Handlers that export in the calling thread
+        ignore it.
+        :return: The exported xlsx file, as bytes.
+        """
         raise NotImplementedError()
 
+    @abstractmethod
+    def export_tables(
+        self, input_boxscores: Iterable[bytes], timeout: float | None = None
+    ) -> GetFebStatsTablesResponse:
+        """Exports the aggregated stats of the league of a set of boxscores as tables.
+        :param input_boxscores: Boxscores of the league.
+        :param timeout: Maximum time to wait for the export, in seconds. Handlers that export in the calling thread
+        ignore it.
+        :return: The tables of the league and of its teams.
+        """
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        """Releases the resources of the handler."""
+        return None
+
 
 class SimpleLeagueHandler(LeagueHandler):
-    def __init__(self, address: str, options: list[tuple[str, int]] | None = None) -> None:
-        self.options = options
+    """Parses and exports leagues. It keeps no state from one request to another, so the same handler can serve
+    concurrent requests; the games cache is the only shared object, and it is thread-safe.
+    """
+
+    def __init__(self, game_cache: GameCache | None = None) -> None:
+        self.game_cache = game_cache
+
+    def parse_boxscores(self, input_boxscores: Iterable[bytes]) -> League:
+        # Games are aggregated as they are parsed, while the rest of the boxscores are still being received
+        return aggregate_games(
+            FEBLivescoreParser.iter_games(input_boxscores, FEBLivescoreParser.read_link_bytes, cache=self.game_cache)
+        )
+
+    def export_boxscores(
+        self, input_boxscores: Iterable[bytes], color_sheet: bool, timeout: float | None = None
+    ) -> bytes:
+        league = self.parse_boxscores(input_boxscores)
+        return league_to_xlsx(league, export_colors=color_sheet)
+
+    def export_tables(
+        self, input_boxscores: Iterable[bytes], timeout: float | None = None
+    ) -> GetFebStatsTablesResponse:
+        return league_to_tables(self.parse_boxscores(input_boxscores))
+
+
+# Games cache of each worker process of a ProcessPoolLeagueHandler
+_worker_game_cache: GameCache | None = None
+
+
+def _init_worker(cache_dir: str | None) -> None:
+    global _worker_game_cache
+    _worker_game_cache = GameCache(cache_dir) if cache_dir is not None else None
+
+
+def _warm_up_worker() -> int:
+    return os.getpid()
+
+
+def _games_before_deadline(games: Iterable[Game], deadline: float | None) -> Iterator[Game]:
+    """Stops an export once its caller has stopped waiting for it, so that its worker is freed for the next requests
+    instead of finishing a result nobody will read. The deadline is checked before each game.
+    :param games: Games of the export.
+    :param deadline: Time (as in `time.time`) the caller waits for the export until, or None if it has no deadline.
+    :return: An iterator over the games.
+    """
+    for game in games:
+        if deadline is not None and time.time() > deadline:
+            raise TimeoutError("The league could not be exported before the deadline.")
+        yield game
+
+
+class _StreamedBoxscores:
+    """Boxscores streamed to a worker process through a queue, ended by None. Workers are spawned, so the queue is a
+    proxy of a manager process.
+    """
+
+    def __init__(self, boxscores_queue: "queue.Queue[bytes | Exception | None]", deadline: float | None) -> None:
+        self.boxscores_queue = boxscores_queue
+        self.deadline = deadline
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            try:
+                item = self.boxscores_queue.get(
+                    timeout=max(0.0, self.deadline - time.time()) if self.deadline is not None else None
+                )
+            except queue.Empty as e:
+                raise TimeoutError("The league could not be exported before the deadline.") from e
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+def _parse_boxscores_in_worker(input_boxscores: Iterable[bytes], deadline: float | None) -> League:
+    games = FEBLivescoreParser.iter_games(input_boxscores, FEBLivescoreParser.read_link_bytes, cache=_worker_game_cache)
+    return aggregate_games(_games_before_deadline(games, deadline))
+
+
+def _export_boxscores_in_worker(input_boxscores: Iterable[bytes], color_sheet: bool, deadline: float | None) -> bytes:
+    return league_to_xlsx(_parse_boxscores_in_worker(input_boxscores, deadline), export_colors=color_sheet)
+
+
+def _export_tables_in_worker(input_boxscores: Iterable[bytes], deadline: float | None) -> bytes:
+    return league_to_tables(_parse_boxscores_in_worker(input_boxscores, deadline)).SerializeToString()
+
+
+class ProcessPoolLeagueHandler(LeagueHandler):
+    """Exports leagues in a pool of worker processes, so that concurrent requests are not serialized by the GIL.
+
+    At most `n_workers` exports run at the same time and `max_queue_size` more wait for a worker. Further requests
+    are rejected with a `HandlerBusyException` instead of queueing without bound.
+
+    The boxscores of each request are streamed to its worker as they are read, with at most `stream_buffer_size` of
+    them waiting in between, so a streamed upload is not held in memory.
+    """
+
+    stream_buffer_size = 4
+
+    def __init__(self, n_workers: int, max_queue_size: int = 0, cache_dir: str | None = None) -> None:
+        """
+        :param n_workers: Number of worker processes.
+        :param max_queue_size: Number of requests that can wait for a free worker.
+        :param cache_dir: Directory of the parsed games cache, shared by the workers. If not set, games are not cached.
+        """
+        self.n_workers = n_workers
+        self.max_queue_size = max_queue_size
+        # Workers are spawned, not forked: forking a process that runs gRPC threads is unsafe.
+        self.executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(cache_dir,),
+        )
+        self._slots = threading.BoundedSemaphore(n_workers + max_queue_size)
+        # Owner of the queues that stream the boxscores to the workers
+        self.manager = multiprocessing.get_context("spawn").Manager()
+        # Start all the workers now, so the first requests do not pay for it
+        warm_up_futures = [self.executor.submit(_warm_up_worker) for _ in range(n_workers)]
+        for future in warm_up_futures:
+            future.result()
+
+    def _release_slot(self, _future: Future[Any]) -> None:
+        self._slots.release()
+
+    def _run(self, timeout: float | None, fn: Callable[..., T], input_boxscores: Iterable[bytes], *args: Any) -> T:
+        """Runs a function in a worker, if there is room for it, streaming the boxscores to it.
+        If the result is not ready within `timeout`, a `TimeoutError` is raised and the call is cancelled if it has not
+        started yet. A running call is given the same deadline, and stops at the next game once it is over; it keeps
+        its worker, and its slot, until then.
+        :param timeout: Maximum time to wait for the result, in seconds.
+        :param fn: Function to run. It must be picklable, and take the boxscores as its first argument and the deadline
+        as its last one.
+        :param input_boxscores: Boxscores to stream to the function.
+        :param args: Arguments of the function, besides the boxscores and the deadline. They must be picklable.
+        :return: The result of the function.
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        if not self._slots.acquire(blocking=False):
+            raise HandlerBusyException(
+                f"All the {self.n_workers} workers are busy and {self.max_queue_size} requests are waiting."
+            )
+        try:
+            boxscores_queue = self.manager.Queue(maxsize=self.stream_buffer_size)
+            future = self.executor.submit(fn, _StreamedBoxscores(boxscores_queue, deadline), *args, deadline)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is released once the export finishes, even if the caller stops waiting for it
+        future.add_done_callback(self._release_slot)
+        try:
+            self._stream_boxscores(input_boxscores, boxscores_queue, future, deadline)
+            return future.result(timeout=max(0.0, deadline - time.time()) if deadline is not None else None)
+        except concurrent.futures.TimeoutError as e:
+            future.cancel()
+            # Before Python 3.11, futures raise their own TimeoutError instead of the builtin one
+            raise TimeoutError("The league could not be exported before the deadline.") from e
+
+    @staticmethod
+    def _stream_boxscores(
+        input_boxscores: Iterable[bytes],
+        boxscores_queue: "queue.Queue[bytes | Exception | None]",
+        future: Future[Any],
+        deadline: float | None,
+    ) -> None:
+        """Puts the boxscores in the queue of a worker as they are read, waiting while the queue is full. It stops if
+        the worker finishes early (i.e. it failed), and if reading the boxscores fails, the worker is stopped as well.
+        :param input_boxscores: Boxscores to stream.
+        :param boxscores_queue: Queue of the worker.
+        :param future: Result of the worker.
+        :param deadline: Time (as in `time.time`) to stream the boxscores until, or None if there is no deadline.
+        """
+
+        def put(item: bytes | Exception | None, deadline: float | None) -> bool:
+            while not future.done():
+                if deadline is not None and time.time() > deadline:
+                    raise TimeoutError("The league could not be exported before the deadline.")
+                try:
+                    boxscores_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            for boxscore in input_boxscores:
+                if not put(boxscore, deadline):
+                    return
+            put(None, deadline)
+        except BaseException:
+            # A running worker keeps reading the queue, so there is room for the error
+            if not future.cancel():
+                put(RequestAbortedException("The boxscores could not be read."), None)
+            raise
+
+    def export_boxscores(
+        self, input_boxscores: Iterable[bytes], color_sheet: bool, timeout: float | None = None
+    ) -> bytes:
+        return self._run(timeout, _export_boxscores_in_worker, input_boxscores, color_sheet)
+
+    def export_tables(
+        self, input_boxscores: Iterable[bytes], timeout: float | None = None
+    ) -> GetFebStatsTablesResponse:
+        tables = self._run(timeout, _export_tables_in_worker, input_boxscores)
+        return GetFebStatsTablesResponse.FromString(tables)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.manager.shutdown()
+
+
+class GrpcLeagueHandler(LeagueHandler):
+    """Exports leagues in a remote FebStatsService. The channel is opened once and multiplexes the calls of all the
+    threads, so a single handler serves concurrent requests.
+    """
+
+    def __init__(
+        self, address: str, options: list[tuple[str, int]] | None = None, timeout: float | None = None
+    ) -> None:
+        """
+        :param address: Address of the service.
+        :param options: Options of the gRPC channel.
+        :param timeout: Default deadline of each call, in seconds. If not set, calls have no deadline.
+        """
         self.address = address
+        self.options = options
+        self.timeout = timeout
         self.channel = insecure_channel(self.address, options=self.options)
-        self.league: League | None = None
+        self.stub = feb_stats_pb2_grpc.FebStatsServiceStub(self.channel)
 
-    def parse_boxscores(self, input_boxscores: list[bytes]) -> None:
-        league = FEBLivescoreParser.parse_boxscores(input_boxscores, FEBLivescoreParser.read_link_bytes)
-        self.league = compute_league_aggregates(league)
-        return None
+    @contextmanager
+    def _translate_errors(self) -> Iterator[None]:
+        """Turns the gRPC errors of an overloaded service or an expired deadline into the errors of the other league
+        handlers.
+        """
+        try:
+            yield
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED:
+                raise HandlerBusyException(e.details()) from e
+            if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                raise TimeoutError(e.details()) from e
+            raise
+
+    def export_boxscores(
+        self, input_boxscores: Iterable[bytes], color_sheet: bool, timeout: float | None = None
+    ) -> bytes:
+        # The boxscores are uploaded as they are read, one per message
+        requests = (StreamFebStatsRequest(boxscore=boxscore, color_sheet=color_sheet) for boxscore in input_boxscores)
+        with self._translate_errors():
+            responses = self.stub.StreamFebStats(requests, timeout=timeout if timeout is not None else self.timeout)
+            return b"".join(response.sheet_chunk for response in responses)
 
-    def export_boxscores(self, input_boxscores: list[bytes], color_sheet: bool) -> bytes:
-        self.parse_boxscores(input_boxscores)
-        assert self.league is not None
-        return league_to_xlsx(self.league, export_colors=color_sheet)
+    def export_tables(
+        self, input_boxscores: Iterable[bytes], timeout: float | None = None
+    ) -> GetFebStatsTablesResponse:
+        with self._translate_errors():
+            tables: GetFebStatsTablesResponse = self.stub.GetFebStatsTables(
+                GetFebStatsTablesRequest(boxscores=input_boxscores),
+                timeout=timeout if timeout is not None else self.timeout,
+            )
+            return tables
 
-    def clean_league(self) -> None:
-        self.league = None
+    def close(self) -> None:
+        self.channel.close()
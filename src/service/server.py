@@ -1,4 +1,5 @@
 import argparse
+import asyncio
 import logging
 import os
 import signal
@@ -9,9 +10,10 @@ from typing import Any
 import grpc
 from grpc_reflection.v1alpha import reflection
 
-from src.service.api import FebStatsServiceServicer
+from src.core.parsers.cache import GameCache
+from src.service.api import MAX_UPLOAD_SIZE, AsyncFebStatsServiceServicer, FebStatsServiceServicer
 from src.service.codegen import feb_stats_pb2, feb_stats_pb2_grpc
-from src.service.handler import SimpleLeagueHandler
+from src.service.handler import GRPC_OPTIONS, LeagueHandler, ProcessPoolLeagueHandler, SimpleLeagueHandler
 
 logger = logging.getLogger(__name__)
 
@@ -40,36 +42,120 @@ def get_parser() -> argparse.ArgumentParser:
         default=6831,
         type=int,
     )
+    parser.add_argument(
+        "--cache-dir",
+        action="store",
+        dest="cache_dir",
+        default=None,
+        type=str,
+        help="Directory of the parsed games cache. If not set, games are not cached.",
+    )
+    parser.add_argument(
+        "--max-workers",
+        action="store",
+        dest="max_workers",
+        default=None,
+        type=int,
+        help="Number of requests served concurrently. Defaults to the number of CPUs, up to 32.",
+    )
+    parser.add_argument(
+        "--processes",
+        action="store",
+        dest="n_processes",
+        default=None,
+        type=int,
+        help="Export the leagues in a pool of this many worker processes. If not set, they are exported in the "
+        "server threads.",
+    )
+    parser.add_argument(
+        "--max-queue-size",
+        action="store",
+        dest="max_queue_size",
+        default=0,
+        type=int,
+        help="Number of requests that wait for a free worker process. Further requests are rejected with "
+        "RESOURCE_EXHAUSTED. Only used with --processes.",
+    )
+    parser.add_argument(
+        "--aio",
+        action="store_true",
+        dest="aio",
+        help="Serve with an asyncio server: requests are received on the event loop and the leagues are exported in "
+        "a pool of --max-workers threads.",
+    )
+    parser.add_argument(
+        "--max-concurrent-rpcs",
+        action="store",
+        dest="max_concurrent_rpcs",
+        default=None,
+        type=int,
+        help="Number of requests in progress, including the ones still being received. Further requests are rejected "
+        "with RESOURCE_EXHAUSTED. Only used with --aio.",
+    )
+    parser.add_argument(
+        "--max-upload-size",
+        action="store",
+        dest="max_upload_size",
+        default=MAX_UPLOAD_SIZE,
+        type=int,
+        help="Limit of the boxscores of a StreamFebStats upload, in bytes. Larger uploads are rejected with "
+        "RESOURCE_EXHAUSTED. Only used with --aio.",
+    )
     return parser
 
 
+def build_league_handler(
+    cache_dir: str | None = None, n_processes: int | None = None, max_queue_size: int = 0
+) -> LeagueHandler:
+    """Builds the league handler of a server. It is stateless, so it is shared by all the requests.
+    :param cache_dir: Directory of the parsed games cache. If not set, games are not cached.
+    :param n_processes: Export the leagues in a pool of this many worker processes. If not set, they are exported in
+    the calling threads.
+    :param max_queue_size: Number of requests that wait for a free worker process.
+    :return: The league handler.
+    """
+    if n_processes is not None:
+        return ProcessPoolLeagueHandler(n_processes, max_queue_size=max_queue_size, cache_dir=cache_dir)
+    return SimpleLeagueHandler(game_cache=GameCache(cache_dir) if cache_dir is not None else None)
+
+
 class Server:
     def __init__(
         self,
         address: str,
+        cache_dir: str | None = None,
+        max_workers: int | None = None,
+        n_processes: int | None = None,
+        max_queue_size: int = 0,
     ) -> None:
-        executor = futures.ThreadPoolExecutor(max_workers=min(32, os.cpu_count() or 1))  # Python 3.8 default
-        max_message_length = 100 * 1024 * 1024
-        options = [
-            ("grpc.max_receive_message_length", max_message_length),
-            ("grpc.max_send_message_length", max_message_length),
-        ]
+        """
+        :param address: Address the server listens to.
+        :param cache_dir: Directory of the parsed games cache. If not set, games are not cached.
+        :param max_workers: Number of server threads. Defaults to the number of CPUs, up to 32, or to the number of
+        requests that the process pool accepts.
+        :param n_processes: Export the leagues in a pool of this many worker processes. If not set, they are exported in
+        the server threads.
+        :param max_queue_size: Number of requests that wait for a free worker process.
+        """
+        if max_workers is None:
+            if n_processes is not None:
+                # Enough threads to wait for every accepted request; the rest are rejected right away
+                max_workers = n_processes + max_queue_size + 1
+            else:
+                max_workers = min(32, os.cpu_count() or 1)  # Python 3.8 default
+        executor = futures.ThreadPoolExecutor(max_workers=max_workers)
 
         self.server = grpc.server(
             thread_pool=executor,
-            options=options,
+            options=GRPC_OPTIONS,
         )
         reflection.enable_server_reflection(
             SERVICE_NAMES,
             self.server,
         )
 
-        feb_stats_servicer = FebStatsServiceServicer(
-            SimpleLeagueHandler(
-                "localhost:9000",
-                options=options,
-            )
-        )
+        self.league_handler = build_league_handler(cache_dir, n_processes, max_queue_size)
+        feb_stats_servicer = FebStatsServiceServicer(self.league_handler)
         # TODO: Add healing
         feb_stats_pb2_grpc.add_FebStatsServiceServicer_to_server(
             feb_stats_servicer,
@@ -90,18 +176,116 @@ class Server:
         self.server.start()
 
     def stop(self, grace: int = 30) -> None:
-        self.server.stop(grace)
+        self.server.stop(grace).wait()
+        self.league_handler.close()
 
     def wait_for_termination(self) -> None:
         self.server.wait_for_termination()
+        self.league_handler.close()
+
+
+class AsyncServer:
+    """`grpc.aio` server. Requests are received on the event loop, so slow clients do not hold a thread, and the leagues
+    are exported in a thread pool. It must be built and used within a running event loop.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        cache_dir: str | None = None,
+        max_workers: int | None = None,
+        n_processes: int | None = None,
+        max_queue_size: int = 0,
+        max_concurrent_rpcs: int | None = None,
+        max_upload_size: int = MAX_UPLOAD_SIZE,
+    ) -> None:
+        """
+        :param address: Address the server listens to.
+        :param cache_dir: Directory of the parsed games cache. If not set, games are not cached.
+        :param max_workers: Number of threads that export leagues. Defaults to the number of CPUs, up to 32, or to the
+        number of requests that the process pool accepts.
+        :param n_processes: Export the leagues in a pool of this many worker processes. If not set, they are exported in
+        the threads.
+        :param max_queue_size: Number of requests that wait for a free worker process.
+        :param max_concurrent_rpcs: Number of requests in progress, including the ones still being received. Further
+        requests are rejected with RESOURCE_EXHAUSTED. If not set, there is no limit.
+        :param max_upload_size: Limit of the boxscores of a StreamFebStats upload, in bytes. Larger uploads are rejected
+        with RESOURCE_EXHAUSTED.
+        """
+        if max_workers is None:
+            if n_processes is not None:
+                max_workers = n_processes + max_queue_size + 1
+            else:
+                max_workers = min(32, os.cpu_count() or 1)
+        self.executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+
+        self.server = grpc.aio.server(
+            options=GRPC_OPTIONS,
+            maximum_concurrent_rpcs=max_concurrent_rpcs,
+        )
+        reflection.enable_server_reflection(
+            SERVICE_NAMES,
+            self.server,
+        )
+
+        self.league_handler = build_league_handler(cache_dir, n_processes, max_queue_size)
+        feb_stats_pb2_grpc.add_FebStatsServiceServicer_to_server(
+            AsyncFebStatsServiceServicer(self.league_handler, executor=self.executor, max_upload_size=max_upload_size),
+            self.server,
+        )
+        self._stop_task: asyncio.Task[None] | None = None
+
+        self.port = self.server.add_insecure_port(address)
+        logger.info(f"Async server built. Port: {self.port}")
+
+    def _sigterm_handler(self) -> None:
+        self._stop_task = asyncio.create_task(self.server.stop(30))
+
+    async def start(self) -> None:
+        await self.server.start()
+        asyncio.get_running_loop().add_signal_handler(signal.Signals.SIGTERM, self._sigterm_handler)
+
+    def _close(self) -> None:
+        asyncio.get_running_loop().remove_signal_handler(signal.Signals.SIGTERM)
+        self.executor.shutdown(wait=False)
+        self.league_handler.close()
+
+    async def stop(self, grace: float = 30) -> None:
+        await self.server.stop(grace)
+        self._close()
+
+    async def wait_for_termination(self) -> None:
+        await self.server.wait_for_termination()
+        self._close()
+
+
+async def serve_async(args: argparse.Namespace) -> None:
+    server = AsyncServer(
+        address=f"[::]:{args.port}",
+        cache_dir=args.cache_dir,
+        max_workers=args.max_workers,
+        n_processes=args.n_processes,
+        max_queue_size=args.max_queue_size,
+        max_concurrent_rpcs=args.max_concurrent_rpcs,
+        max_upload_size=args.max_upload_size,
+    )
+    await server.start()
+    await server.wait_for_termination()
 
 
 if __name__ == "__main__":
     parser = get_parser()
     args = parser.parse_args()
-    server = Server(
-        address=f"[::]:{args.port}",
-    )
-    server.start()
-    server.wait_for_termination()
-    server.stop()
+    if args.aio:
+        asyncio.run(serve_async(args))
+    else:
+        server = Server(
+            address=f"[::]:{args.port}",
+            cache_dir=args.cache_dir,
+            max_workers=args.max_workers,
+            n_processes=args.n_processes,
+            max_queue_size=args.max_queue_size,
+        )
+        server.start()
+        # It closes the league handler once the server stops
+        server.wait_for_termination()
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from src.core.analysis.entities import League
+from src.service.codegen.feb_stats_pb2 import Column, GetFebStatsTablesResponse, Table
+
+NUMERIC_DTYPES = frozenset({"floating", "integer", "mixed-integer-float", "decimal", "boolean", "empty"})
+DURATION_DTYPES = frozenset({"timedelta", "timedelta64"})
+
+
+def series_to_column(name: str, s: pd.Series) -> Column:
+    """Converts a series to a table column. Numbers and durations, in seconds, are packed as doubles, with NaN for the
+    missing values; any other value is converted to text.
+    :param name: Name of the column.
+    :param s: Values of the column.
+    :return: The column.
+    """
+    inferred_dtype = pd.api.types.infer_dtype(s, skipna=True)
+    if inferred_dtype in DURATION_DTYPES:
+        numbers: list[float] = pd.to_timedelta(s).dt.total_seconds().to_numpy(np.float64).tolist()
+        return Column(name=name, numbers=numbers)
+    if inferred_dtype in NUMERIC_DTYPES:
+        numbers = pd.to_numeric(s, errors="coerce").to_numpy(np.float64, na_value=np.nan).tolist()
+        return Column(name=name, numbers=numbers)
+    return Column(name=name, texts=["" if pd.isnull(x) else str(x) for x in s])
+
+
+def df_to_table(name: str, df: pd.DataFrame) -> Table:
+    """Converts a dataframe to a table, one column per dataframe column. A named index is kept as the first column.
+    :param name: Name of the table.
+    :param df: Dataframe to convert.
+    :return: The table.
+    """
+    if df.index.name is not None:
+        df = df.reset_index()
+    return Table(name=name, columns=[series_to_column(str(column), df[column]) for column in df.columns])
+
+
+def league_to_tables(league: League) -> GetFebStatsTablesResponse:
+    """Converts the aggregated stats of a league to tables: one for the league, and one for each team.
+    :param league: League, with its aggregates computed.
+    :return: The tables of the league and of its teams.
+    """
+    assert league.aggregated_games is not None
+    return GetFebStatsTablesResponse(
+        league=df_to_table(league.name, league.aggregated_games),
+        teams=[df_to_table(team.name, team.season_stats) for team in league.teams if team.season_stats is not None],
+    )
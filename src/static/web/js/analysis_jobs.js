@@ -0,0 +1,61 @@
+// Forms that queue an analysis job: instead of waiting for the sheet in the request, the job is queued, its status is
+// polled and the sheet is downloaded once it is done.
+document.addEventListener('DOMContentLoaded', function() {
+    const pollInterval = 2000;
+    const flashMessages = document.querySelector('.flash-messages');
+
+    function showError(message) {
+        const alert = document.createElement('div');
+        alert.className = 'alert alert-danger alert-dismissible fade show';
+        alert.setAttribute('role', 'alert');
+        alert.textContent = message;
+        const close = document.createElement('button');
+        close.type = 'button';
+        close.className = 'close';
+        close.setAttribute('data-dismiss', 'alert');
+        close.setAttribute('aria-label', 'Close');
+        close.innerHTML = '<span aria-hidden="true">&times;</span>';
+        alert.appendChild(close);
+        flashMessages.appendChild(alert);
+    }
+
+    async function waitForJob(job) {
+        while (job.status === 'queued' || job.status === 'running') {
+            await new Promise(resolve => setTimeout(resolve, pollInterval));
+            const response = await fetch(job.status_url);
+            if (!response.ok) {
+                throw new Error('No se ha podido consultar el estado del análisis');
+            }
+            job = await response.json();
+        }
+        return job;
+    }
+
+    document.querySelectorAll('form[data-analysis-job]').forEach(function(form) {
+        const button = form.querySelector('button[type="submit"]');
+        const buttonText = button.textContent;
+
+        form.addEventListener('submit', async function(event) {
+            event.preventDefault();
+            button.disabled = true;
+            button.textContent = 'Analizando...';
+            try {
+                const response = await fetch(form.action, {method: 'POST', body: new FormData(form)});
+                let job = await response.json();
+                if (!response.ok) {
+                    throw new Error(job.error);
+                }
+                job = await waitForJob(job);
+                if (job.status !== 'done') {
+                    throw new Error(`Error al procesar los archivos: ${job.error}`);
+                }
+                window.location = job.download_url;
+            } catch (error) {
+                showError(error.message);
+            } finally {
+                button.disabled = false;
+                button.textContent = buttonText;
+            }
+        });
+    });
+});
@@ -0,0 +1,12 @@
+import functools
+
+from django.conf import settings
+
+from src.core.parsers.cache import GameCache
+
+
+@functools.cache
+def get_game_cache() -> GameCache | None:
+    if settings.GAMES_CACHE_FOLDER is None:
+        return None
+    return GameCache(settings.GAMES_CACHE_FOLDER, max_size=settings.GAMES_CACHE_MAX_SIZE)
@@ -0,0 +1,198 @@
+import hashlib
+import itertools
+import json
+import logging
+import time
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from src.core.scrapers.actions import iter_boxscores_from_calendar_url
+from src.service.handler import LeagueHandler
+from src.web.helpers.read_write import read_boxscores_from_files, remove_boxscore_files
+from src.web.models import AnalysisJob
+
+logger = logging.getLogger(__name__)
+
+
+def get_job_key(calendar_url: str, season: str | None, group_id: str | None, color_sheet: bool) -> str:
+    """Key of an analysis: requests of the same calendar, season, group and style share it.
+    :param calendar_url: URL of the calendar.
+    :param season: Season of the calendar.
+    :param group_id: Group of the calendar.
+    :param color_sheet: Add a color style to the output xlsx file.
+    :return: The key, as a hex digest.
+    """
+    params = json.dumps([calendar_url, season or None, group_id or None, color_sheet])
+    return hashlib.sha256(params.encode()).hexdigest()
+
+
+def get_upload_job_key(upload_id: str, color_sheet: bool) -> str:
+    """Key of the analysis of an upload session.
+    :param upload_id: Id of the upload session.
+    :param color_sheet: Add a color style to the output xlsx file.
+    :return: The key, as a hex digest.
+    """
+    params = json.dumps(["upload", upload_id, color_sheet])
+    return hashlib.sha256(params.encode()).hexdigest()
+
+
+def queue_job(key: str, reusable_since: datetime, **fields: Any) -> AnalysisJob:
+    """Queues a job, unless another one with the same key is queued, running or finished after `reusable_since`.
+    :param key: Key of the analysis.
+    :param reusable_since: Finished jobs older than this are not reused.
+    :param fields: Parameters of the analysis, as fields of the job.
+    :return: The job of the analysis.
+    """
+    for _ in range(2):
+        job = (
+            AnalysisJob.objects.filter(key=key)
+            .filter(
+                Q(status__in=AnalysisJob.ACTIVE_STATUSES)
+                | Q(status=AnalysisJob.Status.DONE, updated_at__gte=reusable_since)
+            )
+            .order_by("-created_at")
+            .first()
+        )
+        if job is not None:
+            return job
+        try:
+            with transaction.atomic():
+                return AnalysisJob.objects.create(key=key, **fields)
+        except IntegrityError:
+            # An equal request queued the same analysis in the meantime
+            continue
+    raise RuntimeError(f"The analysis {key} could not be queued.")
+
+
+def submit_job(calendar_url: str, season: str | None, group_id: str | None, color_sheet: bool) -> AnalysisJob:
+    """Queues the analysis of a calendar. If an equal analysis is queued, running or recently finished, it is returned
+    instead of queueing a new one.
+    :param calendar_url: URL of the calendar.
+    :param season: Season of the calendar.
+    :param group_id: Group of the calendar.
+    :param color_sheet: Add a color style to the output xlsx file.
+    :return: The job of the analysis.
+    """
+    return queue_job(
+        get_job_key(calendar_url, season, group_id, color_sheet),
+        timezone.now() - timedelta(seconds=settings.JOBS_RESULT_MAX_AGE),
+        calendar_url=calendar_url,
+        season=season or None,
+        group_id=group_id or None,
+        color_sheet=color_sheet,
+    )
+
+
+def submit_upload_job(upload_id: str, color_sheet: bool) -> AnalysisJob:
+    """Queues the analysis of the boxscores staged by an upload session. The job takes over the staged files and removes
+    them once it has run, so the session must stage its next uploads under a new id.
+    :param upload_id: Id of the upload session.
+    :param color_sheet: Add a color style to the output xlsx file.
+    :return: The job of the analysis. A repeated request returns the queued or running job of the session.
+    """
+    # Finished jobs are never reused: the staged files are gone by then
+    return queue_job(
+        get_upload_job_key(upload_id, color_sheet),
+        timezone.now(),
+        upload_id=upload_id,
+        color_sheet=color_sheet,
+    )
+
+
+def claim_job() -> AnalysisJob | None:
+    """Takes the oldest queued job, or a running one that has not finished within JOBS_TIMEOUT (its worker is assumed to
+    be dead). The claim is atomic, so each job is run by a single worker.
+    :return: The claimed job, or None if there is none.
+    """
+    stale_since = timezone.now() - timedelta(seconds=settings.JOBS_TIMEOUT)
+    candidates = AnalysisJob.objects.filter(
+        Q(status=AnalysisJob.Status.QUEUED) | Q(status=AnalysisJob.Status.RUNNING, updated_at__lt=stale_since)
+    )
+    for job_id, status, updated_at in candidates.order_by("created_at").values_list("id", "status", "updated_at"):
+        # Nobody else claimed it since it was listed
+        claimed = AnalysisJob.objects.filter(id=job_id, status=status, updated_at=updated_at).update(
+            status=AnalysisJob.Status.RUNNING, updated_at=timezone.now()
+        )
+        if claimed:
+            return AnalysisJob.objects.get(id=job_id)
+    return None
+
+
+def iter_job_boxscores(job: AnalysisJob) -> Iterator[bytes]:
+    """Boxscores of a job: the staged files of its upload session, or the games of its calendar.
+    :param job: Claimed job.
+    :return: An iterator over the boxscores, which has at least one of them.
+    """
+    if job.upload_id:
+        boxscores = iter(read_boxscores_from_files(job.upload_id))
+        error = "No se han encontrado actas para analizar"
+    else:
+        # Boxscores are parsed while the rest of them are being downloaded.
+        boxscores = iter_boxscores_from_calendar_url(job.calendar_url, season=job.season, group_id=job.group_id)
+        error = (
+            f"No se han encontrado actas para analizar para la url: "
+            f"{job.calendar_url} - Temporada {job.season} - Grupo: {job.group_id}"
+        )
+    first_boxscore = next(boxscores, None)
+    if first_boxscore is None:
+        raise ValueError(error)
+    return itertools.chain([first_boxscore], boxscores)
+
+
+def run_job(job: AnalysisJob, league_handler: LeagueHandler) -> None:
+    """Analyzes the boxscores of a job, and stores the resulting sheet or error in it. The staged files of an upload
+    job are removed afterwards.
+    :param job: Claimed job.
+    :param league_handler: Handler that exports the league.
+    """
+    try:
+        job.sheet = league_handler.export_boxscores(
+            iter_job_boxscores(job), job.color_sheet, timeout=settings.STATS_TIMEOUT
+        )
+        job.status = AnalysisJob.Status.DONE
+    except Exception as error:
+        logger.exception(f"Analysis job {job.id} failed")
+        job.error = str(error)
+        job.status = AnalysisJob.Status.FAILED
+    finally:
+        if job.upload_id:
+            remove_boxscore_files(job.upload_id)
+    job.save(update_fields=["sheet", "error", "status", "updated_at"])
+
+
+def delete_expired_jobs() -> int:
+    """Deletes the finished and failed jobs older than JOBS_RESULT_MAX_AGE, along with their sheets. They are no longer
+    reused by `submit_job`, so keeping them would only grow the database.
+    :return: Number of deleted jobs.
+    """
+    expired_since = timezone.now() - timedelta(seconds=settings.JOBS_RESULT_MAX_AGE)
+    n_deleted, _ = AnalysisJob.objects.filter(
+        status__in=[AnalysisJob.Status.DONE, AnalysisJob.Status.FAILED], updated_at__lt=expired_since
+    ).delete()
+    return n_deleted
+
+
+def run_worker(league_handler: LeagueHandler, stop_when_empty: bool = False) -> int:
+    """Runs the queued jobs, waiting JOBS_POLL_INTERVAL seconds for new ones when the queue is empty. Expired jobs are
+    deleted on each poll.
+    :param league_handler: Handler that exports the leagues.
+    :param stop_when_empty: Return once the queue is empty, instead of waiting for new jobs.
+    :return: Number of jobs run.
+    """
+    n_jobs = 0
+    while True:
+        delete_expired_jobs()
+        job = claim_job()
+        if job is None:
+            if stop_when_empty:
+                return n_jobs
+            time.sleep(settings.JOBS_POLL_INTERVAL)
+            continue
+        run_job(job, league_handler)
+        n_jobs += 1
@@ -0,0 +1,17 @@
+import functools
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from src.service.handler import GRPC_OPTIONS, GrpcLeagueHandler, LeagueHandler, SimpleLeagueHandler
+from src.web.helpers.cache import get_game_cache
+
+
+@functools.cache
+def get_league_handler() -> LeagueHandler:
+    if settings.STATS_ENGINE == "local":
+        return SimpleLeagueHandler(game_cache=get_game_cache())
+    if settings.STATS_ENGINE == "grpc":
+        grpc_address = f"{settings.PORTS['grpc_address']}:{settings.PORTS['grpc_port']}"
+        return GrpcLeagueHandler(address=grpc_address, options=GRPC_OPTIONS, timeout=settings.STATS_TIMEOUT)
+    raise ImproperlyConfigured(f"Unknown STATS_ENGINE: {settings.STATS_ENGINE}")
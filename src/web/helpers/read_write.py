@@ -1,8 +1,12 @@
-import os
+import shutil
+from collections.abc import Iterable
 from pathlib import Path
 
 from django.conf import settings
 
+# File of an upload directory that lists its boxscores, in upload order
+MANIFEST_FILENAME = "manifest.txt"
+
 
 def read_file(filename: str) -> bytes:
     with open(filename, mode="rb") as f:
@@ -10,21 +14,48 @@ def read_file(filename: str) -> bytes:
     return read_f
 
 
-def get_boxscore_files() -> list[str]:
-    return [
-        str(file)
-        for extension in settings.ALLOWED_FILE_EXTENSIONS
-        for file in Path(settings.UPLOAD_FOLDER).glob(f"*.{extension}")
-    ]
-
-
-def read_boxscores_from_files() -> list[bytes]:
-    return [read_file(filename) for filename in get_boxscore_files()]
-
-
-def remove_boxscore_files() -> None:
-    for filename in get_boxscore_files():
-        os.remove(filename)
+def get_upload_dir(upload_id: str) -> Path:
+    """Staging directory of an upload session. Each session has its own, so users do not see each other's files."""
+    return Path(settings.UPLOAD_FOLDER) / upload_id
+
+
+def save_boxscore_file(upload_id: str, filename: str, chunks: Iterable[bytes]) -> Path:
+    """Saves an uploaded boxscore in the staging directory of an upload session and adds it to its manifest.
+    :param upload_id: Id of the upload session.
+    :param filename: Name of the file. It must be a secure filename.
+    :param chunks: Content of the file.
+    :return: Path of the saved file.
+    """
+    upload_dir = get_upload_dir(upload_id)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    filepath = upload_dir / filename
+    with open(filepath, "wb+") as destination:
+        for chunk in chunks:
+            destination.write(chunk)
+    # Appending a line is atomic, so concurrent uploads of the same session do not corrupt the manifest
+    with open(upload_dir / MANIFEST_FILENAME, mode="a") as manifest:
+        manifest.write(f"{filename}\n")
+    return filepath
+
+
+def get_boxscore_files(upload_id: str) -> list[str]:
+    """Boxscore files of an upload session, from its manifest."""
+    upload_dir = get_upload_dir(upload_id)
+    try:
+        with open(upload_dir / MANIFEST_FILENAME) as manifest:
+            # A file uploaded twice is listed twice
+            filenames = dict.fromkeys(manifest.read().splitlines())
+    except FileNotFoundError:
+        return []
+    return [str(upload_dir / filename) for filename in filenames]
+
+
+def read_boxscores_from_files(upload_id: str) -> list[bytes]:
+    return [read_file(filename) for filename in get_boxscore_files(upload_id)]
+
+
+def remove_boxscore_files(upload_id: str) -> None:
+    shutil.rmtree(get_upload_dir(upload_id), ignore_errors=True)
 
 
 def is_allowed_file_extension(filename: str) -> bool:
@@ -0,0 +1,42 @@
+import multiprocessing
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connections
+
+from src.web.helpers.jobs import run_worker
+from src.web.helpers.league_handler import get_league_handler
+
+
+class Command(BaseCommand):
+    help = "Run the queued background analyses"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--workers", action="store", type=int, dest="workers", default=1)
+        parser.add_argument(
+            "--stop-when-empty",
+            action="store_true",
+            dest="stop_when_empty",
+            help="Exit once the queue is empty, instead of waiting for new jobs.",
+        )
+        return
+
+    def run_worker(self, stop_when_empty: bool) -> None:
+        n_jobs = run_worker(get_league_handler(), stop_when_empty=stop_when_empty)
+        self.stdout.write(f"Worker finished after running {n_jobs} jobs.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["workers"] <= 1:
+            self.run_worker(options["stop_when_empty"])
+            return
+        # Worker processes must not share the database connections of the parent
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=self.run_worker, args=(options["stop_when_empty"],))
+            for _ in range(options["workers"])
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("web", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="analysisjob",
+            name="calendar_url",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="analysisjob",
+            name="upload_id",
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+    ]
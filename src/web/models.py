@@ -0,0 +1,46 @@
+import uuid
+
+from django.db import models
+
+
+class AnalysisJob(models.Model):
+    """Analysis of the games of a calendar, or of the boxscores of an upload session, run in the background by the
+    `run_analysis_jobs` workers.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    ACTIVE_STATUSES = (Status.QUEUED, Status.RUNNING)
+
+    id: models.UUIDField = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Hash of the analysis parameters: equal requests share the same job
+    key: models.CharField = models.CharField(max_length=64, db_index=True)
+    calendar_url: models.TextField = models.TextField(blank=True)
+    season: models.CharField = models.CharField(max_length=32, null=True, blank=True)
+    group_id: models.CharField = models.CharField(max_length=32, null=True, blank=True)
+    # Upload session whose staged boxscores are analyzed, instead of the games of a calendar
+    upload_id: models.CharField = models.CharField(max_length=32, null=True, blank=True)
+    color_sheet: models.BooleanField = models.BooleanField(default=False)
+    status: models.CharField = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.QUEUED, db_index=True
+    )
+    sheet: models.BinaryField = models.BinaryField(null=True, blank=True)
+    error: models.TextField = models.TextField(blank=True)
+    created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+    updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["key"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="unique_active_analysis_job",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.id} ({self.status})"
@@ -1,10 +1,19 @@
 from django.urls import path
 
-from src.web.views import AnalyzeUrlView, AnalyzeView, IndexView, UploadView
+from src.web.views import (
+    AnalyzeView,
+    IndexView,
+    JobDownloadView,
+    JobStatusView,
+    JobSubmitView,
+    UploadView,
+)
 
 urlpatterns = [
     path("", IndexView.as_view(), name="index"),
     path("upload/", UploadView.as_view(), name="upload"),
     path("analyze/", AnalyzeView.as_view(), name="analyze"),
-    path("analyze_url/", AnalyzeUrlView.as_view(), name="analyze_url"),
+    path("jobs/", JobSubmitView.as_view(), name="job_submit"),
+    path("jobs/<uuid:job_id>/", JobStatusView.as_view(), name="job_status"),
+    path("jobs/<uuid:job_id>/download/", JobDownloadView.as_view(), name="job_download"),
 ]
@@ -1,28 +1,73 @@
+import uuid
 from datetime import datetime
-from pathlib import Path
-from typing import TYPE_CHECKING
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
 
 from django.conf import settings
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, JsonResponse
 
 if TYPE_CHECKING:
     from django.core.files.uploadedfile import UploadedFile
 
 from django.contrib import messages
-from django.shortcuts import redirect, render
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views import View
 from werkzeug.utils import secure_filename
 
-from src.core.scrapers.actions import read_boxscores_from_calendar_url
-from src.service.api import FebStatsServiceServicer
-from src.service.handler import SimpleLeagueHandler
-from src.service.server import feb_stats_pb2
-from src.web.helpers.read_write import (
-    is_allowed_file_extension,
-    read_boxscores_from_files,
-    remove_boxscore_files,
-)
+from src.web.helpers.jobs import submit_job, submit_upload_job
+from src.web.helpers.read_write import get_boxscore_files, is_allowed_file_extension, save_boxscore_file
+from src.web.models import AnalysisJob
+
+
+def xlsx_response(sheet: bytes) -> HttpResponse:
+    output_filename = datetime.now().strftime("%d_%m_%Y_%H_%M")
+    response = HttpResponse(
+        content=sheet,
+        content_type="application/vnd.ms-excel",
+    )
+    response["Content-Disposition"] = f"attachment; filename=estadisticas_{output_filename}.xlsx"
+    response["Content-Length"] = len(sheet)
+    return response
+
+
+def get_calendar_selection(request: HttpRequest) -> tuple[str | None, str | None, str | None]:
+    """Calendar selected in the league analysis form: either a custom URL or a predefined league, group and season.
+    :param request: POST request of the form.
+    :return: The URL, season and group of the calendar.
+    """
+    calendar_url = request.POST.get("custom_url")
+    season_id = None
+    group_id = None
+
+    if not calendar_url:
+        league_id = request.POST.get("league_id")
+        if league_id:
+            league_data = settings.DEFAULTS["calendar_selectors"][league_id]
+            calendar_url = league_data["calendar_url"]
+            season_id = request.POST.get("season_id")
+            group_id = request.POST.get("group_id")
+    return calendar_url, season_id, group_id
+
+
+def get_upload_id(request: HttpRequest) -> str:
+    """Id of the upload session of a user, kept in its Django session. It is created by the first upload of the user:
+    the uploaded files of each session are staged and analyzed apart from the ones of other users.
+    """
+    if "upload_id" not in request.session:
+        request.session["upload_id"] = uuid.uuid4().hex
+    upload_id: str = request.session["upload_id"]
+    return upload_id
+
+
+def job_to_dict(job: AnalysisJob) -> dict[str, Any]:
+    return {
+        "id": str(job.id),
+        "status": job.status,
+        "error": job.error,
+        "status_url": reverse("job_status", args=[job.id]),
+        "download_url": reverse("job_download", args=[job.id]),
+    }
 
 
 class IndexView(View):
@@ -43,12 +88,7 @@ class UploadView(View):
         uploaded_file: UploadedFile | None = uploaded_files[0] if uploaded_files else None
         if uploaded_file is not None and uploaded_file.name and is_allowed_file_extension(uploaded_file.name):
             filename = secure_filename(uploaded_file.name)
-            filepath = Path(settings.UPLOAD_FOLDER) / filename
-            filepath.parent.mkdir(parents=True, exist_ok=True)
-
-            with open(filepath, "wb+") as destination:
-                for chunk in uploaded_file.chunks():
-                    destination.write(chunk)
+            save_boxscore_file(get_upload_id(request), filename, uploaded_file.chunks())
             return HttpResponse("OK")
 
         messages.error(request, "Invalid upload request")
@@ -67,78 +107,41 @@ class UploadView(View):
 
 
 class AnalyzeView(View):
-    def analyze_boxscores(self, boxscores: list[bytes], do_color_sheet: bool) -> HttpResponse:
-        grpc_address = f"{settings.PORTS['grpc_address']}:{settings.PORTS['grpc_port']}"
-        grpc_request = feb_stats_pb2.GetFebStatsRequest(
-            boxscores=boxscores,
-            color_sheet=do_color_sheet,
-        )
-        service = FebStatsServiceServicer(SimpleLeagueHandler(address=grpc_address))
-        grpc_response = service.GetFebStats(grpc_request, None)
-
-        output_filename = datetime.now().strftime("%d_%m_%Y_%H_%M")
-        response = HttpResponse(
-            content=grpc_response.sheet,
-            content_type="application/vnd.ms-excel",
-        )
-        response["Content-Disposition"] = f"attachment; filename=estadisticas_{output_filename}.xlsx"
-        response["Content-Length"] = len(grpc_response.sheet)
-        return response
+    """Queues the analysis of the boxscores uploaded in the session of the user."""
 
     def post(self, request: HttpRequest) -> HttpResponse:
-        try:
-            do_color_sheet = bool(request.POST.get("color-sheet"))
-            boxscores = read_boxscores_from_files()
-
-            if not boxscores:
-                messages.error(request, "No se han encontrado actas para analizar")
-                return redirect(f"{reverse('index')}#data")
+        upload_id = request.session.get("upload_id")
+        if not upload_id or not get_boxscore_files(upload_id):
+            return JsonResponse({"error": "No se han encontrado actas para analizar"}, status=HTTPStatus.BAD_REQUEST)
+        job = submit_upload_job(upload_id, bool(request.POST.get("color-sheet")))
+        # The job takes over the staged files, so the next uploads of the user start a new session
+        del request.session["upload_id"]
+        return JsonResponse(job_to_dict(job), status=HTTPStatus.ACCEPTED)
 
-            return self.analyze_boxscores(boxscores, do_color_sheet)
 
-        except Exception as error:
-            messages.error(request, f"Error al procesar los archivos: {str(error)}")
-            return redirect(f"{reverse('index')}#data")
-        finally:
-            remove_boxscore_files()
+class JobSubmitView(View):
+    """Queues the analysis of a calendar, to be run by the `run_analysis_jobs` workers. Equal requests share the job."""
 
-
-class AnalyzeUrlView(View):
     def post(self, request: HttpRequest) -> HttpResponse:
-        try:
-            do_color_sheet = bool(request.POST.get("color-sheet-url"))
-            calendar_url = request.POST.get("custom_url")
-            season_id = None
-            group_id = None
-
-            if not calendar_url:
-                league_id = request.POST.get("league_id")
-                if league_id:
-                    league_data = settings.DEFAULTS["calendar_selectors"][league_id]
-                    calendar_url = league_data["calendar_url"]
-                    season_id = request.POST.get("season_id")
-                    group_id = request.POST.get("group_id")
-
-            if not calendar_url:
-                messages.error(request, "No se ha proporcionado ninguna URL para analizar")
-                return redirect(f"{reverse('index')}#url-analysis")
-
-            boxscores = read_boxscores_from_calendar_url(
-                calendar_url,
-                season=season_id,
-                group_id=group_id,
+        do_color_sheet = bool(request.POST.get("color-sheet-url"))
+        calendar_url, season_id, group_id = get_calendar_selection(request)
+        if not calendar_url:
+            return JsonResponse(
+                {"error": "No se ha proporcionado ninguna URL para analizar"}, status=HTTPStatus.BAD_REQUEST
             )
-            if not boxscores:
-                messages.error(
-                    request,
-                    f"No se han encontrado actas para analizar para la url: "
-                    f"{calendar_url} - Temporada {season_id} - Grupo: {group_id}",
-                )
-                return redirect(f"{reverse('index')}#url-analysis")
-
-            analyzer = AnalyzeView()
-            return analyzer.analyze_boxscores(boxscores, do_color_sheet)
-
-        except Exception as error:
-            messages.error(request, f"Error al procesar los archivos: {str(error)}")
-            return redirect(f"{reverse('index')}#url-analysis")
+        job = submit_job(calendar_url, season_id, group_id, do_color_sheet)
+        return JsonResponse(job_to_dict(job), status=HTTPStatus.ACCEPTED)
+
+
+class JobStatusView(View):
+    def get(self, request: HttpRequest, job_id: uuid.UUID) -> HttpResponse:
+        job = get_object_or_404(AnalysisJob.objects.defer("sheet"), id=job_id)
+        return JsonResponse(job_to_dict(job))
+
+
+class JobDownloadView(View):
+    def get(self, request: HttpRequest, job_id: uuid.UUID) -> HttpResponse:
+        job = get_object_or_404(AnalysisJob, id=job_id)
+        if job.status != AnalysisJob.Status.DONE:
+            return JsonResponse(job_to_dict(job), status=HTTPStatus.CONFLICT)
+        return xlsx_response(bytes(job.sheet))
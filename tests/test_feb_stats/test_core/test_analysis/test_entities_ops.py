@@ -0,0 +1,89 @@
+import pandas as pd
+from django.test import TestCase
+
+from src.core.analysis.entities import Boxscore, Game, League, Player, Team
+from src.core.analysis.entities_ops import (
+    get_games_by_team,
+    get_rival_boxscores,
+    get_team_boxscores,
+    get_team_by_name,
+    pack_games,
+)
+
+
+class EntitiesOpsTestCase(TestCase):
+    def setUp(self):
+        self.teams = [Team(name="A"), Team(name="B"), Team(name="C")]
+        self.games = [
+            self.build_game("A", "B", 80, 70),
+            self.build_game("C", "A", 60, 65),
+            self.build_game("B", "C", 90, 85),
+        ]
+        self.league = League(name="League", season="2024/2025", teams=self.teams, games=self.games)
+
+    @staticmethod
+    def build_game(home_team: str, away_team: str, home_score: int, away_score: int) -> Game:
+        return Game(
+            game_at="01/10/2024 18:30",  # type: ignore[arg-type]
+            league="League",
+            season="2024/2025",
+            main_referee=Player(name="-"),
+            aux_referee=Player(name="-"),
+            home_boxscore=Boxscore.from_frame(
+                boxscore=pd.DataFrame({"player": ["Total"], "points_made": [float(home_score)]}),
+                team=Team(name=home_team),
+                score=home_score,
+            ),
+            away_boxscore=Boxscore.from_frame(
+                boxscore=pd.DataFrame({"player": ["Total"], "points_made": [float(away_score)]}),
+                team=Team(name=away_team),
+                score=away_score,
+            ),
+        )
+
+    def test_get_team_by_name(self) -> None:
+        self.assertEqual(get_team_by_name(self.league, "B"), self.teams[1])
+        with self.assertRaises(Exception):
+            get_team_by_name(self.league, "D")
+
+    def test_get_games_by_team(self) -> None:
+        self.assertListEqual(get_games_by_team(self.league, Team(name="A")), self.games[:2])
+        self.assertListEqual(get_games_by_team(self.league, Team(name="C")), self.games[1:])
+        self.assertListEqual(get_games_by_team(self.league, Team(name="D")), [])
+
+    def test_get_team_boxscores(self) -> None:
+        self.assertListEqual([bs.score for bs in get_team_boxscores(self.league, Team(name="A"))], [80, 65])
+        self.assertListEqual([bs.score for bs in get_team_boxscores(self.league, Team(name="B"))], [70, 90])
+        self.assertListEqual(get_team_boxscores(self.league, Team(name="D")), [])
+
+    def test_get_rival_boxscores(self) -> None:
+        rival_boxscores = get_rival_boxscores(self.league, Team(name="A"))
+        self.assertListEqual([bs.team.name for bs in rival_boxscores], ["B", "C"])
+        self.assertListEqual([bs.score for bs in rival_boxscores], [70, 60])
+        self.assertListEqual(get_rival_boxscores(self.league, Team(name="D")), [])
+
+    def test_lookups_do_not_modify_league(self) -> None:
+        get_team_boxscores(self.league, Team(name="A")).clear()
+        self.assertEqual(len(get_team_boxscores(self.league, Team(name="A"))), 2)
+
+    def test_copied_league_lookups(self) -> None:
+        self.assertEqual(len(get_games_by_team(self.league, Team(name="A"))), 2)
+        new_games = [self.build_game("A", "D", 70, 75)]
+        league = self.league.model_copy(update={"teams": [*self.teams, Team(name="D")], "games": new_games})
+        self.assertListEqual(get_games_by_team(league, Team(name="A")), new_games)
+        self.assertListEqual([bs.score for bs in get_team_boxscores(league, Team(name="A"))], [70])
+        self.assertListEqual([bs.score for bs in get_rival_boxscores(league, Team(name="A"))], [75])
+        self.assertEqual(get_team_by_name(league, "D").name, "D")
+        # The original league keeps its own lookups
+        self.assertListEqual(get_games_by_team(self.league, Team(name="A")), self.games[:2])
+        self.assertEqual(len(get_games_by_team(self.league.model_copy(deep=True), Team(name="B"))), 2)
+
+    def test_pack_games(self) -> None:
+        packed_games = pack_games(self.games)
+        stores = {id(bs.store) for game in packed_games for bs in (game.home_boxscore, game.away_boxscore)}
+        self.assertEqual(len(stores), 1)
+        for game, packed_game in zip(self.games, packed_games):
+            self.assertEqual(packed_game.home_team, game.home_team)
+            self.assertEqual(packed_game.away_score, game.away_score)
+            pd.testing.assert_frame_equal(packed_game.home_boxscore.to_frame(), game.home_boxscore.to_frame())
+            pd.testing.assert_frame_equal(packed_game.away_boxscore.to_frame(), game.away_boxscore.to_frame())
@@ -0,0 +1,85 @@
+import glob
+import os
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.test import TestCase
+from openpyxl import load_workbook
+
+from src.core.analysis.saving import get_sheet_name, league_to_xlsx, to_excel_value
+from src.core.analysis.transforms import compute_league_aggregates
+from src.core.parsers.parsers import FEBLivescoreParser
+
+
+class SavingTestCase(TestCase):
+    def test_to_excel_value(self) -> None:
+        self.assertEqual(to_excel_value(1.23456), 1.23)
+        self.assertEqual(to_excel_value(np.float32(0.125)), 0.12)
+        self.assertEqual(to_excel_value(7), 7)
+        self.assertEqual(to_excel_value("Total"), "Total")
+        self.assertIsNone(to_excel_value(np.nan))
+        self.assertIsNone(to_excel_value(pd.NA))
+        self.assertEqual(to_excel_value(np.inf), "inf")
+        self.assertEqual(to_excel_value(-np.inf), "-inf")
+
+    def test_get_sheet_name(self) -> None:
+        used_names: set[str] = set()
+        self.assertEqual(get_sheet_name("Team", used_names), "Team")
+        self.assertEqual(get_sheet_name("team", used_names), "team1")
+        long_name = "A" * 40
+        self.assertEqual(get_sheet_name(long_name, used_names), "A" * 31)
+        self.assertEqual(get_sheet_name(long_name, used_names), "A" * 30 + "1")
+        self.assertEqual(get_sheet_name(long_name, used_names), "A" * 30 + "2")
+
+    def test_league_to_xlsx(self) -> None:
+        test_dir = Path(__file__).parent.parent.parent.parent
+        boxscores = []
+        for file in sorted(glob.glob(str(test_dir / "data/*livescore*htm*"))):
+            with open(file, mode="rb") as f:
+                boxscores.append(f.read())
+        league = compute_league_aggregates(
+            FEBLivescoreParser.parse_boxscores(boxscores, FEBLivescoreParser.read_link_bytes)
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cwd = os.getcwd()
+            os.chdir(temp_dir)
+            try:
+                sheet = league_to_xlsx(league)
+                colored_sheet = league_to_xlsx(league, export_colors=True)
+            finally:
+                os.chdir(cwd)
+            # Nothing is written to disk
+            self.assertListEqual(os.listdir(temp_dir), [])
+
+        workbook = load_workbook(BytesIO(sheet))
+        n_teams = len([team for team in league.teams if team.season_stats is not None])
+        self.assertEqual(len(workbook.worksheets), 2 + 2 * n_teams)
+        for worksheet in workbook.worksheets:
+            self.assertLessEqual(len(worksheet.title), 31)
+            self.assertTrue(worksheet["A1"].font.b)
+            self.assertEqual(worksheet["B2"].alignment.horizontal, "center")
+            self.assertFalse(worksheet["B2"].font.b)
+            self.assertEqual(worksheet.row_dimensions[1].height, 40)
+
+        league_sheet = workbook.worksheets[0]
+        self.assertEqual(league_sheet["A1"].value, "team")
+        self.assertSetEqual(
+            {row[0] for row in league_sheet.iter_rows(min_row=2, max_col=1, values_only=True)},
+            {team.name for team in league.teams},
+        )
+
+        colored_workbook = load_workbook(BytesIO(colored_sheet))
+        self.assertListEqual(colored_workbook.sheetnames, workbook.sheetnames)
+        # Colors are conditional formats of whole columns, not styles of each cell
+        league_sheet = colored_workbook.worksheets[0]
+        colored_ranges = {
+            cell_range for cf in league_sheet.conditional_formatting for cell_range in str(cf.sqref).split()
+        }
+        self.assertIn(f"B2:B{league_sheet.max_row}", colored_ranges)
+        self.assertNotIn(f"A2:A{league_sheet.max_row}", colored_ranges)
+        fill_types = {cell.fill.fill_type for row in league_sheet.iter_rows(min_row=2) for cell in row}
+        self.assertSetEqual(fill_types, {None})
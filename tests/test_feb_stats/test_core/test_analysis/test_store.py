@@ -0,0 +1,119 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+from django.test import TestCase
+
+from src.core.analysis.entities import Boxscore, Team
+from src.core.analysis.entities_ops import pack_boxscores
+from src.core.analysis.store import BoxscoreStore, NameTable
+
+
+class NameTableTestCase(TestCase):
+    def test_intern(self) -> None:
+        names = NameTable(["b", "a"])
+        self.assertListEqual(names.intern(["a", "c", "b", "c"]).tolist(), [1, 2, 0, 2])
+        self.assertEqual(len(names), 3)
+        self.assertListEqual(names.lookup(np.array([2, 0])).tolist(), ["c", "b"])
+
+    def test_sorted_ids(self) -> None:
+        names = NameTable(["b", "c", "a"])
+        self.assertListEqual(names.sorted_ids.tolist(), [2, 0, 1])
+        self.assertListEqual(names.ranks.tolist(), [1, 2, 0])
+        # Adding names resets them
+        names.intern(["0"])
+        self.assertListEqual(names.sorted_ids.tolist(), [3, 2, 0, 1])
+
+
+class BoxscoreStoreTestCase(TestCase):
+    def setUp(self) -> None:
+        self.df = pd.DataFrame(
+            {
+                "player": ["Player1", "Player2", "Total"],
+                "number": ["4", None, ""],
+                "minutes": pd.Series(
+                    [pd.Timedelta(minutes=20), pd.Timedelta(minutes=15), pd.Timedelta(0)], dtype=object
+                ),
+                "points_made": np.array([10.0, np.nan, 10.0], dtype=np.float32),
+                "starter": np.array([1, 0, 0], dtype=np.int8),
+            }
+        )
+
+    def test_from_frame(self) -> None:
+        store = BoxscoreStore.from_frame(self.df)
+        self.assertEqual(len(store), 3)
+        # Timedelta objects are stored as a timedelta64 array
+        self.assertEqual(store.columns["minutes"].dtype, np.dtype("timedelta64[ns]"))
+        # Players are stored as ids of the names of the store
+        self.assertSetEqual(store.interned, {"player"})
+        self.assertListEqual(store.columns["player"].tolist(), [0, 1, 2])
+        self.assertListEqual(store.names.names, ["Player1", "Player2", "Total"])
+        pd.testing.assert_frame_equal(store.to_frame(slice(0, 3)), self.df)
+        pd.testing.assert_frame_equal(store.to_frame(slice(1, 3), index="player"), self.df.iloc[1:].set_index("player"))
+
+        indexed_store = BoxscoreStore.from_frame(self.df.set_index("player"))
+        self.assertIn("player", indexed_store.columns)
+
+    def test_to_frame_copies(self) -> None:
+        store = BoxscoreStore.from_frame(self.df)
+        df = store.to_frame(slice(0, 3))
+        df.loc[:, "points_made"] = 0.0
+        self.assertEqual(store.columns["points_made"][0], 10.0)
+
+    def test_concat(self) -> None:
+        store = BoxscoreStore.from_frame(self.df)
+        concat_store = BoxscoreStore.concat([(store, slice(0, 2)), (store, slice(2, 3))])
+        pd.testing.assert_frame_equal(concat_store.to_frame(slice(0, 3)), self.df)
+
+        with self.assertRaises(ValueError):
+            BoxscoreStore.concat(
+                [(store, slice(0, 3)), (BoxscoreStore.from_frame(self.df.drop(columns="number")), slice(0, 3))]
+            )
+
+    def test_group_sum(self) -> None:
+        store = BoxscoreStore.from_frame(self.df)
+        other_df = self.df.iloc[[1, 2]].reset_index(drop=True)
+        other_df.loc[:, "number"] = ["7", ""]
+        concat_store = BoxscoreStore.concat([(store, slice(0, 3)), (BoxscoreStore.from_frame(other_df), slice(0, 2))])
+
+        df = concat_store.group_sum("player").to_frame(slice(0, 3), index="player")
+        self.assertListEqual(list(df.columns), ["points_made", "starter", "number", "minutes"])
+        self.assertListEqual(list(df.index), ["Player1", "Player2", "Total"])
+        # Missing stats count as zero
+        self.assertListEqual(df.loc[:, "points_made"].tolist(), [10.0, 0.0, 20.0])
+        self.assertEqual(df.loc[:, "points_made"].dtype, np.float32)
+        self.assertEqual(df.loc[:, "starter"].dtype, np.int64)
+        self.assertListEqual(df.loc[:, "number"].tolist(), ["4", "7", ""])
+        self.assertListEqual(
+            df.loc[:, "minutes"].tolist(), [pd.Timedelta(minutes=20), pd.Timedelta(minutes=30), pd.Timedelta(0)]
+        )
+
+
+class BoxscoreViewTestCase(TestCase):
+    def test_packed_boxscores(self) -> None:
+        team = Team(name="Team")
+        dfs = [pd.DataFrame({"player": ["Player1", "Total"], "points_made": [float(i), float(i)]}) for i in range(3)]
+        boxscores = pack_boxscores([Boxscore.from_frame(df, team=team, score=i) for i, df in enumerate(dfs)])
+        self.assertEqual(len({id(boxscore.store) for boxscore in boxscores}), 1)
+        self.assertEqual(len(boxscores[0].store), 6)
+        for df, boxscore in zip(dfs, boxscores):
+            pd.testing.assert_frame_equal(boxscore.to_frame(), df)
+
+        # Only the rows and names of the boxscore are pickled
+        boxscores[0].store.names.intern(["Player2"])
+        unpickled_boxscore = pickle.loads(pickle.dumps(boxscores[1]))
+        self.assertEqual(len(unpickled_boxscore.store), 2)
+        self.assertListEqual(unpickled_boxscore.store.names.names, ["Player1", "Total"])
+        self.assertEqual(unpickled_boxscore.score, 1)
+        pd.testing.assert_frame_equal(unpickled_boxscore.to_frame(), dfs[1])
+        # The shared store is not modified
+        self.assertEqual(boxscores[1].rows, slice(2, 4))
+        self.assertEqual(len(boxscores[1].store), 6)
+
+    def test_to_frame_copy(self) -> None:
+        df = pd.DataFrame({"player": ["Player1", "Total"], "points_made": [1.0, 1.0]})
+        boxscore = Boxscore.from_frame(df, team=Team(name="Team"), score=1)
+        frame = boxscore.to_frame()
+        frame.loc[:, "points_made"] = 2.0
+        frame.loc[:, "player"] = "Player2"
+        pd.testing.assert_frame_equal(boxscore.to_frame(), df)
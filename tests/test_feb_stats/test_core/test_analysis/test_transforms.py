@@ -1,17 +1,23 @@
+import glob
+from pathlib import Path
 from typing import Any
 
 import pandas as pd
 from django.test import TestCase
 from pandas.testing import assert_frame_equal
 
-from src.core.analysis.entities import Boxscore, Team
+from src.core.analysis.entities import Boxscore, League, Team
 from src.core.analysis.transforms import (
+    LeagueAggregator,
     aggregate_boxscores,
+    aggregate_games,
+    compute_league_aggregates,
     compute_oer,
     compute_shots_percentage,
     compute_total_possessions,
     sum_boxscores,
 )
+from src.core.parsers.parsers import FEBLivescoreParser
 
 
 class TransformsTestCase(TestCase):
@@ -149,7 +155,7 @@ class TransformsTestCase(TestCase):
     def test_aggregate_boxscores(self) -> None:
         team_instance = Team(name="TestTeam", season_stats=pd.DataFrame())
         columns = ["player", "number", "minutes", "points_made"]
-        boxscore1 = Boxscore(
+        boxscore1 = Boxscore.from_frame(
             boxscore=pd.DataFrame(
                 {
                     "player": ["Player1"],
@@ -161,7 +167,7 @@ class TransformsTestCase(TestCase):
             team=team_instance,
             score=10,
         )
-        boxscore2 = Boxscore(
+        boxscore2 = Boxscore.from_frame(
             boxscore=pd.DataFrame(
                 {
                     "player": ["Player1"],
@@ -180,13 +186,115 @@ class TransformsTestCase(TestCase):
         )
 
         result = aggregate_boxscores([boxscore1, boxscore2])
-        assert_frame_equal(result.boxscore, expected_result, check_like=True)
+        assert_frame_equal(result.to_frame(), expected_result, check_like=True)
         self.assertEqual(result.score, 18)
         self.assertEqual(result.team, team_instance)
 
+    def test_aggregate_boxscores_different_players(self) -> None:
+        team_instance = Team(name="TestTeam")
+        columns = ["player", "number", "minutes", "points_made", "starter"]
+        boxscore_dfs = [
+            pd.DataFrame(
+                {
+                    "player": ["Player1", "Player2", "Total"],
+                    "number": ["4", "5", ""],
+                    "minutes": [pd.Timedelta("0 days 00:20:00"), pd.Timedelta("0 days 00:20:00"), pd.Timedelta(0)],
+                    "points_made": [10.0, 2.0, 12.0],
+                    "starter": [1, 0, 0],
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "player": ["Player2", "Player3", "Total"],
+                    "number": ["15", None, ""],
+                    "minutes": [pd.Timedelta("0 days 00:10:00"), pd.Timedelta("0 days 00:05:00"), pd.Timedelta(0)],
+                    "points_made": [3.0, 1.0, 4.0],
+                    "starter": [1, 1, 0],
+                }
+            ),
+        ]
+        boxscores = [
+            Boxscore.from_frame(boxscore=df[columns].astype({"starter": "int8"}), team=team_instance, score=0)
+            for df in boxscore_dfs
+        ]
+
+        expected_result = pd.DataFrame(
+            {
+                "points_made": [10.0, 5.0, 1.0, 16.0],
+                "starter": [1, 1, 1, 0],
+                "number": ["4", "15", None, ""],
+                "minutes": [
+                    pd.Timedelta("0 days 00:20:00"),
+                    pd.Timedelta("0 days 00:30:00"),
+                    pd.Timedelta("0 days 00:05:00"),
+                    pd.Timedelta(0),
+                ],
+            },
+            index=pd.Index(["Player1", "Player2", "Player3", "Total"], name="player"),
+        )
+
+        result = aggregate_boxscores(boxscores)
+        assert_frame_equal(result.to_frame(), expected_result, check_like=True)
+
     def test_compute_league_aggregates(self) -> None:
         pass
 
     def test_aggregate_boxscores_empty_list(self) -> None:
         with self.assertRaises(ValueError):
             aggregate_boxscores([])
+
+    def test_league_aggregator(self) -> None:
+        test_dir = Path(__file__).parent.parent.parent.parent
+        boxscores = []
+        for file in sorted(glob.glob(str(test_dir / "data/*livescore*htm*"))):
+            with open(file, mode="rb") as f:
+                boxscores.append(f.read())
+        league = FEBLivescoreParser.parse_boxscores(boxscores, FEBLivescoreParser.read_link_bytes)
+        aggregated_league = compute_league_aggregates(league)
+
+        # Aggregate the first game, then add the rest incrementally
+        aggregator = LeagueAggregator.from_league(
+            League(name=league.name, season=league.season, teams=league.teams, games=league.games[:1])
+        )
+        self.assertEqual(len(aggregator.to_league().games), 1)
+        aggregator.add_games(league.games[1:])
+        incremental_league = aggregator.to_league()
+
+        assert_frame_equal(incremental_league.aggregated_games, aggregated_league.aggregated_games)
+        self.assertEqual(len(incremental_league.teams), len(aggregated_league.teams))
+        for incremental_team, team in zip(incremental_league.teams, aggregated_league.teams):
+            self.assertEqual(incremental_team.name, team.name)
+            assert_frame_equal(incremental_team.season_stats, team.season_stats)
+
+    def test_aggregate_games(self) -> None:
+        test_dir = Path(__file__).parent.parent.parent.parent
+        boxscores = []
+        for file in sorted(glob.glob(str(test_dir / "data/*livescore*htm*"))):
+            with open(file, mode="rb") as f:
+                boxscores.append(f.read())
+        league = FEBLivescoreParser.parse_boxscores(boxscores, FEBLivescoreParser.read_link_bytes)
+        aggregated_league = compute_league_aggregates(league)
+
+        streamed_league = aggregate_games(
+            FEBLivescoreParser.iter_games(iter(boxscores), FEBLivescoreParser.read_link_bytes)
+        )
+        self.assertEqual((streamed_league.name, streamed_league.season), (league.name, league.season))
+        self.assertEqual(len(streamed_league.games), len(league.games))
+        assert_frame_equal(
+            streamed_league.aggregated_games.sort_values("team").reset_index(drop=True),
+            aggregated_league.aggregated_games.sort_values("team").reset_index(drop=True),
+        )
+        teams = {team.name: team for team in aggregated_league.teams}
+        self.assertSetEqual({team.name for team in streamed_league.teams}, set(teams))
+        for team in streamed_league.teams:
+            assert_frame_equal(team.season_stats, teams[team.name].season_stats)
+
+        with self.assertRaises(ValueError):
+            aggregate_games(iter([]))
+
+    def test_league_aggregator_no_games(self) -> None:
+        aggregator = LeagueAggregator(name="League", season="2024/2025")
+        with self.assertRaises(ValueError):
+            aggregator.to_league()
+        with self.assertRaises(ValueError):
+            aggregator.get_team_aggregates("A")
@@ -0,0 +1,187 @@
+import os
+import pickle
+import pickletools
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+from django.test import TestCase
+
+from src.core.analysis.entities import Boxscore, Game, Player, Team
+from src.core.parsers.cache import PARSER_MODULES, GameCache, get_parser_version
+from src.core.parsers.parsers import FEBLivescoreParser
+
+
+def build_game(home_team: str = "A", away_team: str = "B") -> Game:
+    return Game(
+        game_at="01/10/2024 18:30",  # type: ignore[arg-type]
+        league="LIGA",
+        season="2024/2025",
+        main_referee=Player(name="-"),
+        aux_referee=Player(name="-"),
+        home_boxscore=Boxscore.from_frame(
+            boxscore=pd.DataFrame({"player": ["Player1", "Total"], "points_made": [10.0, 10.0]}),
+            team=Team(name=home_team),
+            score=10,
+        ),
+        away_boxscore=Boxscore.from_frame(
+            boxscore=pd.DataFrame({"player": ["Player2", "Total"], "points_made": [8.0, 8.0]}),
+            team=Team(name=away_team),
+            score=8,
+        ),
+    )
+
+
+class GameCacheTestCase(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = GameCache(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_key(self) -> None:
+        self.assertEqual(GameCache.key(b"boxscore"), GameCache.key(b"boxscore"))
+        self.assertNotEqual(GameCache.key(b"boxscore"), GameCache.key(b"other boxscore"))
+
+    def test_parser_version(self) -> None:
+        game = build_game()
+        with patch("src.core.parsers.cache.get_parser_version", return_value="old"):
+            old_key = GameCache.key(b"boxscore")
+            self.cache.put(old_key, game)
+        os.utime(Path(self.temp_dir.name) / f"{old_key}{GameCache.extension}", (0, 0))
+        self.assertNotEqual(GameCache.key(b"boxscore"), old_key)
+        # Entries of older versions are not read, so they end up being evicted
+        self.assertIsNone(self.cache.get(GameCache.key(b"boxscore")))
+        self.cache.put(GameCache.key(b"boxscore"), game)
+        self.cache.max_size = self.cache.size
+        self.cache.put(GameCache.key(b"other boxscore"), game)
+        self.assertFalse((Path(self.temp_dir.name) / f"{old_key}{GameCache.extension}").exists())
+        self.assertIsNotNone(self.cache.get(GameCache.key(b"boxscore")))
+        self.assertIsNotNone(self.cache.get(GameCache.key(b"other boxscore")))
+
+    def test_parser_modules(self) -> None:
+        # Every class pickled with a game is defined in a module that is part of the version of the parser
+        pickled_modules = {
+            arg
+            for _, arg, _ in pickletools.genops(pickle.dumps(build_game(), protocol=pickle.HIGHEST_PROTOCOL))
+            if isinstance(arg, str) and arg.startswith("src.")
+        }
+        self.assertTrue(pickled_modules)
+        self.assertLessEqual(pickled_modules, set(PARSER_MODULES))
+
+        # Changing any of them changes the version
+        with tempfile.TemporaryDirectory() as module_dir, patch("sys.path", [module_dir, *sys.path]):
+            module_path = Path(module_dir) / "parser_version_module.py"
+            module_path.write_text("VERSION = 1\n")
+            version = get_parser_version(("parser_version_module",))
+            module_path.write_text("VERSION = 2\n")
+            get_parser_version.cache_clear()
+            self.assertNotEqual(get_parser_version(("parser_version_module",)), version)
+        get_parser_version.cache_clear()
+
+    def test_shared_folder(self) -> None:
+        game = build_game()
+        self.cache.put("first", game)
+        entry_size = self.cache.size
+        other_cache = GameCache(self.temp_dir.name, max_size=4 * entry_size)
+        self.cache.max_size = 4 * entry_size
+        for i in range(8):
+            other_cache.put(f"other_{i}", game)
+        # The entries written by the other process are taken into account
+        self.cache.put("second", game)
+        self.assertLessEqual(self.cache.size, self.cache.max_size)
+        self.assertLessEqual(sum(path.stat().st_size for path in Path(self.temp_dir.name).iterdir()), 4 * entry_size)
+
+    def test_get_put(self) -> None:
+        key = GameCache.key(b"boxscore")
+        self.assertIsNone(self.cache.get(key))
+        self.assertEqual(self.cache.misses, 1)
+
+        game = build_game()
+        self.cache.put(key, game)
+        cached_game = self.cache.get(key)
+        self.assertEqual(self.cache.hits, 1)
+        assert cached_game is not None
+        self.assertEqual(cached_game.home_team, game.home_team)
+        self.assertEqual(cached_game.away_team, game.away_team)
+        pd.testing.assert_frame_equal(cached_game.home_boxscore.to_frame(), game.home_boxscore.to_frame())
+
+        # Entries persist across cache instances
+        self.assertIsNotNone(GameCache(self.temp_dir.name).get(key))
+
+    def test_eviction(self) -> None:
+        game = build_game()
+        self.cache.put("first", game)
+        entry_size = self.cache.size
+        self.cache.max_size = 2 * entry_size
+
+        self.cache.put("second", game)
+        # Make "first" the most recently used entry
+        os.utime(Path(self.temp_dir.name) / f"second{GameCache.extension}", (0, 0))
+        self.assertIsNotNone(self.cache.get("first"))
+
+        self.cache.put("third", game)
+        self.assertLessEqual(self.cache.size, self.cache.max_size)
+        self.assertIsNotNone(self.cache.get("first"))
+        self.assertIsNone(self.cache.get("second"))
+        self.assertIsNotNone(self.cache.get("third"))
+
+    def test_invalid_entries(self) -> None:
+        game = build_game()
+        self.cache.put("valid", game)
+        entry_size = self.cache.size
+        entries = {
+            "corrupt": b"not a pickle",
+            "truncated": pickle.dumps(game)[:100],
+            "missing_module": b"cmissing_module\nMissingClass\n.",
+            "other_object": pickle.dumps({"home_team": "A"}),
+        }
+        for key, data in entries.items():
+            (Path(self.temp_dir.name) / f"{key}{GameCache.extension}").write_bytes(data)
+        cache = GameCache(self.temp_dir.name)
+        for key in entries:
+            # Invalid entries are misses, and are removed
+            self.assertIsNone(cache.get(key))
+            self.assertFalse((Path(self.temp_dir.name) / f"{key}{GameCache.extension}").exists())
+        self.assertEqual((cache.hits, cache.misses), (0, len(entries)))
+        self.assertEqual(cache.size, entry_size)
+        self.assertIsNotNone(cache.get("valid"))
+
+    def test_put_failure(self) -> None:
+        with patch("src.core.parsers.cache.pickle.dump", side_effect=pickle.PicklingError):
+            with self.assertRaises(pickle.PicklingError):
+                self.cache.put("first", build_game())
+        # The temporary file is removed
+        self.assertListEqual(os.listdir(self.temp_dir.name), [])
+        self.assertEqual(self.cache.size, 0)
+
+    def test_clear(self) -> None:
+        self.cache.put("first", build_game())
+        self.cache.get("first")
+        self.cache.clear()
+        self.assertEqual(self.cache.size, 0)
+        self.assertEqual(self.cache.hits, 0)
+        self.assertIsNone(self.cache.get("first"))
+
+    def test_parse_boxscores_with_cache(self) -> None:
+        test_dir = Path(__file__).parent.parent.parent.parent
+        boxscores = []
+        for test_file in (test_dir / "data/1_livescore.html", test_dir / "data/3_livescore.htm"):
+            with open(test_file, mode="rb") as f:
+                boxscores.append(f.read())
+
+        league = FEBLivescoreParser.parse_boxscores(boxscores, FEBLivescoreParser.read_link_bytes, cache=self.cache)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+        cached_league = FEBLivescoreParser.parse_boxscores(
+            boxscores, FEBLivescoreParser.read_link_bytes, cache=self.cache
+        )
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+        self.assertEqual(len(league.games), len(cached_league.games))
+        for game, cached_game in zip(league.games, cached_league.games):
+            self.assertEqual(game.home_team, cached_game.home_team)
+            pd.testing.assert_frame_equal(game.home_boxscore.to_frame(), cached_game.home_boxscore.to_frame())
+            pd.testing.assert_frame_equal(game.away_boxscore.to_frame(), cached_game.away_boxscore.to_frame())
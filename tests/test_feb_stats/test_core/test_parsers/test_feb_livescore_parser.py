@@ -2,9 +2,12 @@ import glob
 import json
 from pathlib import Path
 
+import lxml.html as lh
+import pandas as pd
 from django.test import TestCase
+from lxml import etree
 
-from src.core.parsers.parsers import FEBLivescoreParser
+from src.core.parsers.parsers import BoxscoreStatus, FEBLivescoreParser, normalize_texts, parse_html, screen_boxscore
 
 
 class TestLivescoreParserScenarios(TestCase):
@@ -146,6 +149,44 @@ class GenericParserTestCase(TestCase):
         out_str = FEBLivescoreParser.parse_str(test_str)
         self.assertEqual(out_str, desired_test_str)
 
+    def test_normalize_texts(self) -> None:
+        texts = [
+            "\n\t\t\t\t\t\t\n\t\t\t\t\nRebotes\n\t\t\t\t\t\n\t\t\tD\n\t\t\t\t\t\tO\n\t\t\t\t\t\tT\n\t\t\t\t\t\t",
+            "",
+            " \r\n ",
+            "\n\t\tJUGADOR, NOMBRE\n\t",
+            "45,5%",
+            "\xa0Tapones\u2009Fa ",
+        ]
+        self.assertListEqual(
+            normalize_texts(texts), ["Rebotes D O T", "", "", "JUGADOR. NOMBRE", "45.5%", "Tapones Fa"]
+        )
+        self.assertListEqual(normalize_texts(texts), [FEBLivescoreParser.parse_str(text) for text in texts])
+        self.assertListEqual(normalize_texts([]), [])
+
+    def test_elements_to_df(self) -> None:
+        table = parse_html(
+            b"<table><tbody><tr><th>Header</th></tr>"
+            b"<tr><td class='dorsal'> 4 </td><td class='nombre jugador'><a>JUGADOR</a>, UNO</td></tr>"
+            b"<tr><td class='dorsal'>5</td><td class='nombre jugador'></td></tr>"
+            b"<tr><td class='nombre jugador' colspan='2'>Total</td></tr>"
+            b"<tr><td class='puntos'>12</td><td class='dorsal'>6</td></tr>"
+            b"<tr><td class='dorsal'>7</td><td class='dorsal'>8</td></tr>"
+            b"</tbody></table>"
+        ).xpath("//tbody")[0]
+        df = FEBLivescoreParser.elements_to_df(table, initial_row=1)
+        desired_df = pd.DataFrame(
+            [
+                {"dorsal": "4", "nombre jugador": "JUGADOR. UNO"},
+                {"dorsal": "5", "nombre jugador": ""},
+                {"nombre jugador": "Total"},
+                {"puntos": "12", "dorsal": "6"},
+                {"dorsal": "8"},
+            ]
+        )
+        pd.testing.assert_frame_equal(df, desired_df)
+        self.assertEqual(FEBLivescoreParser.elements_to_df(table, initial_row=1, discard_last=5).shape, (0, 0))
+
     def test_parse_boxscores(self) -> None:
         for test_file in self.test_files:
             with open(test_file, mode="rb") as f:
@@ -154,9 +195,76 @@ class GenericParserTestCase(TestCase):
             self.assertEqual(2, len(league.teams))
             self.assertEqual(1, len(league.games))
 
+    def test_parse_boxscores_parallel(self) -> None:
+        boxscores = []
+        for test_file in self.test_files:
+            with open(test_file, mode="rb") as f:
+                boxscores.append(f.read())
+        league = FEBLivescoreParser.parse_boxscores(boxscores, FEBLivescoreParser.read_link_bytes)
+        parallel_league = FEBLivescoreParser.parse_boxscores(boxscores, FEBLivescoreParser.read_link_bytes, n_workers=2)
+        self.assertEqual(len(league.games), len(parallel_league.games))
+        for game, parallel_game in zip(league.games, parallel_league.games):
+            self.assertEqual(game.home_team, parallel_game.home_team)
+            self.assertEqual(game.away_team, parallel_game.away_team)
+            pd.testing.assert_frame_equal(game.home_boxscore.to_frame(), parallel_game.home_boxscore.to_frame())
+            pd.testing.assert_frame_equal(game.away_boxscore.to_frame(), parallel_game.away_boxscore.to_frame())
+
+        # The boxscores of the league share a store, with the players as ids of a single table of names
+        stores = {id(bs.store) for game in parallel_league.games for bs in (game.home_boxscore, game.away_boxscore)}
+        self.assertEqual(len(stores), 1)
+        store = parallel_league.games[0].home_boxscore.store
+        self.assertIn("player", store.interned)
+        self.assertEqual(len(store.names), len(set(store.names.names)))
+
+    def test_iter_games(self) -> None:
+        boxscores = []
+        for test_file in self.test_files:
+            with open(test_file, mode="rb") as f:
+                boxscores.append(f.read())
+        league = FEBLivescoreParser.parse_boxscores(boxscores, FEBLivescoreParser.read_link_bytes)
+        for n_workers in (1, 2):
+            # Games are parsed from a stream of boxscores, in order
+            games = list(
+                FEBLivescoreParser.iter_games(
+                    (boxscore for boxscore in boxscores), FEBLivescoreParser.read_link_bytes, n_workers=n_workers
+                )
+            )
+            self.assertEqual(len(league.games), len(games))
+            for game, streamed_game in zip(league.games, games):
+                self.assertEqual(game.home_team, streamed_game.home_team)
+                self.assertEqual(game.away_team, streamed_game.away_team)
+                pd.testing.assert_frame_equal(game.home_boxscore.to_frame(), streamed_game.home_boxscore.to_frame())
+
+    def test_screen_boxscore(self) -> None:
+        for test_file in self.test_files:
+            with open(test_file, mode="rb") as f:
+                boxscore = f.read()
+            self.assertEqual(screen_boxscore(boxscore), BoxscoreStatus.FINISHED)
+            # A game in its third quarter
+            unfinished_boxscore = boxscore.replace(b"cuarto play", b"cuarto", boxscore.count(b"cuarto play") - 3)
+            self.assertEqual(screen_boxscore(unfinished_boxscore), BoxscoreStatus.UNFINISHED)
+            self.assertFalse(
+                FEBLivescoreParser.is_finished_game(FEBLivescoreParser.read_link_bytes(unfinished_boxscore))
+            )
+            no_tables_boxscore = boxscore.replace(b"<table", b"<div").replace(b"</table", b"</div")
+            self.assertEqual(screen_boxscore(no_tables_boxscore), BoxscoreStatus.INVALID)
+
+            # Screened out boxscores are skipped
+            league = FEBLivescoreParser.parse_boxscores(
+                [b"", unfinished_boxscore, boxscore, no_tables_boxscore], FEBLivescoreParser.read_link_bytes
+            )
+            self.assertEqual(1, len(league.games))
+
+        self.assertEqual(screen_boxscore(b""), BoxscoreStatus.UNFINISHED)
+        self.assertEqual(screen_boxscore(b"<html><body>Not found</body></html>"), BoxscoreStatus.UNFINISHED)
+
     def test_parse_boxscores_no_boxscores(self) -> None:
         with self.assertRaises(ValueError):
             FEBLivescoreParser.parse_boxscores([], FEBLivescoreParser.read_link_bytes)
+        with self.assertRaises(ValueError):
+            FEBLivescoreParser.parse_boxscores([], FEBLivescoreParser.read_link_bytes, n_workers=2)
+        with self.assertRaises(ValueError):
+            FEBLivescoreParser.parse_boxscores(iter([]), FEBLivescoreParser.read_link_bytes)
 
     def test_read_link_bytes(self) -> None:
         for test_file in self.test_files:
@@ -173,3 +281,33 @@ class GenericParserTestCase(TestCase):
             self.assertIsNotNone(doc.forms)
             self.assertIsNotNone(doc.body)
             self.assertIsNotNone(doc.head)
+
+    def test_parse_html(self) -> None:
+        doc = parse_html(
+            b"<html><head><script>var a = 1;</script><style>p {}</style></head><body><form>"
+            b"<input type='hidden' name='__VIEWSTATE' value='abc'/><!-- comment -->"
+            b"<span class='liga'>LIGA <select><option>1</option></select>TEST</span>"
+            b"</form></body></html>"
+        )
+        for tag in ("script", "style", "input", "select", "option"):
+            self.assertListEqual(doc.xpath(f"//{tag}"), [])
+        self.assertListEqual(doc.xpath("//comment()"), [])
+        # The text around the dropped elements is kept
+        self.assertEqual(doc.xpath("//span")[0].text_content(), "LIGA TEST")
+        self.assertIsNotNone(doc.forms)
+
+        with self.assertRaises(etree.ParserError):
+            parse_html(b"")
+
+        for test_file in self.test_files:
+            with open(test_file, mode="rb") as f:
+                link_bytes = f.read()
+            full_doc = lh.fromstring(link_bytes.decode("utf-8"))
+            doc = parse_html(link_bytes)
+            self.assertDictEqual(
+                FEBLivescoreParser.parse_game_metadata(doc), FEBLivescoreParser.parse_game_metadata(full_doc)
+            )
+            for table, full_table in zip(FEBLivescoreParser.get_tables(doc), FEBLivescoreParser.get_tables(full_doc)):
+                pd.testing.assert_frame_equal(
+                    FEBLivescoreParser.elements_to_df(table), FEBLivescoreParser.elements_to_df(full_table)
+                )
@@ -7,6 +7,7 @@ from src.core.parsers.transforms import (
     transform_cum_stats_minutes,
     transform_cum_stats_rebounds,
     transform_cum_stats_shots,
+    transform_game_stats_df,
 )
 
 
@@ -57,3 +58,51 @@ class FebStatsTransformsTestCase(TestCase):
             dtype="float32",
         )
         pd.testing.assert_frame_equal(df, desired_df)
+
+    def test_transform_game_stats_df(self) -> None:
+        raw_df = pd.DataFrame(
+            {
+                "inicial": ["*", "", ""],
+                "dorsal": ["4", "7", ""],
+                "nombre jugador": ["Player1", "Player2", "Total"],
+                "minutos": ["26:15", "13:45", "40:00"],
+                "puntos": ["10", "2", "12"],
+                "tiros dos": ["3/5 60%", "1/4 25%", "4/9 44%"],
+                "tiros tres": ["1/2 50%", "0/1 0%", "1/3 33%"],
+                "tiros campo": ["4/7 57%", "1/5 20%", "5/12 41%"],
+                "tiros libres": ["1/2 50%", "0/0 0%", "1/2 50%"],
+                "balance": ["5", "-3", ""],
+            }
+        )
+        df = transform_game_stats_df(raw_df)
+
+        self.assertListEqual(
+            list(df.columns),
+            [
+                "number",
+                "player",
+                "points_made",
+                "point_balance",
+                "2_point_made",
+                "2_point_attempted",
+                "minutes",
+                "3_point_made",
+                "3_point_attempted",
+                "field_goal_made",
+                "field_goal_attempted",
+                "free_throw_made",
+                "free_throw_attempted",
+                "starter",
+                "games",
+            ],
+        )
+        self.assertListEqual(df["player"].tolist(), ["Player1", "Player2", "Total"])
+        self.assertListEqual(df["starter"].tolist(), [1, 0, 0])
+        self.assertEqual(df["starter"].dtype, "int8")
+        self.assertListEqual(df["2_point_made"].tolist(), [3.0, 1.0, 4.0])
+        self.assertListEqual(df["2_point_attempted"].tolist(), [5.0, 4.0, 9.0])
+        self.assertEqual(df["2_point_made"].dtype, "float32")
+        self.assertListEqual(df["point_balance"].tolist(), [5.0, -3.0, 2.0])
+        self.assertListEqual(df["games"].tolist(), [1, 1, 1])
+        self.assertEqual(df.at[0, "minutes"], pd.Timedelta("0 days 00:26:15"))
+        self.assertEqual(df.at[2, "minutes"], pd.Timedelta("0 days 00:40:00"))
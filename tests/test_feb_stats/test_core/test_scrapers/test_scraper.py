@@ -1,3 +1,7 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
 from unittest.mock import Mock, patch
 
 import requests
@@ -30,7 +34,9 @@ class TestBoxscoreScraper(TestCase):
             urls = scraper.get_boxscore_urls("http://example.com/calendar")
 
             self.assertEqual(urls, ["/game1", "/game2"])
-            mock_session.return_value.get.assert_called_once_with("http://example.com/calendar")
+            mock_session.return_value.get.assert_called_once_with(
+                "http://example.com/calendar", timeout=scraper.timeout
+            )
 
     def test_get_boxscore_urls_with_group_change(self):
         with patch("requests.Session") as mock_session:
@@ -74,6 +80,7 @@ class TestBoxscoreScraper(TestCase):
                     "_ctl0:MainContentPlaceHolderMaster:gruposDropDownList": "2",
                     "_ctl0:token": "token123",
                 },
+                timeout=scraper.timeout,
             )
             initial_response.raise_for_status.assert_called_once()
             post_response.raise_for_status.assert_called_once()
@@ -88,7 +95,7 @@ class TestBoxscoreScraper(TestCase):
             result = scraper.get_boxscore("http://example.com/game1")
 
             self.assertEqual(result, b"boxscore data")
-            mock_session.return_value.get.assert_called_once_with("http://example.com/game1")
+            mock_session.return_value.get.assert_called_once_with("http://example.com/game1", timeout=scraper.timeout)
 
     def test_fetch_boxscores(self):
         with patch.object(BoxscoreScraper, "get_boxscore_urls") as mock_get_urls:
@@ -111,3 +118,138 @@ class TestBoxscoreScraper(TestCase):
             scraper = BoxscoreScraper()
             with self.assertRaises(requests.RequestException):
                 scraper.get_boxscore_urls("http://example.com/calendar")
+
+    def test_close_iter_boxscores(self):
+        game_urls = [f"http://example.com/game/{i}" for i in range(8)]
+        downloaded_urls = []
+        release_downloads = threading.Event()
+
+        def get_boxscore(url: str) -> bytes:
+            downloaded_urls.append(url)
+            if url != game_urls[0]:
+                release_downloads.wait(timeout=0.2)
+            return url.encode()
+
+        with BoxscoreScraper(max_workers=2) as scraper:
+            with (
+                patch.object(scraper, "get_boxscore_urls", return_value=game_urls),
+                patch.object(scraper, "get_boxscore", side_effect=get_boxscore),
+            ):
+                boxscores = scraper.iter_boxscores("http://example.com/calendar")
+                self.assertEqual(next(boxscores), b"http://example.com/game/0")
+                boxscores.close()
+
+        # The two running downloads finish, the queued one is cancelled
+        self.assertListEqual(sorted(downloaded_urls), game_urls[:3])
+
+
+class BoxscoreRequestHandler(BaseHTTPRequestHandler):
+    """Stand-in of the FEB website. Serves a calendar linking to the fixture boxscores."""
+
+    boxscores: list[bytes] = []
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    flaky_requests = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_content(self, content: bytes, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        cls = type(self)
+        if self.path == "/calendar":
+            links = "".join(
+                f'<td class="resultado"><a href="http://{self.headers["Host"]}/game/{i}"></a></td>'
+                for i in range(len(cls.boxscores))
+            )
+            calendar = (
+                '<select id="_ctl0_MainContentPlaceHolderMaster_gruposDropDownList">'
+                '<option value="1" selected>Group 1</option></select>'
+                f"<table><tr>{links}</tr></table>"
+            )
+            self.send_content(calendar.encode("utf-8"))
+        elif self.path.startswith("/game/"):
+            game_id = int(self.path.rsplit("/", 1)[-1])
+            with cls.lock:
+                cls.in_flight += 1
+                cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            # Later games are served faster, so they finish first
+            time.sleep(0.01 * (len(cls.boxscores) - game_id))
+            with cls.lock:
+                cls.in_flight -= 1
+            self.send_content(cls.boxscores[game_id])
+        elif self.path == "/flaky":
+            with cls.lock:
+                cls.flaky_requests += 1
+                status = 503 if cls.flaky_requests == 1 else 200
+            self.send_content(b"flaky boxscore", status=status)
+        elif self.path == "/slow":
+            time.sleep(1.0)
+            self.send_content(b"slow boxscore")
+        else:
+            self.send_content(b"", status=404)
+
+
+class TestBoxscoreScraperLocalServer(TestCase):
+    def setUp(self):
+        test_dir = Path(__file__).parent.parent.parent.parent
+        boxscores = []
+        for test_file in sorted(test_dir.glob("data/*_livescore.htm*")):
+            boxscores.append(test_file.read_bytes())
+        BoxscoreRequestHandler.boxscores = boxscores * 3
+        BoxscoreRequestHandler.in_flight = 0
+        BoxscoreRequestHandler.max_in_flight = 0
+        BoxscoreRequestHandler.flaky_requests = 0
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), BoxscoreRequestHandler)
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.server_thread.join()
+
+    def test_fetch_boxscores_concurrently(self):
+        with BoxscoreScraper(max_workers=8, max_connections_per_host=3) as scraper:
+            results = scraper.fetch_boxscores(f"{self.base_url}/calendar")
+
+        self.assertEqual(results, BoxscoreRequestHandler.boxscores)
+        self.assertGreater(BoxscoreRequestHandler.max_in_flight, 1)
+        self.assertLessEqual(BoxscoreRequestHandler.max_in_flight, 3)
+
+    def test_fetch_boxscores_sequentially(self):
+        with BoxscoreScraper() as scraper:
+            results = scraper.fetch_boxscores(f"{self.base_url}/calendar")
+
+        self.assertEqual(results, BoxscoreRequestHandler.boxscores)
+        self.assertEqual(BoxscoreRequestHandler.max_in_flight, 1)
+
+    def test_iter_boxscores(self):
+        with BoxscoreScraper(max_workers=2) as scraper:
+            boxscores = scraper.iter_boxscores(f"{self.base_url}/calendar")
+            # Boxscores are yielded in calendar order, without waiting for the whole calendar
+            self.assertEqual(next(boxscores), BoxscoreRequestHandler.boxscores[0])
+            results = [BoxscoreRequestHandler.boxscores[0], *boxscores]
+
+        self.assertEqual(results, BoxscoreRequestHandler.boxscores)
+        self.assertLessEqual(BoxscoreRequestHandler.max_in_flight, 2)
+
+    def test_get_boxscore_retries(self):
+        with BoxscoreScraper(backoff_factor=0.01) as scraper:
+            result = scraper.get_boxscore(f"{self.base_url}/flaky")
+
+        self.assertEqual(result, b"flaky boxscore")
+        self.assertEqual(BoxscoreRequestHandler.flaky_requests, 2)
+
+    def test_get_boxscore_timeout(self):
+        with BoxscoreScraper(timeout=0.1, max_retries=0) as scraper:
+            with self.assertRaises(requests.RequestException):
+                scraper.get_boxscore(f"{self.base_url}/slow")
@@ -1,11 +1,24 @@
+import asyncio
 import glob
+import threading
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
 
 from django.test import TestCase
+from openpyxl import load_workbook
 
-from src.service.api import ContextStub, FebStatsServiceServicer
-from src.service.codegen.feb_stats_pb2 import GetFebStatsRequest
-from src.service.handler import SimpleLeagueHandler
+from src.service.api import AsyncFebStatsServiceServicer, ContextStub, FebStatsServiceServicer
+from src.service.codegen.feb_stats_pb2 import (
+    GetFebStatsRequest,
+    GetFebStatsTablesRequest,
+    StreamFebStatsRequest,
+    StreamFebStatsResponse,
+)
+from src.service.exceptions import HandlerBusyException, RequestAbortedException
+from src.service.handler import ProcessPoolLeagueHandler, SimpleLeagueHandler, _export_boxscores_in_worker
 
 
 class FebStatsServiceServicerTest(TestCase):
@@ -17,10 +30,224 @@ class FebStatsServiceServicerTest(TestCase):
             with open(file, mode="rb") as f:
                 boxscores.append(f.read())
         request = GetFebStatsRequest(boxscores=boxscores)
-        service = FebStatsServiceServicer(SimpleLeagueHandler(address="8008"))
+        service = FebStatsServiceServicer(SimpleLeagueHandler())
         result = service.GetFebStats(request, ContextStub())
         self.assertTrue(result.sheet)
 
         request_with_color = GetFebStatsRequest(boxscores=boxscores, color_sheet=True)
         result_with_color = service.GetFebStats(request_with_color, ContextStub())
         self.assertTrue(result_with_color.sheet)
+
+    def test_GetFebStats_concurrent(self) -> None:
+        test_dir = Path(__file__).parent.parent.parent
+        requests = []
+        for file in sorted(glob.glob(str(test_dir / "data/*livescore*htm*"))):
+            with open(file, mode="rb") as f:
+                requests.append(GetFebStatsRequest(boxscores=[f.read()]))
+        # A single handler serves all the requests
+        service = FebStatsServiceServicer(SimpleLeagueHandler())
+
+        def get_sheet_names(request: GetFebStatsRequest) -> set[str]:
+            return set(load_workbook(BytesIO(service.GetFebStats(request, ContextStub()).sheet)).sheetnames)
+
+        expected_sheet_names = [get_sheet_names(request) for request in requests]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            sheet_names = list(executor.map(get_sheet_names, requests * 4))
+        self.assertListEqual(sheet_names, expected_sheet_names * 4)
+
+    def test_StreamFebStats(self) -> None:
+        test_dir = Path(__file__).parent.parent.parent
+        boxscores = []
+        for file in sorted(glob.glob(str(test_dir / "data/*livescore*htm*"))):
+            with open(file, mode="rb") as f:
+                boxscores.append(f.read())
+        service = FebStatsServiceServicer(SimpleLeagueHandler())
+        service.sheet_chunk_size = 1024
+        expected_sheet = service.GetFebStats(GetFebStatsRequest(boxscores=boxscores, color_sheet=True), ContextStub())
+        requests = [StreamFebStatsRequest(boxscore=boxscores[0], color_sheet=True)]
+        requests.extend(StreamFebStatsRequest(boxscore=boxscore) for boxscore in boxscores[1:])
+
+        chunks = [response.sheet_chunk for response in service.StreamFebStats(iter(requests), ContextStub())]
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 1024 for chunk in chunks))
+        workbook = load_workbook(BytesIO(b"".join(chunks)))
+        expected_workbook = load_workbook(BytesIO(expected_sheet.sheet))
+        self.assertSetEqual(set(workbook.sheetnames), set(expected_workbook.sheetnames))
+        self.assertTrue(workbook.worksheets[0].conditional_formatting)
+
+    def test_GetFebStatsTables(self) -> None:
+        test_dir = Path(__file__).parent.parent.parent
+        boxscores = []
+        for file in sorted(glob.glob(str(test_dir / "data/*livescore*htm*"))):
+            with open(file, mode="rb") as f:
+                boxscores.append(f.read())
+        service = FebStatsServiceServicer(SimpleLeagueHandler())
+        tables = service.GetFebStatsTables(GetFebStatsTablesRequest(boxscores=boxscores), ContextStub())
+        self.assertTrue(tables.league.columns)
+        # The sheet has an aggregated and an averaged sheet for the league and for each team
+        sheet = service.GetFebStats(GetFebStatsRequest(boxscores=boxscores), ContextStub()).sheet
+        self.assertEqual(2 * (1 + len(tables.teams)), len(load_workbook(BytesIO(sheet)).sheetnames))
+
+
+class BlockedLeagueHandler(SimpleLeagueHandler):
+    """Handler that does not read the boxscores until it is released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.released = threading.Event()
+
+    def export_boxscores(
+        self, input_boxscores: Iterable[bytes], color_sheet: bool, timeout: float | None = None
+    ) -> bytes:
+        self.released.wait(timeout=60)
+        return super().export_boxscores(input_boxscores, color_sheet, timeout)
+
+
+class AsyncFebStatsServiceServicerTest(TestCase):
+    def setUp(self) -> None:
+        test_dir = Path(__file__).parent.parent.parent
+        self.boxscores = []
+        for file in sorted(glob.glob(str(test_dir / "data/*livescore*htm*"))):
+            with open(file, mode="rb") as f:
+                self.boxscores.append(f.read())
+
+    def test_StreamFebStats(self) -> None:
+        n_received = 0
+
+        async def iter_requests() -> AsyncIterator[StreamFebStatsRequest]:
+            nonlocal n_received
+            for boxscore in self.boxscores * 4:
+                n_received += 1
+                yield StreamFebStatsRequest(boxscore=boxscore)
+
+        async def run() -> None:
+            league_handler = BlockedLeagueHandler()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                service = AsyncFebStatsServiceServicer(league_handler, executor=executor)
+                responses = service.StreamFebStats(iter_requests(), ContextStub())
+                chunks = asyncio.ensure_future(asyncio.wait_for(self.read_chunks(responses), timeout=60))
+                await asyncio.sleep(0.2)
+                # The upload waits for the handler: the boxscores in its queue, and the one waiting to be put in it
+                self.assertEqual(n_received, service.stream_buffer_size + 1)
+                league_handler.released.set()
+                self.assertTrue(load_workbook(BytesIO(b"".join(await chunks))).sheetnames)
+            self.assertEqual(n_received, 4 * len(self.boxscores))
+
+        asyncio.run(run())
+
+    def test_StreamFebStats_interrupted(self) -> None:
+        async def iter_requests() -> AsyncIterator[StreamFebStatsRequest]:
+            for boxscore in self.boxscores:
+                yield StreamFebStatsRequest(boxscore=boxscore)
+            raise ConnectionError("The upload was interrupted")
+
+        async def run() -> None:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                service = AsyncFebStatsServiceServicer(SimpleLeagueHandler(), executor=executor)
+                with self.assertRaises(ConnectionError):
+                    await asyncio.wait_for(
+                        self.read_chunks(service.StreamFebStats(iter_requests(), ContextStub())), timeout=60
+                    )
+                # The handler stops reading the boxscores, and frees its thread
+                self.assertTrue(await asyncio.wrap_future(executor.submit(lambda: True)))
+
+        asyncio.run(run())
+
+    @staticmethod
+    async def read_chunks(responses: AsyncIterator[StreamFebStatsResponse]) -> list[bytes]:
+        return [response.sheet_chunk async for response in responses]
+
+
+class ProcessPoolFebStatsServiceServicerTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.league_handler = ProcessPoolLeagueHandler(n_workers=1)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.league_handler.close()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        test_dir = Path(__file__).parent.parent.parent
+        boxscores = []
+        for file in sorted(glob.glob(str(test_dir / "data/*livescore*htm*"))):
+            with open(file, mode="rb") as f:
+                boxscores.append(f.read())
+        self.request = GetFebStatsRequest(boxscores=boxscores)
+        self.service = FebStatsServiceServicer(self.league_handler)
+
+    def test_GetFebStats(self) -> None:
+        result = self.service.GetFebStats(self.request, ContextStub(time_remaining=60))
+        expected_result = FebStatsServiceServicer(SimpleLeagueHandler()).GetFebStats(self.request, ContextStub())
+        self.assertSetEqual(
+            set(load_workbook(BytesIO(result.sheet)).sheetnames),
+            set(load_workbook(BytesIO(expected_result.sheet)).sheetnames),
+        )
+
+    def test_GetFebStatsTables(self) -> None:
+        tables = self.service.GetFebStatsTables(GetFebStatsTablesRequest(boxscores=self.request.boxscores), None)
+        expected_tables = FebStatsServiceServicer(SimpleLeagueHandler()).GetFebStatsTables(
+            GetFebStatsTablesRequest(boxscores=self.request.boxscores), None
+        )
+        league_columns = {column.name: column for column in tables.league.columns}
+        expected_league_columns = {column.name: column for column in expected_tables.league.columns}
+        self.assertSetEqual(set(league_columns), set(expected_league_columns))
+        self.assertCountEqual(league_columns["team"].texts, expected_league_columns["team"].texts)
+        self.assertCountEqual([table.name for table in tables.teams], [table.name for table in expected_tables.teams])
+
+    def test_GetFebStats_busy(self) -> None:
+        # The only worker is taken, and no request can wait for it
+        self.assertTrue(self.league_handler._slots.acquire(blocking=False))
+        try:
+            with self.assertRaises(HandlerBusyException):
+                self.league_handler.export_boxscores(self.request.boxscores, False)
+            with self.assertRaisesRegex(RequestAbortedException, "RESOURCE_EXHAUSTED"):
+                self.service.GetFebStats(self.request, ContextStub())
+        finally:
+            self.league_handler._slots.release()
+
+    def test_GetFebStats_deadline(self) -> None:
+        with self.assertRaisesRegex(RequestAbortedException, "DEADLINE_EXCEEDED"):
+            self.service.GetFebStats(self.request, ContextStub(time_remaining=0))
+        # The worker is freed once the abandoned export finishes
+        self.assertTrue(self.league_handler._slots.acquire(timeout=60))
+        self.league_handler._slots.release()
+        self.assertTrue(self.service.GetFebStats(self.request, ContextStub(time_remaining=60)).sheet)
+
+    def test_stream_boxscores(self) -> None:
+        n_read = 0
+
+        def read_boxscores() -> Iterator[bytes]:
+            nonlocal n_read
+            for boxscore in list(self.request.boxscores) * 4:
+                n_read += 1
+                yield boxscore
+
+        # The only worker is busy, so the boxscores wait in the queue of the export
+        self.league_handler.executor.submit(time.sleep, 1)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self.league_handler.export_boxscores, read_boxscores(), False, 60)
+            time.sleep(0.5)
+            # The boxscores in the queue, and the one waiting to be put in it
+            self.assertEqual(n_read, self.league_handler.stream_buffer_size + 1)
+            self.assertTrue(future.result())
+        self.assertEqual(n_read, 4 * len(self.request.boxscores))
+
+    def test_stream_boxscores_error(self) -> None:
+        def read_boxscores() -> Iterator[bytes]:
+            yield from self.request.boxscores
+            raise ValueError("The upload was interrupted")
+
+        with self.assertRaises(ValueError):
+            self.league_handler.export_boxscores(read_boxscores(), False, timeout=60)
+        # The worker stops reading the boxscores, and is freed
+        self.assertTrue(self.league_handler._slots.acquire(timeout=60))
+        self.league_handler._slots.release()
+
+    def test_abandoned_export(self) -> None:
+        # Exports stop once their caller stops waiting for them
+        with self.assertRaises(TimeoutError):
+            _export_boxscores_in_worker(list(self.request.boxscores), False, deadline=time.time() - 1)
+        self.assertTrue(_export_boxscores_in_worker(list(self.request.boxscores), False, deadline=time.time() + 60))
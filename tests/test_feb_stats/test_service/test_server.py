@@ -1,12 +1,26 @@
+import asyncio
+import glob
 import os
 import signal
 import threading
 import timeit
+from collections.abc import AsyncIterator, Iterator
 from datetime import timedelta
+from io import BytesIO
+from pathlib import Path
 
+import grpc
 from django.test import TestCase
+from openpyxl import load_workbook
 
-from src.service.server import Server
+from src.service.codegen import feb_stats_pb2_grpc
+from src.service.codegen.feb_stats_pb2 import (
+    GetFebStatsRequest,
+    GetFebStatsTablesRequest,
+    StreamFebStatsRequest,
+)
+from src.service.handler import GrpcLeagueHandler
+from src.service.server import AsyncServer, Server
 
 
 class ServerTestCase(TestCase):
@@ -29,3 +43,153 @@ class ServerTestCase(TestCase):
         server.wait_for_termination()
         delta = timedelta(seconds=timeit.default_timer() - start)
         self.assertLessEqual(delta.total_seconds(), 30.0)
+
+    def test_StreamFebStats(self) -> None:
+        test_dir = Path(__file__).parent.parent.parent
+        boxscore_files = sorted(glob.glob(str(test_dir / "data/*livescore*htm*")))
+
+        def iter_requests() -> Iterator[StreamFebStatsRequest]:
+            for boxscore_file in boxscore_files:
+                with open(boxscore_file, mode="rb") as f:
+                    yield StreamFebStatsRequest(boxscore=f.read())
+
+        server = Server(address="127.0.0.1:0")
+        server.start()
+        try:
+            with grpc.insecure_channel(f"127.0.0.1:{server.port}") as channel:
+                stub = feb_stats_pb2_grpc.FebStatsServiceStub(channel)
+                sheet = b"".join(response.sheet_chunk for response in stub.StreamFebStats(iter_requests()))
+        finally:
+            server.stop(0)
+        self.assertTrue(load_workbook(BytesIO(sheet)).sheetnames)
+
+    def test_GrpcLeagueHandler(self) -> None:
+        test_dir = Path(__file__).parent.parent.parent
+        boxscores = []
+        for boxscore_file in sorted(glob.glob(str(test_dir / "data/*livescore*htm*"))):
+            with open(boxscore_file, mode="rb") as f:
+                boxscores.append(f.read())
+
+        server = Server(address="127.0.0.1:0")
+        server.start()
+        league_handler = GrpcLeagueHandler(f"127.0.0.1:{server.port}", timeout=60)
+        try:
+            sheet = league_handler.export_boxscores(iter(boxscores), True)
+            self.assertTrue(load_workbook(BytesIO(sheet)).sheetnames)
+            tables = league_handler.export_tables(boxscores)
+            self.assertEqual(len(tables.teams), len(load_workbook(BytesIO(sheet)).sheetnames) // 2 - 1)
+            # Expired deadlines are reported as the other league handlers do
+            with self.assertRaises(TimeoutError):
+                league_handler.export_boxscores(boxscores, False, timeout=0.001)
+        finally:
+            league_handler.close()
+            server.stop(0)
+
+
+class AsyncServerTestCase(TestCase):
+    def setUp(self) -> None:
+        test_dir = Path(__file__).parent.parent.parent
+        self.boxscores = []
+        for boxscore_file in sorted(glob.glob(str(test_dir / "data/*livescore*htm*"))):
+            with open(boxscore_file, mode="rb") as f:
+                self.boxscores.append(f.read())
+
+    async def iter_slow_requests(self, delay: float) -> AsyncIterator[StreamFebStatsRequest]:
+        yield StreamFebStatsRequest(boxscore=self.boxscores[0])
+        await asyncio.sleep(delay)
+        for boxscore in self.boxscores[1:]:
+            yield StreamFebStatsRequest(boxscore=boxscore)
+
+    def test_requests(self) -> None:
+        async def run() -> None:
+            server = AsyncServer(address="127.0.0.1:0")
+            await server.start()
+            try:
+                async with grpc.aio.insecure_channel(f"127.0.0.1:{server.port}") as channel:
+                    stub = feb_stats_pb2_grpc.FebStatsServiceStub(channel)
+                    response = await stub.GetFebStats(GetFebStatsRequest(boxscores=self.boxscores), timeout=60)
+                    self.assertTrue(load_workbook(BytesIO(response.sheet)).sheetnames)
+                    chunks = [
+                        response.sheet_chunk async for response in stub.StreamFebStats(self.iter_slow_requests(0))
+                    ]
+                    self.assertTrue(load_workbook(BytesIO(b"".join(chunks))).sheetnames)
+                    tables = await stub.GetFebStatsTables(GetFebStatsTablesRequest(boxscores=self.boxscores))
+                    self.assertTrue(tables.league.columns)
+            finally:
+                await server.stop(0)
+
+        asyncio.run(run())
+
+    def test_slow_client(self) -> None:
+        async def run() -> None:
+            # The slow upload is exported as it arrives, so it holds one of the threads, and the other one serves the
+            # rest of the requests
+            server = AsyncServer(address="127.0.0.1:0", max_workers=2)
+            await server.start()
+            try:
+                async with grpc.aio.insecure_channel(f"127.0.0.1:{server.port}") as channel:
+                    stub = feb_stats_pb2_grpc.FebStatsServiceStub(channel)
+                    slow_call = stub.StreamFebStats(self.iter_slow_requests(5))
+                    slow_response = asyncio.ensure_future(slow_call.read())
+                    await asyncio.sleep(0.1)
+                    response = await stub.GetFebStats(GetFebStatsRequest(boxscores=self.boxscores[:1]), timeout=30)
+                    self.assertTrue(response.sheet)
+                    self.assertFalse(slow_response.done())
+                    self.assertTrue((await slow_response).sheet_chunk)
+            finally:
+                await server.stop(0)
+
+        asyncio.run(run())
+
+    def test_max_concurrent_rpcs(self) -> None:
+        async def run() -> None:
+            server = AsyncServer(address="127.0.0.1:0", max_concurrent_rpcs=1)
+            await server.start()
+            try:
+                async with grpc.aio.insecure_channel(f"127.0.0.1:{server.port}") as channel:
+                    stub = feb_stats_pb2_grpc.FebStatsServiceStub(channel)
+                    slow_call = stub.StreamFebStats(self.iter_slow_requests(1))
+                    slow_response = asyncio.ensure_future(slow_call.read())
+                    await asyncio.sleep(0.1)
+                    with self.assertRaises(grpc.aio.AioRpcError) as context:
+                        await stub.GetFebStats(GetFebStatsRequest(boxscores=self.boxscores[:1]))
+                    self.assertEqual(context.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+                    self.assertTrue((await slow_response).sheet_chunk)
+            finally:
+                await server.stop(0)
+
+        asyncio.run(run())
+
+    def test_max_upload_size(self) -> None:
+        async def run() -> None:
+            # Only the last boxscore exceeds the limit: if the upload is rejected before the client finishes writing it,
+            # the client may see an INTERNAL error instead of the status of the server
+            upload_size = sum(len(boxscore) for boxscore in self.boxscores)
+            server = AsyncServer(address="127.0.0.1:0", max_upload_size=upload_size - 1)
+            await server.start()
+            try:
+                async with grpc.aio.insecure_channel(f"127.0.0.1:{server.port}") as channel:
+                    stub = feb_stats_pb2_grpc.FebStatsServiceStub(channel)
+                    with self.assertRaises(grpc.aio.AioRpcError) as context:
+                        _ = [response async for response in stub.StreamFebStats(self.iter_slow_requests(0))]
+                    self.assertEqual(context.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+                    # Uploads within the limit are exported
+                    requests = [StreamFebStatsRequest(boxscore=self.boxscores[0])]
+                    chunks = [response.sheet_chunk async for response in stub.StreamFebStats(iter(requests))]
+                    self.assertTrue(load_workbook(BytesIO(b"".join(chunks))).sheetnames)
+            finally:
+                await server.stop(0)
+
+        asyncio.run(run())
+
+    def test_sigterm_shutdown(self) -> None:
+        async def run() -> None:
+            server = AsyncServer(address="127.0.0.1:0")
+            await server.start()
+            start = timeit.default_timer()
+            os.kill(os.getpid(), signal.SIGTERM)
+            await server.wait_for_termination()
+            delta = timedelta(seconds=timeit.default_timer() - start)
+            self.assertLessEqual(delta.total_seconds(), 30.0)
+
+        asyncio.run(run())
@@ -0,0 +1,72 @@
+import glob
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.test import TestCase
+
+from src.core.analysis.transforms import compute_league_aggregates
+from src.core.parsers.parsers import FEBLivescoreParser
+from src.service.codegen.feb_stats_pb2 import GetFebStatsTablesResponse
+from src.service.tables import df_to_table, league_to_tables, series_to_column
+
+
+class TablesTestCase(TestCase):
+    def test_series_to_column(self) -> None:
+        column = series_to_column("points", pd.Series([1.5, np.nan, 3], dtype=object))
+        self.assertEqual(column.name, "points")
+        self.assertEqual(column.numbers[0], 1.5)
+        self.assertTrue(math.isnan(column.numbers[1]))
+        self.assertEqual(column.numbers[2], 3.0)
+        self.assertListEqual(list(column.texts), [])
+
+        column = series_to_column("minutes", pd.Series([pd.Timedelta(minutes=2, seconds=3), pd.NaT], dtype=object))
+        self.assertEqual(column.numbers[0], 123.0)
+        self.assertTrue(math.isnan(column.numbers[1]))
+
+        column = series_to_column("number", pd.Series(["4", None, "12"]))
+        self.assertListEqual(list(column.texts), ["4", "", "12"])
+        self.assertListEqual(list(column.numbers), [])
+
+    def test_df_to_table(self) -> None:
+        df = pd.DataFrame({"points": [10.0, 8.0], "games": [2, 1]}, index=pd.Index(["A", "B"], name="player"))
+        table = df_to_table("Team", df)
+        self.assertEqual(table.name, "Team")
+        self.assertListEqual([column.name for column in table.columns], ["player", "points", "games"])
+        self.assertListEqual(list(table.columns[0].texts), ["A", "B"])
+        self.assertListEqual(list(table.columns[2].numbers), [2.0, 1.0])
+
+        # Unnamed indexes are dropped
+        table = df_to_table("League", df.reset_index(drop=True))
+        self.assertListEqual([column.name for column in table.columns], ["points", "games"])
+
+    def test_league_to_tables(self) -> None:
+        test_dir = Path(__file__).parent.parent.parent
+        boxscores = []
+        for file in sorted(glob.glob(str(test_dir / "data/*livescore*htm*"))):
+            with open(file, mode="rb") as f:
+                boxscores.append(f.read())
+        league = compute_league_aggregates(
+            FEBLivescoreParser.parse_boxscores(boxscores, FEBLivescoreParser.read_link_bytes)
+        )
+        tables = GetFebStatsTablesResponse.FromString(league_to_tables(league).SerializeToString())
+
+        assert league.aggregated_games is not None
+        self.assertEqual(tables.league.name, league.name)
+        league_columns = {column.name: column for column in tables.league.columns}
+        self.assertListEqual(list(league_columns), [str(column) for column in league.aggregated_games.columns])
+        self.assertSetEqual(set(league_columns["team"].texts), {team.name for team in league.teams})
+        np.testing.assert_allclose(
+            league_columns["points_made"].numbers, league.aggregated_games["points_made"].astype(np.float64)
+        )
+        self.assertEqual(len(league_columns["minutes"].numbers), len(league.aggregated_games))
+
+        teams = {team.name: team for team in league.teams if team.season_stats is not None}
+        self.assertSetEqual({table.name for table in tables.teams}, set(teams))
+        for table in tables.teams:
+            season_stats = teams[table.name].season_stats
+            assert season_stats is not None
+            team_columns = {column.name: column for column in table.columns}
+            self.assertListEqual(list(team_columns["player"].texts), list(season_stats.index))
+            np.testing.assert_allclose(team_columns["assists"].numbers, season_stats["assists"].astype(np.float64))
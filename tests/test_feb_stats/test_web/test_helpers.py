@@ -3,13 +3,18 @@ from pathlib import Path
 from unittest.mock import patch
 
 from django.conf import settings
-from django.test import TestCase
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
 
+from src.service.handler import GrpcLeagueHandler, SimpleLeagueHandler
+from src.web.helpers.league_handler import get_league_handler
 from src.web.helpers.read_write import (
     get_boxscore_files,
+    get_upload_dir,
     is_allowed_file_extension,
     read_boxscores_from_files,
     remove_boxscore_files,
+    save_boxscore_file,
 )
 
 
@@ -28,37 +33,64 @@ class TestWebHelpers(TestCase):
         self.assertFalse(is_allowed_file_extension("test"))
 
     def test_get_boxscore_files(self):
-        test_files = ["test1.html", "test2.htm", "test3.pdf"]
-        for file in test_files:
-            path = Path(settings.UPLOAD_FOLDER) / file
-            path.write_text("test content")
+        save_boxscore_file("session", "test1.html", [b"test content"])
+        save_boxscore_file("session", "test2.htm", [b"test ", b"content"])
+        save_boxscore_file("session", "test1.html", [b"test content"])
+        # Files not listed in the manifest are ignored
+        (get_upload_dir("session") / "test3.html").write_text("test content")
 
-        files = get_boxscore_files()
-        self.assertEqual(len(files), 2)
-        self.assertTrue(all(str(file).endswith((".html", ".htm")) for file in files))
+        files = get_boxscore_files("session")
+        self.assertListEqual(files, [str(get_upload_dir("session") / f) for f in ("test1.html", "test2.htm")])
+        self.assertListEqual(get_boxscore_files("other"), [])
 
     @patch("src.web.helpers.read_write.read_file")
     def test_read_boxscores(self, mock_read_file):
-        test_files = ["test1.html", "test2.htm"]
-        for file in test_files:
-            path = Path(settings.UPLOAD_FOLDER) / file
-            path.write_text("test content")
+        save_boxscore_file("session", "test1.html", [b"test content"])
+        save_boxscore_file("session", "test2.htm", [b"test content"])
 
         mock_read_file.return_value = b"test boxscore data"
 
-        boxscores = read_boxscores_from_files()
+        boxscores = read_boxscores_from_files("session")
         self.assertEqual(len(boxscores), 2)
         self.assertTrue(all(score == b"test boxscore data" for score in boxscores))
         self.assertEqual(mock_read_file.call_count, 2)
 
     def test_remove_boxscores(self):
-        test_files = ["test1.html", "test2.htm", "test3.pdf"]
-        for file in test_files:
-            path = Path(settings.UPLOAD_FOLDER) / file
-            path.write_text("test content")
+        save_boxscore_file("session", "test1.html", [b"test content"])
+        save_boxscore_file("other", "test1.html", [b"test content"])
 
-        remove_boxscore_files()
+        remove_boxscore_files("session")
+        remove_boxscore_files("missing")
 
-        remaining_files = list(Path(settings.UPLOAD_FOLDER).glob("*"))
-        self.assertEqual(len(remaining_files), 1)
-        self.assertEqual(remaining_files[0].name, "test3.pdf")
+        remaining_dirs = list(Path(settings.UPLOAD_FOLDER).glob("*"))
+        self.assertListEqual(remaining_dirs, [get_upload_dir("other")])
+        self.assertListEqual(read_boxscores_from_files("other"), [b"test content"])
+
+
+class TestLeagueHandlerHelper(TestCase):
+    def setUp(self) -> None:
+        get_league_handler.cache_clear()
+
+    def tearDown(self) -> None:
+        get_league_handler.cache_clear()
+
+    def test_local_engine(self) -> None:
+        with override_settings(STATS_ENGINE="local"):
+            league_handler = get_league_handler()
+            self.assertIsInstance(league_handler, SimpleLeagueHandler)
+            # The handler is shared by all the requests
+            self.assertIs(get_league_handler(), league_handler)
+
+    def test_grpc_engine(self) -> None:
+        with override_settings(STATS_ENGINE="grpc", STATS_TIMEOUT=10.0):
+            league_handler = get_league_handler()
+            self.assertIsInstance(league_handler, GrpcLeagueHandler)
+            assert isinstance(league_handler, GrpcLeagueHandler)
+            self.assertEqual(league_handler.timeout, 10.0)
+            self.assertIs(get_league_handler(), league_handler)
+            league_handler.close()
+
+    def test_unknown_engine(self) -> None:
+        with override_settings(STATS_ENGINE="unknown"):
+            with self.assertRaises(ImproperlyConfigured):
+                get_league_handler()
@@ -0,0 +1,204 @@
+import tempfile
+import uuid
+from datetime import timedelta
+from http import HTTPStatus
+from unittest.mock import MagicMock, patch
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from src.web.helpers.jobs import (
+    claim_job,
+    delete_expired_jobs,
+    get_job_key,
+    run_job,
+    run_worker,
+    submit_job,
+    submit_upload_job,
+)
+from src.web.helpers.read_write import get_boxscore_files, save_boxscore_file
+from src.web.models import AnalysisJob
+
+CALENDAR_URL = "https://baloncestoenvivo.feb.es/calendario/ligaeba/5/2024"
+
+
+class TestJobs(TestCase):
+    def test_get_job_key(self) -> None:
+        self.assertEqual(get_job_key(CALENDAR_URL, "2024", "1", False), get_job_key(CALENDAR_URL, "2024", "1", False))
+        self.assertEqual(get_job_key(CALENDAR_URL, "", "", False), get_job_key(CALENDAR_URL, None, None, False))
+        self.assertNotEqual(get_job_key(CALENDAR_URL, "2024", "1", False), get_job_key(CALENDAR_URL, "2024", "1", True))
+        self.assertNotEqual(
+            get_job_key(CALENDAR_URL, "2024", "1", False), get_job_key(CALENDAR_URL, "2024", "2", False)
+        )
+
+    def test_submit_job(self) -> None:
+        job = submit_job(CALENDAR_URL, "2024", "1", False)
+        self.assertEqual(job.status, AnalysisJob.Status.QUEUED)
+        # Equal requests share the job while it is active
+        self.assertEqual(submit_job(CALENDAR_URL, "2024", "1", False).id, job.id)
+        self.assertNotEqual(submit_job(CALENDAR_URL, "2024", "1", True).id, job.id)
+        AnalysisJob.objects.filter(id=job.id).update(status=AnalysisJob.Status.RUNNING)
+        self.assertEqual(submit_job(CALENDAR_URL, "2024", "1", False).id, job.id)
+
+        # Recent results are reused, old ones are not
+        AnalysisJob.objects.filter(id=job.id).update(status=AnalysisJob.Status.DONE, updated_at=timezone.now())
+        self.assertEqual(submit_job(CALENDAR_URL, "2024", "1", False).id, job.id)
+        AnalysisJob.objects.filter(id=job.id).update(updated_at=timezone.now() - timedelta(days=1))
+        new_job = submit_job(CALENDAR_URL, "2024", "1", False)
+        self.assertNotEqual(new_job.id, job.id)
+
+        # Failed analyses are retried
+        AnalysisJob.objects.filter(id=new_job.id).update(status=AnalysisJob.Status.FAILED)
+        self.assertNotIn(submit_job(CALENDAR_URL, "2024", "1", False).id, {job.id, new_job.id})
+
+    def test_submit_upload_job(self) -> None:
+        job = submit_upload_job("upload", False)
+        self.assertEqual(job.upload_id, "upload")
+        self.assertEqual(job.calendar_url, "")
+        # Repeated requests share the job while it is active
+        self.assertEqual(submit_upload_job("upload", False).id, job.id)
+        AnalysisJob.objects.filter(id=job.id).update(status=AnalysisJob.Status.RUNNING)
+        self.assertEqual(submit_upload_job("upload", False).id, job.id)
+
+        # Its staged files are gone once it has finished
+        AnalysisJob.objects.filter(id=job.id).update(status=AnalysisJob.Status.DONE, updated_at=timezone.now())
+        self.assertNotEqual(submit_upload_job("upload", False).id, job.id)
+
+    def test_claim_job(self) -> None:
+        self.assertIsNone(claim_job())
+        first_job = submit_job(CALENDAR_URL, "2024", "1", False)
+        second_job = submit_job(CALENDAR_URL, "2024", "2", False)
+
+        claimed_job = claim_job()
+        assert claimed_job is not None
+        self.assertEqual(claimed_job.id, first_job.id)
+        self.assertEqual(claimed_job.status, AnalysisJob.Status.RUNNING)
+        claimed_job = claim_job()
+        assert claimed_job is not None
+        self.assertEqual(claimed_job.id, second_job.id)
+        self.assertIsNone(claim_job())
+
+        # Jobs of dead workers are claimed again
+        with override_settings(JOBS_TIMEOUT=60):
+            AnalysisJob.objects.filter(id=first_job.id).update(updated_at=timezone.now() - timedelta(minutes=2))
+            claimed_job = claim_job()
+        assert claimed_job is not None
+        self.assertEqual(claimed_job.id, first_job.id)
+
+    @patch("src.web.helpers.jobs.iter_boxscores_from_calendar_url")
+    def test_run_job(self, mock_iter_boxscores: MagicMock) -> None:
+        league_handler = MagicMock()
+        league_handler.export_boxscores.return_value = b"test excel data"
+        mock_iter_boxscores.return_value = iter([b"boxscore"])
+        job = submit_job(CALENDAR_URL, "2024", "1", True)
+
+        run_job(job, league_handler)
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalysisJob.Status.DONE)
+        self.assertEqual(bytes(job.sheet), b"test excel data")
+        mock_iter_boxscores.assert_called_once_with(CALENDAR_URL, season="2024", group_id="1")
+        boxscores, color_sheet = league_handler.export_boxscores.call_args.args
+        self.assertListEqual(list(boxscores), [b"boxscore"])
+        self.assertTrue(color_sheet)
+
+        mock_iter_boxscores.return_value = iter([])
+        job = submit_job(CALENDAR_URL, "2024", "2", True)
+        run_job(job, league_handler)
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalysisJob.Status.FAILED)
+        self.assertIn("No se han encontrado actas", job.error)
+
+    def test_run_upload_job(self) -> None:
+        league_handler = MagicMock()
+        league_handler.export_boxscores.return_value = b"test excel data"
+        with tempfile.TemporaryDirectory() as upload_folder, override_settings(UPLOAD_FOLDER=upload_folder):
+            save_boxscore_file("upload", "1.html", [b"boxscore 1"])
+            save_boxscore_file("upload", "2.html", [b"boxscore 2"])
+            job = submit_upload_job("upload", False)
+
+            run_job(job, league_handler)
+            job.refresh_from_db()
+            self.assertEqual(job.status, AnalysisJob.Status.DONE)
+            self.assertEqual(bytes(job.sheet), b"test excel data")
+            boxscores, color_sheet = league_handler.export_boxscores.call_args.args
+            self.assertListEqual(list(boxscores), [b"boxscore 1", b"boxscore 2"])
+            self.assertFalse(color_sheet)
+            self.assertListEqual(get_boxscore_files("upload"), [])
+
+            job = submit_upload_job("upload", False)
+            run_job(job, league_handler)
+            job.refresh_from_db()
+            self.assertEqual(job.status, AnalysisJob.Status.FAILED)
+            self.assertIn("No se han encontrado actas", job.error)
+
+    def test_delete_expired_jobs(self) -> None:
+        jobs = {
+            (status, expired): submit_job(CALENDAR_URL, "2024", f"{status}-{expired}", False)
+            for status in AnalysisJob.Status
+            for expired in (False, True)
+        }
+        for (status, expired), job in jobs.items():
+            updated_at = timezone.now() - timedelta(days=1) if expired else timezone.now()
+            AnalysisJob.objects.filter(id=job.id).update(status=status, updated_at=updated_at, sheet=b"sheet")
+
+        # Only finished and failed jobs expire, active ones are claimed again if their worker died
+        self.assertEqual(delete_expired_jobs(), 2)
+        self.assertSetEqual(
+            set(AnalysisJob.objects.values_list("id", flat=True)),
+            {job.id for (status, expired), job in jobs.items() if not expired or status in AnalysisJob.ACTIVE_STATUSES},
+        )
+        self.assertEqual(delete_expired_jobs(), 0)
+
+    @patch("src.web.helpers.jobs.iter_boxscores_from_calendar_url")
+    def test_run_worker(self, mock_iter_boxscores: MagicMock) -> None:
+        mock_iter_boxscores.side_effect = lambda *args, **kwargs: iter([b"boxscore"])
+        league_handler = MagicMock()
+        league_handler.export_boxscores.return_value = b"test excel data"
+        for group_id in ("1", "2", "3"):
+            submit_job(CALENDAR_URL, "2024", group_id, False)
+
+        self.assertEqual(run_worker(league_handler, stop_when_empty=True), 3)
+        self.assertEqual(AnalysisJob.objects.filter(status=AnalysisJob.Status.DONE).count(), 3)
+
+        # The results are deleted once they expire
+        AnalysisJob.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(run_worker(league_handler, stop_when_empty=True), 0)
+        self.assertFalse(AnalysisJob.objects.exists())
+
+
+class TestJobViews(TestCase):
+    def setUp(self) -> None:
+        self.client = Client()
+
+    def test_submit(self) -> None:
+        response = self.client.post(reverse("job_submit"), data={"custom_url": CALENDAR_URL})
+        self.assertEqual(response.status_code, HTTPStatus.ACCEPTED)
+        job = response.json()
+        self.assertEqual(job["status"], AnalysisJob.Status.QUEUED)
+        self.assertEqual(job["status_url"], reverse("job_status", args=[job["id"]]))
+
+        # Equal requests share the job
+        response = self.client.post(reverse("job_submit"), data={"custom_url": CALENDAR_URL})
+        self.assertEqual(response.json()["id"], job["id"])
+
+        response = self.client.post(reverse("job_submit"))
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_status_and_download(self) -> None:
+        job = submit_job(CALENDAR_URL, None, None, False)
+        response = self.client.get(reverse("job_status", args=[job.id]))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json()["status"], AnalysisJob.Status.QUEUED)
+
+        response = self.client.get(reverse("job_download", args=[job.id]))
+        self.assertEqual(response.status_code, HTTPStatus.CONFLICT)
+
+        AnalysisJob.objects.filter(id=job.id).update(status=AnalysisJob.Status.DONE, sheet=b"test excel data")
+        response = self.client.get(reverse("job_download", args=[job.id]))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.content, b"test excel data")
+        self.assertEqual(response["Content-Type"], "application/vnd.ms-excel")
+
+        response = self.client.get(reverse("job_status", args=[uuid.uuid4()]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -1,13 +1,17 @@
 import tempfile
 from http import HTTPStatus
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase
 from django.urls import reverse
 
+from src.web.helpers.jobs import run_job
+from src.web.helpers.read_write import get_boxscore_files
+from src.web.models import AnalysisJob
+
 
 class TestFebStatsWebapp(TestCase):
     def setUp(self):
@@ -22,6 +26,9 @@ class TestFebStatsWebapp(TestCase):
         response = self.client.get(reverse("index"))
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertTemplateUsed(response, "web/index.html")
+        # Visits do not start an upload session
+        self.assertNotIn("upload_id", self.client.session)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
 
     def test_upload_no_file(self) -> None:
         response = self.client.post(reverse("upload"))
@@ -38,39 +45,68 @@ class TestFebStatsWebapp(TestCase):
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertEqual(response.content, b"OK")
 
-        uploaded_file = Path(settings.UPLOAD_FOLDER) / "test.html"
+        uploaded_file = Path(settings.UPLOAD_FOLDER) / self.client.session["upload_id"] / "test.html"
         self.assertTrue(uploaded_file.exists())
         self.assertEqual(uploaded_file.read_bytes(), b"test content")
 
-    @patch("src.web.views.FebStatsServiceServicer")
-    def test_analyze_endpoint_success(self, mock_service: MagicMock) -> None:
-        test_file = Path(settings.UPLOAD_FOLDER) / "test.html"
-        test_file.write_text("test content")
+    def test_uploads_are_isolated(self) -> None:
+        other_client = Client()
+        self.client.post(reverse("upload"), data={"file": SimpleUploadedFile("test.html", b"test content")})
+        other_client.post(reverse("upload"), data={"file": SimpleUploadedFile("test.html", b"other content")})
+        self.assertNotEqual(self.client.session["upload_id"], other_client.session["upload_id"])
 
-        mock_response = MagicMock()
-        mock_response.sheet = b"test excel data"
-        mock_service.return_value.GetFebStats.return_value = mock_response
+        response = self.client.post(reverse("analyze"))
+        self.assertEqual(response.status_code, HTTPStatus.ACCEPTED)
+        league_handler = MagicMock()
+        league_handler.export_boxscores.return_value = b"test excel data"
+        run_job(AnalysisJob.objects.get(id=response.json()["id"]), league_handler)
+        league_handler.export_boxscores.assert_called_once()
+        boxscores, _ = league_handler.export_boxscores.call_args.args
+        self.assertListEqual(list(boxscores), [b"test content"])
+
+        # The files of the other session are kept
+        other_file = Path(settings.UPLOAD_FOLDER) / other_client.session["upload_id"] / "test.html"
+        self.assertEqual(other_file.read_bytes(), b"other content")
+
+    def test_analyze_endpoint_success(self) -> None:
+        self.client.post(reverse("upload"), data={"file": SimpleUploadedFile("test.html", b"test content")})
+        upload_id = self.client.session["upload_id"]
 
         response = self.client.post(reverse("analyze"), data={"color-sheet": "true"})
-
-        self.assertEqual(response.status_code, HTTPStatus.OK)
-        self.assertEqual(response.content, b"test excel data")
-        self.assertEqual(response["Content-Type"], "application/vnd.ms-excel")
-        self.assertIn("estadisticas_", response["Content-Disposition"])
-
-    @patch("src.web.views.FebStatsServiceServicer")
-    def test_analyze_endpoint_no_files(self, mock_service: MagicMock) -> None:
+        self.assertEqual(response.status_code, HTTPStatus.ACCEPTED)
+        job = AnalysisJob.objects.get(id=response.json()["id"])
+        self.assertEqual(job.status, AnalysisJob.Status.QUEUED)
+        self.assertEqual(job.upload_id, upload_id)
+        self.assertTrue(job.color_sheet)
+        self.assertEqual(response.json()["status_url"], reverse("job_status", args=[job.id]))
+
+        # The job takes over the uploaded files, new uploads are staged apart
+        self.assertNotIn("upload_id", self.client.session)
+        self.client.post(reverse("upload"), data={"file": SimpleUploadedFile("other.html", b"other content")})
+        self.assertNotEqual(self.client.session["upload_id"], upload_id)
+        self.assertListEqual(
+            [Path(filename).name for filename in get_boxscore_files(upload_id)],
+            ["test.html"],
+        )
+
+    def test_analyze_endpoint_no_files(self) -> None:
         response = self.client.post(reverse("analyze"))
-        self.assertEqual(response.status_code, HTTPStatus.FOUND)
-
-    @patch("src.web.views.FebStatsServiceServicer")
-    def test_analyze_endpoint_error(self, mock_service: MagicMock) -> None:
-        test_file = Path(settings.UPLOAD_FOLDER) / "test.html"
-        test_file.write_text("test content")
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn("No se han encontrado actas", response.json()["error"])
+        self.assertFalse(AnalysisJob.objects.exists())
 
-        mock_service.return_value.GetFebStats.side_effect = Exception("Test error")
+    def test_analyze_endpoint_error(self) -> None:
+        self.client.post(reverse("upload"), data={"file": SimpleUploadedFile("test.html", b"test content")})
+        test_file = Path(settings.UPLOAD_FOLDER) / self.client.session["upload_id"] / "test.html"
+        self.assertTrue(test_file.exists())
 
         response = self.client.post(reverse("analyze"))
-        self.assertEqual(response.status_code, HTTPStatus.FOUND)
-
+        league_handler = MagicMock()
+        league_handler.export_boxscores.side_effect = Exception("Test error")
+        job = AnalysisJob.objects.get(id=response.json()["id"])
+        run_job(job, league_handler)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalysisJob.Status.FAILED)
+        self.assertEqual(job.error, "Test error")
         self.assertFalse(test_file.exists())